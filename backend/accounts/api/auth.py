@@ -3,8 +3,9 @@ from django.conf import settings
 from django.contrib.auth import get_user_model, logout as auth_logout
 from django.shortcuts import redirect
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
+from accounts.cache import user_cache
 
 
 logger = logging.getLogger(__name__)
@@ -75,3 +76,14 @@ class UserInfoView(APIView):
             }
             data["social_profiles"][provider] = provider_data
         return Response(data)
+
+
+class UserCacheStatsView(APIView):
+    """
+    GET: Hit and miss counters of this process's authenticated-user cache
+    (see accounts.cache). Staff only.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(user_cache.stats())
@@ -0,0 +1,128 @@
+"""
+Cache of the users behind JWT access tokens (see accounts.authentication).
+
+Resolving the token's user is the one query every API request makes, so
+users are kept in two layers:
+
+- a small LRU in each process, whose entries live for
+  ``ACCOUNTS_USER_CACHE_LOCAL_TTL`` seconds and cost no I/O at all;
+- the shared Django cache (Redis in production) for
+  ``ACCOUNTS_USER_CACHE_TIMEOUT`` seconds.
+
+Saving or deleting a user (which is also how ``onboarding_completed`` is
+changed) drops it from this process and bumps its generation in the
+shared cache. Other processes' LRUs catch up within the local TTL. A user
+is stored in the shared cache together with the generation it was loaded
+at and only served while that is still current (as in pace.cache), so a
+copy loaded before a concurrent write can never be served after it.
+Generations are seeded from the clock, so an evicted one never comes back
+at a value an older copy was stored with.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+
+def _generation_key(user_id):
+    return f"accounts:user:generation:{user_id}"
+
+
+def _user_key(user_id):
+    return f"accounts:user:{user_id}"
+
+
+class UserCache:
+    """Process-local LRU in front of the shared cache. Thread-safe."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._forgets = 0  # bumped by forget(): a copy loaded across one is not kept locally
+        self.local_hits = self.shared_hits = self.misses = 0
+
+    def get(self, lookup_field, user_id):
+        """
+        A private copy of the user whose ``lookup_field`` is ``user_id``.
+        Raises ``DoesNotExist`` like ``objects.get()``; unknown ids are not cached.
+        The copy can be up to ``ttl`` seconds old, so save it with ``update_fields``.
+        """
+        # Tokens carry the id as a string; signals see the model's value
+        user_id = str(user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.local_hits += 1
+                return copy.copy(entry[1])
+            forgets = self._forgets
+
+        cached = cache.get_many([_generation_key(user_id), _user_key(user_id)])
+        generation = cached.get(_generation_key(user_id))
+        if generation is None:
+            generation = _seed_generation(user_id)
+        stored_generation, user = cached.get(_user_key(user_id), (None, None))
+        if user is not None and stored_generation == generation:
+            with self._lock:
+                self.shared_hits += 1
+        else:
+            user = get_user_model().objects.get(**{lookup_field: user_id})
+            with self._lock:
+                self.misses += 1
+            # Stored with the generation it was loaded at: if a write bumped it
+            # meanwhile, this copy is simply never served
+            cache.set(_user_key(user_id), (generation, user), timeout=settings.ACCOUNTS_USER_CACHE_TIMEOUT)
+
+        with self._lock:
+            if self._forgets == forgets:
+                self._entries[user_id] = (time.monotonic() + self.ttl, user)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return copy.copy(user)
+
+    def forget(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+            self._forgets += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.local_hits = self.shared_hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "local_hits": self.local_hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+
+user_cache = UserCache(settings.ACCOUNTS_USER_CACHE_SIZE, settings.ACCOUNTS_USER_CACHE_LOCAL_TTL)
+
+
+def _seed_generation(user_id):
+    key = _generation_key(user_id)
+    cache.add(key, time.time_ns(), timeout=None)
+    return cache.get(key)
+
+
+def invalidate_user(user_id):
+    """Drop the user from this process's LRU and from the shared cache."""
+    user_cache.forget(user_id)
+    try:
+        cache.incr(_generation_key(user_id))
+    except ValueError:
+        # Never seeded (or evicted): a fresh seed is a new generation too
+        _seed_generation(user_id)
+    cache.delete(_user_key(user_id))
@@ -6,3 +6,11 @@ class OnboardingCompletionSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = ['onboarding_completed']
+
+    def update(self, instance, validated_data):
+        # ``instance`` is request.user, a cached copy (see accounts.cache) that may be
+        # older than the row: write back only the submitted columns
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
@@ -1,6 +1,9 @@
 from social_django.models import UserSocialAuth
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+from accounts.cache import invalidate_user
 import requests
 import os
 import logging
@@ -60,3 +63,13 @@ def fetch_social_profile_photo(sender, instance: UserSocialAuth, created=False,
         instance.extra_data = instance.extra_data or {}
         instance.extra_data["picture"] = image_url
         instance.save()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drop the user from the authentication cache (e.g. onboarding_completed or is_active changed)."""
+    user_id = getattr(instance, api_settings.USER_ID_FIELD)
+    invalidate_user(user_id)
+    # Again on commit, in case a request cached the old row before the write was visible
+    transaction.on_commit(lambda: invalidate_user(user_id))
@@ -1,3 +1,111 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from unittest import mock
+
+from accounts.cache import UserCache, invalidate_user, user_cache
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.user = User.objects.create_user(username="cached", email="cached@example.com", password="pass123")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def user_queries(self, url="/api/accounts/user-info/"):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [q for q in queries if 'FROM "accounts_customuser"' in q["sql"]]
+
+    def test_user_is_loaded_once(self):
+        self.assertEqual(len(self.user_queries()), 1)
+        self.assertEqual(self.user_queries(), [])
+        self.assertEqual(user_cache.stats()["misses"], 1)
+        self.assertEqual(user_cache.stats()["local_hits"], 1)
+
+    def test_shared_cache_backs_the_local_one(self):
+        self.user_queries()
+        user_cache.forget(self.user.id)  # as in another process
+        self.assertEqual(self.user_queries(), [])
+        self.assertEqual(user_cache.stats()["shared_hits"], 1)
+
+    def test_onboarding_completion_is_seen_immediately(self):
+        self.assertFalse(self.client.get("/api/accounts/user-info/").data["onboarding_completed"])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch("/api/accounts/onboarding/complete/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.client.get("/api/accounts/user-info/").data["onboarding_completed"])
+
+    def test_onboarding_does_not_write_back_a_stale_copy(self):
+        self.user_queries()
+        User.objects.filter(pk=self.user.pk).update(first_name="Fresh")  # the cached copy is now stale
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch("/api/accounts/onboarding/complete/")
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.first_name, self.user.onboarding_completed), ("Fresh", True))
+
+    def test_deactivated_and_deleted_users_are_rejected(self):
+        self.user_queries()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get("/api/accounts/user-info/").status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.user.delete()
+        self.assertEqual(self.client.get("/api/accounts/user-info/").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_requests_get_their_own_copy(self):
+        self.user_queries()
+        first = user_cache.get("id", self.user.id)
+        first.first_name = "Changed"
+        self.assertEqual(user_cache.get("id", self.user.id).first_name, "")
+
+    def test_copy_loaded_before_a_write_is_not_served_after_it(self):
+        load = User.objects.get
+
+        def load_then_write(**lookup):
+            user = load(**lookup)
+            invalidate_user(user.pk)  # a write commits while the stale copy is in flight
+            return user
+
+        with mock.patch.object(User.objects, "get", side_effect=load_then_write):
+            user_cache.get("id", self.user.id)
+        self.assertEqual(user_cache.stats()["size"], 0)
+        self.assertEqual(len(self.user_queries()), 1)
+        self.assertEqual(user_cache.stats()["shared_hits"], 0)
+
+    def test_evicted_generation_does_not_revive_old_copies(self):
+        self.user_queries()
+        invalidate_user(self.user.id)
+        cache.set(f"accounts:user:{self.user.id}", (None, self.user))  # not served without a generation
+        cache.delete(f"accounts:user:generation:{self.user.id}")  # evicted
+        self.assertEqual(len(self.user_queries()), 1)
+
+    def test_lru_evicts_the_least_recently_used(self):
+        users = [User.objects.create_user(username=f"lru{i}", email=f"lru{i}@example.com") for i in range(3)]
+        lru = UserCache(max_size=2, ttl=60)
+        lru.get("id", users[0].id)
+        lru.get("id", users[1].id)
+        lru.get("id", users[0].id)
+        lru.get("id", users[2].id)
+        self.assertEqual(list(lru._entries), [str(users[0].id), str(users[2].id)])
+
+    def test_stats_are_staff_only(self):
+        response = self.client.get("/api/accounts/auth/user-cache/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get("/api/accounts/auth/user-cache/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data), {"local_hits", "shared_hits", "misses", "size", "max_size"})
@@ -1,5 +1,5 @@
 from django.urls import path, include
-from accounts.api.auth import LogoutRedirectView, UserInfoView
+from accounts.api.auth import LogoutRedirectView, UserCacheStatsView, UserInfoView
 from accounts.api.onboarding import CompleteOnboardingAPIView
 from accounts.api.jwt_views import (
     CookieTokenObtainPairView,
@@ -22,6 +22,7 @@ urlpatterns = [
          CookieTokenRefreshView.as_view(), name='token_refresh'),
     path('auth/register/', RegisterView.as_view(), name='register'),
     path('auth/logout/', LogoutView.as_view(), name='jwt_logout'),
+    path('auth/user-cache/', UserCacheStatsView.as_view(), name='user_cache_stats'),
 
     # Onboarding endpoints
     path("onboarding/complete/", CompleteOnboardingAPIView.as_view(),
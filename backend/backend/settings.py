@@ -94,6 +94,40 @@ else:
     }
 
 
+# Cache
+# Redis when DJANGO_REDIS_URL is set (docker-compose), otherwise a
+# process-local cache so development and tests work without Redis.
+DJANGO_REDIS_URL = os.getenv("DJANGO_REDIS_URL")
+
+if DJANGO_REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": DJANGO_REDIS_URL,
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+                # Fall back to the database instead of failing requests if Redis is down
+                "IGNORE_EXCEPTIONS": True,
+            },
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Seconds a cached analytics response is kept (it is also invalidated on writes)
+PACE_ANALYTICS_CACHE_TIMEOUT = int(os.getenv("PACE_ANALYTICS_CACHE_TIMEOUT", "3600"))
+
+# Authenticated-user cache (see accounts.cache): users per process, seconds a
+# process trusts its own copy, and seconds a copy is kept in the shared cache
+ACCOUNTS_USER_CACHE_SIZE = int(os.getenv("ACCOUNTS_USER_CACHE_SIZE", "1024"))
+ACCOUNTS_USER_CACHE_LOCAL_TTL = float(os.getenv("ACCOUNTS_USER_CACHE_LOCAL_TTL", "5"))
+ACCOUNTS_USER_CACHE_TIMEOUT = int(os.getenv("ACCOUNTS_USER_CACHE_TIMEOUT", "300"))
+
+
 MICROSOFT_AUTH = {
     'TENANT_ID': os.getenv('O365_TENANT_ID'),
     'CLIENT_ID': os.getenv('O365_CLIENT_ID'),
@@ -150,7 +184,7 @@ MIDDLEWARE = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
 }
@@ -8,14 +8,22 @@ class FitnessProfileAdmin(admin.ModelAdmin):
     search_fields = ['user__username']
 
 
+@admin.register(ExerciseDefinition)
+class ExerciseDefinitionAdmin(admin.ModelAdmin):
+    list_display = ['name', 'created_at']
+    search_fields = ['name']
+
+
 @admin.register(Exercise)
 class ExerciseAdmin(admin.ModelAdmin):
-    list_display = ['name']
-    search_fields = ['name']
+    list_display = ['name', 'workout_plan', 'order']
+    list_select_related = ['definition', 'workout_plan']
+    search_fields = ['definition__name']
 
 @admin.register(WorkoutPlan)
 class WorkoutPlanAdmin(admin.ModelAdmin):
-    list_display = ['name', 'user', 'created_at', 'updated_at']
+    list_display = ['name', 'user', 'is_template', 'created_at', 'updated_at']
+    list_filter = ['is_template']
     search_fields = ['name', 'user__username']
 
 
@@ -28,10 +36,42 @@ class WorkoutSessionAdmin(admin.ModelAdmin):
 @admin.register(ExerciseSetLog)
 class ExerciseSetLogAdmin(admin.ModelAdmin):
     list_display = ['session', 'exercise', 'set_number', 'reps_completed', 'weight_kg']
-    search_fields = ['exercise__name', 'session__user__username']
+    search_fields = ['exercise__definition__name', 'session__user__username']
+
+
+@admin.register(RepLog)
+class RepLogAdmin(admin.ModelAdmin):
+    list_display = ['session', 'set_number', 'rep_number', 'duration', 'is_good_form']
+    search_fields = ['session__user__username']
 
 
 @admin.register(DailyStreak)
 class DailyStreakAdmin(admin.ModelAdmin):
     list_display = ['user', 'streak_count', 'last_active']
     search_fields = ['user__username']
+
+
+@admin.register(UserDailyStats)
+class UserDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'date', 'sessions_completed', 'total_duration', 'score_count', 'volume']
+    search_fields = ['user__username']
+
+
+@admin.register(UserExerciseStats)
+class UserExerciseStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'definition', 'score_count']
+    list_select_related = ['user', 'definition']
+    search_fields = ['user__username', 'definition__name']
+
+
+@admin.register(SessionTempoStats)
+class SessionTempoStatsAdmin(admin.ModelAdmin):
+    list_display = ['session', 'definition', 'reps', 'seconds']
+    list_select_related = ['definition']
+    search_fields = ['definition__name', 'session__user__username']
+
+
+@admin.register(SessionSummary)
+class SessionSummaryAdmin(admin.ModelAdmin):
+    list_display = ['session', 'total_sets', 'total_volume', 'average_score', 'built_at']
+    search_fields = ['session__user__username']
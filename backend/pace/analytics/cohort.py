@@ -0,0 +1,193 @@
+"""
+Population-level (cohort) analytics across all users.
+
+Every report streams narrow columnar slices of the raw tables with
+``values_list().iterator()``, turns each chunk into a DataFrame and folds it
+into small running aggregates with vectorized group-bys. Memory therefore
+grows with the number of users, exercises and weeks, never with the number
+of set logs or sessions.
+"""
+from datetime import timedelta
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+from django.utils import timezone
+
+from pace.models import ExerciseDefinition, ExerciseSetLog, FitnessProfile, WorkoutSession
+
+CHUNK_SIZE = 50_000
+
+# Score histogram buckets: [0, 10), [10, 20), ... [90, 100]
+SCORE_BIN_EDGES = np.arange(0, 101, 10)
+
+
+def iter_chunks(queryset, fields, chunk_size=CHUNK_SIZE):
+    """Yield DataFrames of at most ``chunk_size`` rows with the given columns."""
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield pd.DataFrame.from_records(chunk, columns=fields)
+
+
+def _week_index(dates):
+    """Monday-based week number since the epoch for a Series of dates."""
+    days = pd.to_datetime(dates).to_numpy(dtype="datetime64[D]").astype(np.int64)
+    # 1970-01-01 was a Thursday; shift so weeks start on Monday
+    return (days + 3) // 7
+
+
+def score_distribution(chunk_size=CHUNK_SIZE):
+    """
+    Per-exercise score statistics: count, mean, standard deviation and a
+    10-point histogram, sorted by exercise name.
+    """
+    moments = None
+    histogram = None
+    logs = ExerciseSetLog.objects.filter(score__isnull=False).order_by()
+    # Group on the integer catalog id (one join to pace_exercise, none to the catalog);
+    # names are looked up once at the end
+    for chunk in iter_chunks(logs, ("exercise__definition_id", "score"), chunk_size):
+        scores = chunk["score"].astype(float)
+        chunk = chunk.assign(
+            score=scores,
+            score_sq=scores ** 2,
+            bucket=np.clip(np.digitize(scores, SCORE_BIN_EDGES) - 1, 0, len(SCORE_BIN_EDGES) - 2),
+        )
+        chunk_moments = chunk.groupby("exercise__definition_id").agg(
+            count=("score", "size"), total=("score", "sum"), total_sq=("score_sq", "sum"))
+        chunk_histogram = chunk.groupby(["exercise__definition_id", "bucket"]).size()
+        moments = chunk_moments if moments is None else moments.add(chunk_moments, fill_value=0)
+        histogram = chunk_histogram if histogram is None else histogram.add(chunk_histogram, fill_value=0)
+
+    if moments is None:
+        return []
+
+    mean = moments["total"] / moments["count"]
+    variance = (moments["total_sq"] / moments["count"] - mean ** 2).clip(lower=0)
+    buckets = histogram.unstack(fill_value=0).reindex(
+        columns=range(len(SCORE_BIN_EDGES) - 1), fill_value=0)
+
+    names = dict(ExerciseDefinition.objects.filter(id__in=moments.index.tolist()).values_list("id", "name"))
+    return [
+        {
+            "exercise": names[definition],
+            "count": int(moments.at[definition, "count"]),
+            "mean": round(float(mean[definition]), 2),
+            "std": round(float(np.sqrt(variance[definition])), 2),
+            "histogram": [
+                {"min": int(SCORE_BIN_EDGES[i]), "max": int(SCORE_BIN_EDGES[i + 1]), "count": int(count)}
+                for i, count in enumerate(buckets.loc[definition])
+            ],
+        }
+        for definition in sorted(moments.index, key=lambda definition: names[definition])
+    ]
+
+
+def _sessions_per_user(since, chunk_size):
+    """Sessions started and completed per user since ``since`` (DataFrame indexed by user id)."""
+    totals = None
+    sessions = WorkoutSession.objects.filter(date__gte=since).order_by()
+    for chunk in iter_chunks(sessions, ("user_id", "completed"), chunk_size):
+        chunk_totals = chunk.astype({"completed": int}).groupby("user_id").agg(
+            sessions=("completed", "size"), completed=("completed", "sum"))
+        totals = chunk_totals if totals is None else totals.add(chunk_totals, fill_value=0)
+    if totals is None:
+        return pd.DataFrame(columns=["sessions", "completed"], dtype=float)
+    return totals
+
+
+def _profiles(chunk_size):
+    """fitness_level / fitness_goal / exercise_frequency per user (DataFrame indexed by user id)."""
+    columns = ("user_id", "fitness_level", "fitness_goal", "exercise_frequency")
+    chunks = list(iter_chunks(FitnessProfile.objects.order_by(), columns, chunk_size))
+    if not chunks:
+        return pd.DataFrame(columns=columns[1:])
+    return pd.concat(chunks).set_index("user_id")
+
+
+def adherence(weeks=12, chunk_size=CHUNK_SIZE):
+    """
+    Adherence over the last ``weeks`` weeks grouped by fitness level and by
+    fitness goal. For each group: active users, sessions, completion rate
+    (completed / started) and target adherence (completed sessions per week
+    over the profile's ``exercise_frequency``, capped at 1 per user).
+    """
+    since = timezone.localdate() - timedelta(weeks=weeks)
+    per_user = _profiles(chunk_size).join(_sessions_per_user(since, chunk_size), how="inner")
+    frequency = pd.to_numeric(per_user["exercise_frequency"], errors="coerce")
+    per_user["target_adherence"] = (
+        per_user["completed"] / (frequency.where(frequency > 0) * weeks)
+    ).clip(upper=1)
+
+    def summarize(column):
+        grouped = per_user.assign(**{column: per_user[column].fillna("unknown")}).groupby(column)
+        summary = grouped.agg(
+            users=("completed", "size"),
+            sessions=("sessions", "sum"),
+            completed=("completed", "sum"),
+            target_adherence=("target_adherence", "mean"),
+        )
+        return [
+            {
+                column: key,
+                "users": int(row.users),
+                "sessions": int(row.sessions),
+                "completion_rate": round(row.completed / row.sessions, 4) if row.sessions else None,
+                "target_adherence": None if pd.isna(row.target_adherence) else round(row.target_adherence, 4),
+            }
+            for key, row in summary.sort_index().iterrows()
+        ]
+
+    return {"fitness_level": summarize("fitness_level"), "fitness_goal": summarize("fitness_goal")}
+
+
+def weekly_retention(weeks=12, chunk_size=CHUNK_SIZE):
+    """
+    Week-over-week retention for the last ``weeks`` full weeks: of the users
+    with a completed session in a week, the share who also completed one in
+    the following week.
+    """
+    today = timezone.localdate()
+    this_week = today - timedelta(days=today.weekday())
+    since = this_week - timedelta(weeks=weeks)
+
+    active = []
+    sessions = WorkoutSession.objects.filter(completed=True, date__gte=since).order_by()
+    for chunk in iter_chunks(sessions, ("user_id", "date"), chunk_size):
+        pairs = np.column_stack([chunk["user_id"].to_numpy(np.int64), _week_index(chunk["date"])])
+        active.append(np.unique(pairs, axis=0))
+    if not active:
+        return []
+
+    pairs = np.unique(np.concatenate(active), axis=0)
+    first_week = int(_week_index(pd.Series([since]))[0])
+    user_ids, week_offsets = pairs[:, 0], pairs[:, 1] - first_week
+    span = weeks + 1
+    codes = user_ids * span + week_offsets
+    retained = np.isin(codes + 1, codes)
+
+    active_counts = np.bincount(week_offsets, minlength=span)
+    retained_counts = np.bincount(week_offsets, weights=retained, minlength=span)
+
+    return [
+        {
+            "week": since + timedelta(weeks=offset),
+            "active_users": int(active_counts[offset]),
+            "retained_users": int(retained_counts[offset]),
+            "retention": round(retained_counts[offset] / active_counts[offset], 4) if active_counts[offset] else None,
+        }
+        for offset in range(weeks)
+    ]
+
+
+def cohort_report(weeks=12, chunk_size=CHUNK_SIZE):
+    """All cohort reports in one payload."""
+    return {
+        "weeks": weeks,
+        "score_distribution": score_distribution(chunk_size),
+        "adherence": adherence(weeks, chunk_size),
+        "retention": weekly_retention(weeks, chunk_size),
+    }
@@ -1,13 +1,139 @@
 from datetime import timedelta
-from django.db.models import Sum, Avg
-from django.db.models.functions import TruncDate
+from django.db.models import Case, CharField, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, NullIf, TruncWeek
+from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework import status
+from rest_framework.exceptions import ParseError
 
-from pace.models import WorkoutSession, ExerciseSetLog
-from pace.serializers import FitnessAnalyticsSerializer
+from pace.analytics.cohort import cohort_report
+from pace.cache import get_cached_analytics, set_cached_analytics
+from pace.models import ExerciseSetLog, SessionTempoStats, UserDailyStats, UserExerciseStats, WorkoutSession
+from pace.serializers import (
+    AccuracyTrendSerializer, FitnessAnalyticsSerializer, RepSpeedSerializer, WeeklyVolumeSerializer,
+)
+
+
+# -------------------------
+# Analytics query layer
+# -------------------------
+
+def window_param(request, name, default, maximum):
+    """Parse a positive integer window size (e.g. ``?days=30``) from the query string."""
+    value = request.query_params.get(name, default)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ParseError(f"'{name}' must be an integer.")
+    if not 1 <= value <= maximum:
+        raise ParseError(f"'{name}' must be between 1 and {maximum}.")
+    return value
+
+
+def analytics_totals(user):
+    """
+    Total workouts, total time trained and overall average accuracy,
+    computed in a single aggregate statement over the daily rollups.
+    """
+    totals = UserDailyStats.objects.filter(user=user).aggregate(
+        total_workouts=Coalesce(Sum('sessions_completed'), 0),
+        total_duration=Sum('total_duration'),
+        average_accuracy=Cast(Sum('score_sum'), FloatField())
+        / NullIf(Sum('score_count'), 0),
+    )
+    totals['total_duration'] = totals['total_duration'] or timedelta(seconds=0)
+    totals['average_accuracy'] = totals['average_accuracy'] or 0
+    return totals
+
+
+def analytics_series(user):
+    """
+    Accuracy over time and accuracy per exercise, fetched together as one
+    ``UNION ALL`` of the daily and per-exercise rollups.
+
+    Returns ``(accuracy_over_time, accuracy_per_exercise)``.
+    """
+    per_day = (
+        UserDailyStats.objects.filter(user=user, score_count__gt=0)
+        .annotate(series=Value('day'), label=Cast('date', CharField()))
+        .values_list('series', 'label', 'score_sum', 'score_count')
+        .order_by()
+    )
+    per_exercise = (
+        UserExerciseStats.objects.filter(user=user, score_count__gt=0)
+        .annotate(series=Value('exercise'), label=F('definition__name'))
+        .values_list('series', 'label', 'score_sum', 'score_count')
+        .order_by()
+    )
+
+    accuracy_over_time, accuracy_per_exercise = [], []
+    for series, label, score_sum, score_count in per_day.union(per_exercise, all=True).order_by('label'):
+        if series == 'day':
+            accuracy_over_time.append({"date": label, "avg_accuracy": score_sum / score_count})
+        else:
+            accuracy_per_exercise.append({"exercise__name": label, "avg_accuracy": score_sum / score_count})
+    return accuracy_over_time, accuracy_per_exercise
+
+
+# Training volume of a set: reps × kg, or seconds for timed sets (no reps)
+SET_VOLUME = Case(
+    When(reps_completed__isnull=True, then=Cast('duration_seconds', FloatField())),
+    default=F('reps_completed') * F('weight_kg'),
+    output_field=FloatField(),
+)
+
+
+def weekly_volume(user, start):
+    """
+    Training volume per ISO week (starting Monday) and exercise since ``start``.
+
+    Bucketing and summing happen in the database; only one row per
+    (week, exercise) is streamed back. Yields ``(week_start, exercise_name, volume)``.
+    """
+    rows = (
+        ExerciseSetLog.objects
+        .filter(session__user=user, session__date__gte=start)
+        .annotate(week=TruncWeek('session__date'), definition=F('exercise__definition_id'))
+        # Grouped on the catalog id; the name only rides along for the label
+        .values('week', 'definition', exercise_name=F('exercise__definition__name'))
+        .annotate(volume=Coalesce(Sum(SET_VOLUME), 0.0))
+        .order_by('week', 'exercise_name')
+        .values_list('week', 'exercise_name', 'volume')
+    )
+    return rows.iterator(chunk_size=500)
+
+
+def rep_speed(tempo_stats):
+    """
+    Tempo summary from a SessionTempoStats queryset: the too fast / good /
+    too slow rep distribution plus seconds per rep overall and per exercise.
+    """
+    per_exercise = list(
+        tempo_stats.values('definition', exercise_name=F('definition__name'))
+        .annotate(
+            reps_sum=Sum('reps'), seconds_sum=Sum('seconds'), too_fast=Sum('too_fast_reps'),
+            good=Sum('good_reps'), too_slow=Sum('too_slow_reps'),
+        )
+        .order_by('exercise_name')
+    )
+    reps = sum(row['reps_sum'] for row in per_exercise)
+    seconds = sum(row['seconds_sum'] for row in per_exercise)
+    return {
+        "too_fast": sum(row['too_fast'] for row in per_exercise),
+        "good": sum(row['good'] for row in per_exercise),
+        "too_slow": sum(row['too_slow'] for row in per_exercise),
+        "average_seconds_per_rep": round(seconds / reps, 2) if reps else None,
+        "exercises": [
+            {
+                "exercise": row['exercise_name'],
+                "reps": row['reps_sum'],
+                "seconds_per_rep": round(row['seconds_sum'] / row['reps_sum'], 2),
+            }
+            for row in per_exercise if row['reps_sum']
+        ],
+    }
 
 
 class FitnessAnalyticsAPIView(APIView):
@@ -18,54 +144,152 @@ class FitnessAnalyticsAPIView(APIView):
     - Average form accuracy (overall)
     - Average accuracy over time (for charting)
     - Average accuracy per exercise
+
+    Reads from the UserDailyStats / UserExerciseStats rollups in two queries,
+    so the cost depends on the number of days and exercises shown, not on
+    every set logged. The response is cached per user until their sessions
+    or set logs change (see pace.cache).
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         user = request.user
 
-        # --- 1️⃣ Total number of workouts ---
-        total_workouts = WorkoutSession.objects.filter(user=user, completed=True).count()
-
-        # --- 2️⃣ Total time trained ---
-        total_duration = (
-            WorkoutSession.objects.filter(user=user, completed=True)
-            .aggregate(Sum('duration'))['duration__sum']
-            or timedelta(seconds=0)
-        )
+        generation, cached = get_cached_analytics(user.id)
+        if cached is not None:
+            return Response(cached, status=status.HTTP_200_OK)
 
-        # --- 3️⃣ Average accuracy (overall) ---
-        avg_accuracy = (
-            ExerciseSetLog.objects.filter(session__user=user)
-            .aggregate(Avg('score'))['score__avg']
-            or 0
-        )
+        # --- 1️⃣ / 2️⃣ / 3️⃣ Totals (one statement) ---
+        totals = analytics_totals(user)
 
-        # --- 4️⃣ Accuracy over time (for chart) ---
-        accuracy_over_time = list(
-            ExerciseSetLog.objects.filter(session__user=user)
-            .annotate(date=TruncDate('session__date'))
-            .values('date')
-            .annotate(avg_accuracy=Avg('score'))
-            .order_by('date')
-        )
-
-        # --- 5️⃣ Average accuracy per exercise ---
-        accuracy_per_exercise = list(
-            ExerciseSetLog.objects.filter(session__user=user)
-            .values('exercise__name')
-            .annotate(avg_accuracy=Avg('score'))
-            .order_by('exercise__name')
-        )
+        # --- 4️⃣ / 5️⃣ Accuracy over time and per exercise (one statement) ---
+        accuracy_over_time, accuracy_per_exercise = analytics_series(user)
 
         # --- 🧾 Combine all results ---
         data = {
-            "total_workouts": total_workouts,
-            "total_time_trained": str(total_duration),
-            "average_accuracy": round(avg_accuracy, 2),
+            "total_workouts": totals['total_workouts'],
+            "total_time_trained": str(totals['total_duration']),
+            "average_accuracy": round(totals['average_accuracy'], 2),
             "accuracy_over_time": accuracy_over_time,
             "accuracy_per_exercise": accuracy_per_exercise,
         }
 
         serializer = FitnessAnalyticsSerializer(data)
+        set_cached_analytics(user.id, generation, serializer.data)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class AccuracyTrendAPIView(APIView):
+    """
+    GET: Average form accuracy per day over the last ``days`` days
+    (default 30, at most 365), oldest first.
+
+    Range-scans the user's daily rollups, so the cost and payload size are
+    bounded by the window rather than the user's full history.
+    """
+    permission_classes = [IsAuthenticated]
+    DEFAULT_DAYS = 30
+    MAX_DAYS = 365
+
+    def get(self, request):
+        days = window_param(request, "days", self.DEFAULT_DAYS, self.MAX_DAYS)
+        start = timezone.localdate() - timedelta(days=days - 1)
+
+        rows = (
+            UserDailyStats.objects
+            .filter(user=request.user, date__gte=start, score_count__gt=0)
+            .values_list('date', 'score_sum', 'score_count')
+            .order_by('date')
+        )
+        data = [
+            {"date": day, "accuracy": round(score_sum / score_count, 2)}
+            for day, score_sum, score_count in rows
+        ]
+        return Response(AccuracyTrendSerializer(data, many=True).data, status=status.HTTP_200_OK)
+
+
+class WeeklyVolumeAPIView(APIView):
+    """
+    GET: Training volume per ISO week over the last ``weeks`` weeks
+    (default 4, at most 520), broken down by exercise, oldest first.
+    Weeks without any logged sets are omitted.
+    """
+    permission_classes = [IsAuthenticated]
+    DEFAULT_WEEKS = 4
+    MAX_WEEKS = 520
+
+    def get(self, request):
+        weeks = window_param(request, "weeks", self.DEFAULT_WEEKS, self.MAX_WEEKS)
+        today = timezone.localdate()
+        start = today - timedelta(days=today.weekday(), weeks=weeks - 1)
+
+        data = []
+        for week, exercise_name, volume in weekly_volume(request.user, start):
+            if not data or data[-1]["date"] != week:
+                data.append({"date": week, "exercises": {}, "total": 0})
+            data[-1]["exercises"][exercise_name] = round(volume, 2)
+            data[-1]["total"] = round(data[-1]["total"] + volume, 2)
+
+        return Response(WeeklyVolumeSerializer(data, many=True).data, status=status.HTTP_200_OK)
+
+
+class RepSpeedAPIView(APIView):
+    """
+    GET: Rep tempo (seconds per rep) from sets that recorded both reps and
+    duration.
+    - ``?session_id=<id>``: one session, per exercise and per set
+    - no parameter: the user's whole history, per exercise
+
+    Both read the per-session SessionTempoStats rollups; only the per-set
+    breakdown of a single session touches its set logs.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        session_id = request.query_params.get("session_id")
+
+        if session_id is None:
+            data = rep_speed(SessionTempoStats.objects.filter(session__user=request.user))
+            return Response(RepSpeedSerializer(data).data, status=status.HTTP_200_OK)
+
+        try:
+            session = WorkoutSession.objects.get(id=session_id, user=request.user)
+        except (WorkoutSession.DoesNotExist, ValueError):
+            return Response({"detail": "Session not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        data = rep_speed(SessionTempoStats.objects.filter(session=session))
+        data["session_id"] = session.id
+        data["sets"] = [
+            {
+                "exercise": exercise_name,
+                "set_number": set_number,
+                "reps": reps,
+                "seconds_per_rep": round(seconds / reps, 2),
+            }
+            for exercise_name, set_number, reps, seconds in (
+                ExerciseSetLog.objects
+                .filter(session=session, reps_completed__gt=0, duration_seconds__gt=0)
+                .values_list('exercise__definition__name', 'set_number', 'reps_completed', 'duration_seconds')
+                .order_by('exercise__order', 'set_number')
+            )
+        ]
+        return Response(RepSpeedSerializer(data).data, status=status.HTTP_200_OK)
+
+
+class CohortAnalyticsAPIView(APIView):
+    """
+    GET (staff only): Population statistics across all users over the last
+    ``weeks`` weeks (default 12, at most 104):
+    - Score distribution per exercise
+    - Adherence by fitness level and fitness goal
+    - Week-over-week retention
+
+    Computed by pace.analytics.cohort in bounded memory.
+    """
+    permission_classes = [IsAdminUser]
+    DEFAULT_WEEKS = 12
+    MAX_WEEKS = 104
+
+    def get(self, request):
+        weeks = window_param(request, "weeks", self.DEFAULT_WEEKS, self.MAX_WEEKS)
+        return Response(cohort_report(weeks), status=status.HTTP_200_OK)
@@ -0,0 +1,37 @@
+import hashlib
+
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(request, validator):
+    """Weak ETag for ``validator`` (any repr-able value) as seen by ``request.user``."""
+    digest = hashlib.md5(repr((request.user.pk, validator)).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"'
+
+
+def conditional_get(request, validator, build):
+    """
+    Answer a GET with ``304 Not Modified`` when the client's ``If-None-Match``
+    matches ``validator``, otherwise with ``build()`` tagged with its ETag.
+
+    ``validator`` comes from one cheap query (a change counter or
+    ``updated_at``) made *before* ``build`` reads the data, so a concurrent
+    write can only make the ETag older than the body, never newer. ``None``
+    (e.g. the object does not exist) skips validation.
+    """
+    if validator is None:
+        return build()
+
+    etag = make_etag(request, validator)
+    client_etags = parse_etags(request.headers.get("If-None-Match", ""))
+    if "*" in client_etags or any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in client_etags):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = build()
+    if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+        response["ETag"] = etag
+        # Let browsers keep the body but revalidate on every use
+        response["Cache-Control"] = "private, no-cache"
+    return response
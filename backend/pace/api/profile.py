@@ -4,6 +4,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from pace.models import FitnessProfile
+from pace.api.conditional import conditional_get
+from datetime import date
 
 class ProfileAPIView(APIView):
     permission_classes = [IsAuthenticated]
@@ -11,14 +13,21 @@ class ProfileAPIView(APIView):
     def get(self, request):
         """
         Retrieve the logged-in user's fitness profile info.
+        Supports ``If-None-Match`` against the profile's change counter.
         """
-        try:
-            profile = FitnessProfile.objects.get(user=request.user)
-        except FitnessProfile.DoesNotExist:
-            return Response({"error": "Fitness profile not found."}, status=status.HTTP_404_NOT_FOUND)
+        version = FitnessProfile.objects.filter(user=request.user).values_list('version', flat=True).first()
+
+        def build():
+            try:
+                profile = FitnessProfile.objects.get(user=request.user)
+            except FitnessProfile.DoesNotExist:
+                return Response({"error": "Fitness profile not found."}, status=status.HTTP_404_NOT_FOUND)
+
+            serializer = FitnessProfileSerializer(profile)
+            return Response(serializer.data, status=status.HTTP_200_OK)
 
-        serializer = FitnessProfileSerializer(profile)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # ``age`` is derived from today's date
+        return conditional_get(request, None if version is None else (version, date.today()), build)
 
 
 class UpdateProfileAPIView(APIView):
@@ -0,0 +1,187 @@
+from datetime import date
+
+from django.db import IntegrityError, transaction
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+
+from pace.models import Exercise, ExerciseSetLog, WorkoutPlan, WorkoutSession
+from pace.serializers import SyncSessionSerializer, SyncSetLogSerializer
+from pace.signals import (
+    session_contribution, set_log_contribution, sessions_bulk_saved, set_logs_bulk_saved,
+)
+
+
+SESSION_FIELDS = ["plan", "rest_period_seconds", "score", "duration", "completed"]
+SET_LOG_FIELDS = ["exercise", "set_number", "reps_completed", "weight_kg", "duration_seconds", "score"]
+
+
+class SyncError(Exception):
+    """A mutation that cannot be applied; rolls the whole batch back."""
+
+
+class SyncAPIView(APIView):
+    """
+    POST: Apply a batch of mutations queued by an offline client, e.g.
+
+        {"mutations": [
+            {"type": "session.create", "uuid": "...", "plan": 3, "date": "2026-10-14"},
+            {"type": "set_log.upsert", "uuid": "...", "session_uuid": "...",
+             "exercise_id": 7, "set_number": 1, "reps_completed": 10, "score": 91.5},
+            {"type": "session.update", "uuid": "...", "completed": true}
+        ]}
+
+    Rows are keyed by client-generated UUIDs and written with
+    ``INSERT ... ON CONFLICT (uuid) DO UPDATE``, so re-sending a batch after
+    a dropped connection is idempotent. Mutations apply in order and the
+    batch is all-or-nothing. Responds with the server ids of every session
+    and set log the batch touched.
+
+    ``session.create`` may carry the ``date`` the workout took place (it
+    defaults to the day of the sync); it is kept when a create is re-sent
+    and cannot be changed by ``session.update``.
+    """
+    permission_classes = [IsAuthenticated]
+    MAX_MUTATIONS = 1000
+    SERIALIZERS = {
+        "session.create": SyncSessionSerializer,
+        "session.update": SyncSessionSerializer,
+        "set_log.upsert": SyncSetLogSerializer,
+    }
+
+    def post(self, request):
+        mutations = request.data.get("mutations")
+        if not isinstance(mutations, list) or not mutations:
+            return Response({"detail": "No mutations provided."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(mutations) > self.MAX_MUTATIONS:
+            return Response({"detail": f"At most {self.MAX_MUTATIONS} mutations can be synced at once."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        parsed = []
+        for index, mutation in enumerate(mutations):
+            serializer_class = self.SERIALIZERS.get(mutation.get("type") if isinstance(mutation, dict) else None)
+            if serializer_class is None:
+                return Response({"detail": f"Mutation {index} has an unknown type."},
+                                status=status.HTTP_400_BAD_REQUEST)
+            serializer = serializer_class(data=mutation)
+            if not serializer.is_valid():
+                return Response({"detail": f"Mutation {index} is invalid.", "errors": serializer.errors},
+                                status=status.HTTP_400_BAD_REQUEST)
+            parsed.append((mutation["type"], serializer.validated_data))
+
+        try:
+            with transaction.atomic():
+                sessions, set_logs = self.apply(request.user, parsed)
+        except SyncError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except IntegrityError:
+            return Response({"detail": "One or more of these sets are already logged for this session."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "sessions": {str(session.uuid): session.id for session in sessions},
+            "set_logs": {str(log.uuid): log.id for log in set_logs},
+        }, status=status.HTTP_200_OK)
+
+    def apply(self, user, parsed):
+        """
+        Validate ``parsed`` against the current rows with a constant number
+        of queries, then upsert sessions and set logs in one statement each.
+        """
+        session_uuids = {data.get("session_uuid", data["uuid"]) for _, data in parsed}
+        existing_sessions = {
+            session.uuid: session
+            for session in WorkoutSession.objects.select_for_update().filter(uuid__in=session_uuids)
+        }
+        if any(session.user_id != user.id for session in existing_sessions.values()):
+            raise SyncError("One or more sessions were not found.")
+
+        # Replay the session mutations on top of the stored rows
+        session_state = {
+            key: {
+                "date": session.date,
+                **{field: getattr(session, f"{field}_id" if field == "plan" else field) for field in SESSION_FIELDS},
+            }
+            for key, session in existing_sessions.items()
+        }
+        log_state = {}
+        for kind, data in parsed:
+            if kind == "set_log.upsert":
+                if data["session_uuid"] not in session_state:
+                    raise SyncError(f"Session {data['session_uuid']} was not found.")
+                log_state[data["uuid"]] = data
+                continue
+            if kind == "session.update" and data["uuid"] not in session_state:
+                raise SyncError(f"Session {data['uuid']} was not found.")
+            if kind == "session.update" and "date" in data:
+                raise SyncError(f"The date of session {data['uuid']} can only be set when it is created.")
+            state = session_state.setdefault(data["uuid"], {
+                "date": data.get("date", date.today()),
+                "plan": None, "rest_period_seconds": None, "score": None, "duration": None, "completed": False,
+            })
+            state.update({field: value for field, value in data.items() if field in SESSION_FIELDS})
+
+        plan_ids = {state["plan"] for state in session_state.values()} - {None}
+        plans = {plan.id: plan for plan in WorkoutPlan.objects.filter(id__in=plan_ids, user=user)}
+        if plans.keys() != plan_ids:
+            raise SyncError("One or more workout plans were not found.")
+
+        existing_logs = {
+            log.uuid: log
+            for log in ExerciseSetLog.objects.select_related("session", "exercise").filter(uuid__in=log_state)
+        }
+        exercises = {exercise.id: exercise for exercise in Exercise.objects.select_related("definition").filter(workout_plan_id__in=plan_ids)}
+        for key, data in log_state.items():
+            existing = existing_logs.get(key)
+            if existing and existing.session.uuid != data["session_uuid"]:
+                raise SyncError(f"Set log {key} belongs to another session.")
+            plan_id = session_state[data["session_uuid"]]["plan"]
+            if plan_id is None:
+                raise SyncError(f"Session {data['session_uuid']} has no associated plan.")
+            exercise = exercises.get(data["exercise_id"])
+            if exercise is None or exercise.workout_plan_id != plan_id:
+                raise SyncError(f"Exercise {data['exercise_id']} is not part of the plan '{plans[plan_id].name}'.")
+            data["exercise"] = exercise
+
+        # --- Sessions: one upsert, then the signal side effects for the batch ---
+        WorkoutSession.objects.bulk_create(
+            [
+                WorkoutSession(user=user, uuid=key, date=state["date"], plan=plans.get(state["plan"]),
+                               **{field: state[field] for field in SESSION_FIELDS if field != "plan"})
+                for key, state in session_state.items()
+            ],
+            update_conflicts=True, unique_fields=["uuid"], update_fields=SESSION_FIELDS,
+        )
+        sessions = {session.uuid: session for session in WorkoutSession.objects.filter(uuid__in=session_state)}
+        sessions_bulk_saved(sessions.values(), {
+            key: session_contribution(session.user_id, session.date, session.completed, session.duration)
+            for key, session in existing_sessions.items()
+        })
+
+        # --- Set logs: one upsert, then rollups/completion per session ---
+        logs = ExerciseSetLog.objects.bulk_create(
+            [
+                ExerciseSetLog(uuid=key, session=sessions[data["session_uuid"]],
+                               **{field: data.get(field) for field in SET_LOG_FIELDS})
+                for key, data in log_state.items()
+            ],
+            update_conflicts=True, unique_fields=["uuid"], update_fields=SET_LOG_FIELDS,
+        )
+        by_session = {}
+        for log in logs:
+            by_session.setdefault(log.session.uuid, ([], [], []))[0].append(log)
+        for log in existing_logs.values():
+            _, previous, previous_exercise_ids = by_session[log.session.uuid]
+            previous.append(set_log_contribution(
+                log.session.user_id, log.session_id, log.session.date, log.exercise.definition_id,
+                log.score, log.reps_completed, log.weight_kg, log.duration_seconds,
+            ))
+            previous_exercise_ids.append(log.exercise_id)
+        for key, (session_logs, previous, previous_exercise_ids) in by_session.items():
+            set_logs_bulk_saved(sessions[key], session_logs, previous, previous_exercise_ids)
+
+        set_log_ids = dict(ExerciseSetLog.objects.filter(uuid__in=log_state).values_list("uuid", "id"))
+        for log in logs:
+            log.id = set_log_ids[log.uuid]
+        return list(sessions.values()), logs
@@ -1,23 +1,120 @@
+import csv
+import tempfile
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Avg, Sum, Count
-from pace.models import WorkoutSession, ExerciseSetLog, WorkoutPlan, Exercise
-from pace.serializers import WorkoutSessionSerializer, ExerciseSetLogSerializer
+from rest_framework.exceptions import ParseError
+from rest_framework.utils.urls import replace_query_param
+from django.db.models import Avg, Sum, Count, Prefetch, Q, prefetch_related_objects
+from pace.models import WorkoutSession, ExerciseSetLog, WorkoutPlan, Exercise, RepLog, FitnessProfile
+from pace.serializers import (
+    WorkoutSessionSerializer, WorkoutSessionSummarySerializer, ExerciseSetLogSerializer, ExerciseSetLogItemSerializer,
+    RepLogSerializer,
+)
+from pace.fast_serializers import (
+    FastExerciseSetLogListSerializer, FastWorkoutSessionListSerializer, FastWorkoutSessionSummaryListSerializer,
+)
+from pace.api.analytics import window_param
+from pace.api.conditional import conditional_get
 from django.utils import timezone
+from django.http import StreamingHttpResponse
+from django.db import IntegrityError, transaction
+from pace.signals import set_logs_bulk_saved
+import xlsxwriter
+
+
+def encode_cursor(day, session_id):
+    """Opaque keyset cursor pointing just after session ``session_id`` of ``day`` (a date or ISO string) in (-date, -id) order."""
+    return urlsafe_b64encode(f"{day}|{session_id}".encode()).decode()
+
+
+def sessions_version(user):
+    """The user's session change counter (ETag validator for session reads)."""
+    return FitnessProfile.objects.filter(user=user).values_list("sessions_version", flat=True).first()
+
+
+def decode_cursor(cursor):
+    try:
+        day, session_id = urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return date.fromisoformat(day), int(session_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ParseError("Invalid cursor.")
 
 
 class WorkoutSessionListCreateAPIView(APIView):
     """
-    List all sessions for the logged-in user, or create a new session.
+    List the logged-in user's sessions (newest first), or create a new session.
+
+    GET is keyset-paginated on (date, id): ``?cursor=`` continues after the
+    previous page and ``?page_size=`` (default 20, at most 100) sets its
+    length, so a page costs the same however long the history is.
+    Each row carries the session's ``summary`` snapshot once it is
+    completed. ``?include=logs`` returns full session details instead,
+    taken from the snapshots where they exist. A page is at most two
+    queries: the sessions with their plans and summaries, and the logs (with
+    exercises) of sessions that have no snapshot yet.
+
+    Response: ``{"next": <url or null>, "results": [...]}``. Supports
+    ``If-None-Match`` against the user's session change counter.
+
+    Pages are rendered by the fast serializers (see pace.fast_serializers);
+    set them to ``None`` to use the regular ones.
     """
     permission_classes = [IsAuthenticated]
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+    fast_serializer_class = FastWorkoutSessionSummaryListSerializer
+    fast_logs_serializer_class = FastWorkoutSessionListSerializer
 
     def get(self, request):
-        sessions = WorkoutSession.objects.filter(user=request.user).order_by("-date")
-        serializer = WorkoutSessionSerializer(sessions, many=True)
-        return Response(serializer.data)
+        version = sessions_version(request.user)
+        validator = None if version is None else (request.get_full_path(), version)
+        return conditional_get(request, validator, lambda: self.list(request))
+
+    def list(self, request):
+        page_size = window_param(request, "page_size", self.DEFAULT_PAGE_SIZE, self.MAX_PAGE_SIZE)
+        include_logs = "logs" in request.query_params.get("include", "").split(",")
+
+        sessions = (
+            WorkoutSession.objects.filter(user=request.user)
+            .select_related("plan", "summary")
+            .order_by("-date", "-id")
+        )
+        if not include_logs:
+            sessions = sessions.defer("summary__payload")
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            day, session_id = decode_cursor(cursor)
+            sessions = sessions.filter(Q(date__lt=day) | Q(date=day, id__lt=session_id))
+
+        sessions = sessions[:page_size + 1]
+        if include_logs and self.fast_logs_serializer_class:
+            results = self.fast_logs_serializer_class(sessions, snapshots=True).data
+        elif not include_logs and self.fast_serializer_class:
+            results = self.fast_serializer_class(sessions).data
+        else:
+            results = self.serialize(list(sessions), include_logs)
+
+        next_url = None
+        if len(results) > page_size:
+            results = results[:page_size]
+            cursor = encode_cursor(results[-1]["date"], results[-1]["id"])
+            next_url = replace_query_param(request.build_absolute_uri(), "cursor", cursor)
+        return Response({"next": next_url, "results": results})
+
+    def serialize(self, page, include_logs):
+        if not include_logs:
+            return WorkoutSessionSummarySerializer(page, many=True).data
+
+        live = [session for session in page if not hasattr(session, "summary")]
+        prefetch_related_objects(
+            live, Prefetch("exercisesetlog_set", queryset=ExerciseSetLog.objects.select_related("exercise__definition"))
+        )
+        live_data = dict(zip(live, WorkoutSessionSerializer(live, many=True).data))
+        return [live_data[session] if session in live_data else session.summary.payload for session in page]
 
     def post(self, request):
         plan_id = request.data.get("plan_id")
@@ -41,9 +138,100 @@ class WorkoutSessionListCreateAPIView(APIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+class WorkoutSessionExportAPIView(APIView):
+    """
+    GET ?format=csv|xlsx: Download the user's full training history, one row
+    per set log (sessions without logs get a single row).
+
+    Rows are read through a server-side cursor and streamed to the client,
+    so memory use does not grow with the length of the history.
+    """
+    permission_classes = [IsAuthenticated]
+
+    COLUMNS = [
+        ("session_id", "id"),
+        ("date", "date"),
+        ("plan", "plan__name"),
+        ("completed", "completed"),
+        ("session_duration_seconds", "duration"),
+        ("session_score", "score"),
+        ("exercise", "exercisesetlog__exercise__definition__name"),
+        ("set_number", "exercisesetlog__set_number"),
+        ("reps_completed", "exercisesetlog__reps_completed"),
+        ("weight_kg", "exercisesetlog__weight_kg"),
+        ("set_duration_seconds", "exercisesetlog__duration_seconds"),
+        ("set_score", "exercisesetlog__score"),
+    ]
+    CHUNK_SIZE = 2000
+    FILE_CHUNK_SIZE = 64 * 1024
+
+    def perform_content_negotiation(self, request, force=False):
+        # ``?format=`` picks the file type here, not a DRF renderer
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request):
+        export_format = request.query_params.get("format", "csv")
+        if export_format not in ("csv", "xlsx"):
+            return Response({"detail": "format must be 'csv' or 'xlsx'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = self.iter_rows(request.user)
+        filename = f"pace-history-{timezone.localdate().isoformat()}.{export_format}"
+        if export_format == "csv":
+            response = StreamingHttpResponse(self.stream_csv(rows), content_type="text/csv")
+        else:
+            response = StreamingHttpResponse(
+                self.stream_xlsx(rows),
+                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    def iter_rows(self, user):
+        sessions = (
+            WorkoutSession.objects.filter(user=user)
+            .order_by("date", "id", "exercisesetlog__exercise__order", "exercisesetlog__set_number")
+            .values_list(*(field for _, field in self.COLUMNS))
+        )
+        for row in sessions.iterator(chunk_size=self.CHUNK_SIZE):
+            # DurationField → seconds so both formats get a plain number
+            duration = row[4]
+            yield row[:4] + (duration.total_seconds() if duration is not None else None,) + row[5:]
+
+    def stream_csv(self, rows):
+        class Echo:
+            def write(self, value):
+                return value
+
+        writer = csv.writer(Echo())
+        yield writer.writerow([header for header, _ in self.COLUMNS])
+        for row in rows:
+            yield writer.writerow(row)
+
+    def stream_xlsx(self, rows):
+        # XLSX is a zip archive that can only be finalised once every row is
+        # known, so rows go to a constant-memory worksheet backed by a temp
+        # file, which is then streamed back in chunks.
+        with tempfile.TemporaryFile() as output:
+            workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+            worksheet = workbook.add_worksheet("History")
+            date_format = workbook.add_format({"num_format": "yyyy-mm-dd"})
+            worksheet.write_row(0, 0, [header for header, _ in self.COLUMNS])
+            for row_number, row in enumerate(rows, start=1):
+                worksheet.write_number(row_number, 0, row[0])
+                worksheet.write_datetime(row_number, 1, row[1], date_format)
+                worksheet.write_row(row_number, 2, row[2:])
+            workbook.close()
+
+            output.seek(0)
+            while chunk := output.read(self.FILE_CHUNK_SIZE):
+                yield chunk
+
+
 class WorkoutSessionDetailAPIView(APIView):
     """
     Retrieve, update (PATCH), or delete a specific session.
+
+    A completed session is served from its SessionSummary snapshot.
     """
     permission_classes = [IsAuthenticated]
 
@@ -54,11 +242,17 @@ class WorkoutSessionDetailAPIView(APIView):
             return None
 
     def get(self, request, session_id):
-        session = self.get_object(session_id)
-        if not session:
-            return Response({"detail": "Session not found."}, status=status.HTTP_404_NOT_FOUND)
-        serializer = WorkoutSessionSerializer(session)
-        return Response(serializer.data)
+        def build():
+            session = WorkoutSession.objects.filter(id=session_id, user=request.user).select_related("summary").first()
+            if not session:
+                return Response({"detail": "Session not found."}, status=status.HTTP_404_NOT_FOUND)
+            if hasattr(session, "summary"):
+                return Response(session.summary.payload)
+            serializer = WorkoutSessionSerializer(session)
+            return Response(serializer.data)
+
+        version = sessions_version(request.user)
+        return conditional_get(request, None if version is None else (session_id, version), build)
 
     def patch(self, request, session_id):
         session = self.get_object(session_id)
@@ -86,6 +280,7 @@ class ExerciseSetLogListCreateAPIView(APIView):
     List all set logs for a session, or create new logs.
     """
     permission_classes = [IsAuthenticated]
+    fast_serializer_class = FastExerciseSetLogListSerializer
 
     def get(self, request, session_id):
         try:
@@ -94,43 +289,65 @@ class ExerciseSetLogListCreateAPIView(APIView):
             return Response({"detail": "Session not found."}, status=status.HTTP_404_NOT_FOUND)
 
         logs = ExerciseSetLog.objects.filter(session=session)
-        serializer = ExerciseSetLogSerializer(logs, many=True)
+        if self.fast_serializer_class:
+            return Response(self.fast_serializer_class(logs).data)
+        serializer = ExerciseSetLogSerializer(logs.select_related("exercise__definition"), many=True)
         return Response(serializer.data)
 
     def post(self, request, session_id):
         try:
-            session = WorkoutSession.objects.get(id=session_id, user=request.user)
+            session = WorkoutSession.objects.select_related("plan").get(id=session_id, user=request.user)
         except WorkoutSession.DoesNotExist:
             return Response({"detail": "Session not found."}, status=status.HTTP_404_NOT_FOUND)
 
         if not session.plan:
             return Response({"detail": "This session has no associated plan."}, status=status.HTTP_400_BAD_REQUEST)
 
-        plan_exercise_ids = session.plan.exercises.values_list("id", flat=True)
         data = request.data.get("sets", [])
 
         if not data:
             return Response({"detail": "No sets provided."}, status=status.HTTP_400_BAD_REQUEST)
 
-        created_logs = []
-        for item in data:
-            exercise_id = item.get("exercise_id")
-            if exercise_id not in plan_exercise_ids:
+        items = ExerciseSetLogItemSerializer(data=data, many=True)
+        if not items.is_valid():
+            return Response({"sets": items.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Validate the whole batch against the plan up front (one query)
+        plan_exercises = {exercise.id: exercise for exercise in session.plan.exercises.select_related("definition")}
+        new_logs = []
+        seen = set()
+        for item in items.validated_data:
+            exercise_id = item.pop("exercise_id")
+            if exercise_id not in plan_exercises:
                 return Response(
                     {"detail": f"Exercise {exercise_id} is not part of the plan '{session.plan.name}'."},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            log = ExerciseSetLog.objects.create(
-                session=session,
-                exercise_id=exercise_id,
-                set_number=item.get("set_number"),
-                reps_completed=item.get("reps_completed"),
-                weight_kg=item.get("weight_kg"),
-                duration_seconds=item.get("duration_seconds"),
-                score=item.get("score"),
+            set_number = item["set_number"]
+            if (exercise_id, set_number) in seen:
+                return Response({"detail": f"Set {set_number} of exercise {exercise_id} is listed twice."},
+                                status=status.HTTP_400_BAD_REQUEST)
+            seen.add((exercise_id, set_number))
+
+            new_logs.append(ExerciseSetLog(session=session, exercise=plan_exercises[exercise_id], **item))
+
+        # Insert the batch atomically, then run completion/streak/rollup side effects once
+        try:
+            with transaction.atomic():
+                created_logs = ExerciseSetLog.objects.bulk_create(new_logs)
+                set_logs_bulk_saved(session, created_logs)
+        except IntegrityError:
+            # Only a set that is already logged is the client's doing; anything else is a real error
+            logged = set(
+                session.exercisesetlog_set
+                .filter(exercise_id__in={exercise_id for exercise_id, _ in seen})
+                .values_list("exercise_id", "set_number")
             )
-            created_logs.append(log)
+            if not logged & seen:
+                raise
+            return Response({"detail": "One or more of these sets are already logged for this session."},
+                            status=status.HTTP_400_BAD_REQUEST)
 
         serializer = ExerciseSetLogSerializer(created_logs, many=True)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -170,3 +387,59 @@ class ExerciseSetLogDetailAPIView(APIView):
             return Response({"detail": "Set log not found."}, status=status.HTTP_404_NOT_FOUND)
         log.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class RepLogListCreateAPIView(APIView):
+    """
+    List the per-rep telemetry of a session, or store new reps.
+
+    POST accepts a single rep, a list of reps or ``{"reps": [...]}``; the
+    whole batch is validated in memory and written with one bulk insert, so
+    a full session's reps cost one request instead of one per rep.
+    """
+    permission_classes = [IsAuthenticated]
+    MAX_REPS = 5000
+
+    def get(self, request, session_id):
+        if not WorkoutSession.objects.filter(id=session_id, user=request.user).exists():
+            return Response({"detail": "Session not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        reps = RepLog.objects.filter(session_id=session_id)
+        serializer = RepLogSerializer(reps, many=True)
+        return Response(serializer.data)
+
+    def post(self, request, session_id):
+        if not WorkoutSession.objects.filter(id=session_id, user=request.user).exists():
+            return Response({"detail": "Session not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        data = request.data
+        if isinstance(data, dict):
+            data = data["reps"] if "reps" in data else [data]
+        if not isinstance(data, list) or not data:
+            return Response({"detail": "No reps provided."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(data) > self.MAX_REPS:
+            return Response({"detail": f"At most {self.MAX_REPS} reps can be logged at once."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = RepLogSerializer(data=data, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        new_reps = []
+        seen = set()
+        for item in serializer.validated_data:
+            key = (item["set_number"], item["rep_number"])
+            if key in seen:
+                return Response({"detail": f"Rep {key[1]} of set {key[0]} is listed twice."},
+                                status=status.HTTP_400_BAD_REQUEST)
+            seen.add(key)
+            new_reps.append(RepLog(session_id=session_id, **item))
+
+        try:
+            with transaction.atomic():
+                created_reps = RepLog.objects.bulk_create(new_reps, batch_size=1000)
+        except IntegrityError:
+            return Response({"detail": "One or more of these reps are already logged for this session."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(RepLogSerializer(created_reps, many=True).data, status=status.HTTP_201_CREATED)
@@ -1,14 +1,29 @@
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from pace.models import WorkoutPlan, Exercise
+from pace.models import WorkoutPlan, Exercise, ExerciseDefinition, ranks_between
 from pace.serializers import WorkoutPlanSerializer, ExerciseSerializer
-from django.db import models
+from pace.fast_serializers import FastWorkoutPlanListSerializer
+from pace.api.conditional import conditional_get
+from pace.signals import touch_plans
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, models, transaction
+from django.db.models import Prefetch, Q
 
 import logging
 logger = logging.getLogger(__name__)
 
+# A plan's exercises with their catalog names, in one query for any number of plans
+PLAN_EXERCISES = Prefetch("exercises", queryset=Exercise.objects.select_related("definition"))
+
+
+def list_plans(plans, fast_serializer_class=None):
+    """Serialized ``plans`` with their exercises, by the fast serializer when given."""
+    if fast_serializer_class:
+        return fast_serializer_class(plans).data
+    return WorkoutPlanSerializer(plans.prefetch_related(PLAN_EXERCISES), many=True).data
+
 
 class WorkoutPlanListCreateAPIView(APIView):
     """
@@ -16,17 +31,23 @@ class WorkoutPlanListCreateAPIView(APIView):
     POST: Create a new workout plan.
     """
     permission_classes = [IsAuthenticated]
+    fast_serializer_class = FastWorkoutPlanListSerializer
 
     def get(self, request):
         plans = WorkoutPlan.objects.filter(user=request.user)
-        serializer = WorkoutPlanSerializer(plans, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Adding, editing or deleting a plan (or its exercises) changes the count or latest updated_at
+        validator = plans.aggregate(count=models.Count('id'), updated=models.Max('updated_at'))
+
+        def build():
+            return Response(list_plans(plans, self.fast_serializer_class), status=status.HTTP_200_OK)
+
+        return conditional_get(request, tuple(validator.values()), build)
 
     def post(self, request):
         try:
             data = request.data.copy()
             data['user'] = request.user.id
-            serializer = WorkoutPlanSerializer(data=data)
+            serializer = WorkoutPlanSerializer(data=data, context={"request": request})
             logger.info(
                 f"Creating workout plan with data: {serializer.initial_data}")
             if serializer.is_valid():
@@ -48,16 +69,21 @@ class WorkoutPlanDetailAPIView(APIView):
 
     def get_object(self, pk, user):
         try:
-            return WorkoutPlan.objects.get(pk=pk, user=user)
+            return WorkoutPlan.objects.prefetch_related(PLAN_EXERCISES).get(pk=pk, user=user)
         except WorkoutPlan.DoesNotExist:
             return None
 
     def get(self, request, pk):
-        plan = self.get_object(pk, request.user)
-        if not plan:
-            return Response({"detail": "Workout plan not found."}, status=status.HTTP_404_NOT_FOUND)
-        serializer = WorkoutPlanSerializer(plan)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        updated_at = WorkoutPlan.objects.filter(pk=pk, user=request.user).values_list('updated_at', flat=True).first()
+
+        def build():
+            plan = self.get_object(pk, request.user)
+            if not plan:
+                return Response({"detail": "Workout plan not found."}, status=status.HTTP_404_NOT_FOUND)
+            serializer = WorkoutPlanSerializer(plan)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+
+        return conditional_get(request, updated_at and (pk, updated_at), build)
 
     def put(self, request, pk):
         plan = self.get_object(pk, request.user)
@@ -65,7 +91,7 @@ class WorkoutPlanDetailAPIView(APIView):
             return Response({"detail": "Workout plan not found."}, status=status.HTTP_404_NOT_FOUND)
 
         serializer = WorkoutPlanSerializer(
-            plan, data=request.data, partial=True)
+            plan, data=request.data, partial=True, context={"request": request})
         if serializer.is_valid():
             serializer.save(user=request.user)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -79,13 +105,60 @@ class WorkoutPlanDetailAPIView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def locked_plan_exercises(plan):
+    """
+    Lock a plan's exercises and return ``({id: rank}, ids in display order)``.
+    Locking serialises concurrent edits of the same plan.
+    """
+    current = dict(Exercise.objects.select_for_update().filter(workout_plan=plan).values_list("id", "order"))
+    sequence = sorted(current, key=lambda pk: (current[pk] is None, current[pk] or 0, pk))
+    return current, sequence
+
+
+def place(sequence, current, placing):
+    """
+    Ranks for the ``placing`` keys of ``sequence`` (the plan in display
+    order), taken from the gaps between their neighbours. If a gap is full,
+    or the plan still has unranked exercises, the whole plan is rebalanced
+    instead (see Exercise.rebalance). Returns ``{key: rank}``.
+    """
+    if any(current[pk] is None for pk in current if pk not in placing):
+        return Exercise.rebalance(sequence, current)
+
+    ranks, run, low = {}, [], None
+    for key in [*sequence, None]:
+        if key in placing:
+            run.append(key)
+            continue
+        high = None if key is None else current[key]
+        if run:
+            spaced = ranks_between(low, high, len(run))
+            if spaced is None:
+                return Exercise.rebalance(sequence, current)
+            ranks.update(zip(run, spaced))
+            run = []
+        low = high
+    return ranks
+
+
+def position_param(value):
+    """A requested 1-based position, or ``None`` when it is not a positive integer."""
+    if isinstance(value, int) and not isinstance(value, bool) and value >= 1:
+        return value
+    return None
+
+
 class WorkoutPlanExerciseAPIView(APIView):
     """
     Manage exercises within a workout plan.
     Supports:
-      - POST → Add exercise(s) with correct order shifting
-      - PUT → Update an exercise's details or order
-      - DELETE → Remove an exercise and reindex the plan
+      - POST → Add exercise(s), optionally at a given position
+      - PUT → Update an exercise's details or position
+      - DELETE → Remove an exercise
+
+    ``order`` in requests and responses is the dense 1-based position in
+    the plan. Each exercise is stored with a sparse rank, so adding, moving
+    or removing one writes only that row.
     """
     permission_classes = [IsAuthenticated]
 
@@ -99,40 +172,40 @@ class WorkoutPlanExerciseAPIView(APIView):
         if not exercises_data:
             return Response({"detail": "No exercises provided."}, status=status.HTTP_400_BAD_REQUEST)
 
-        created_exercises = []
-
+        # Validate the whole batch up front so a bad item never leaves half of it saved
         for item in exercises_data:
-            exercise_name = item.get("name") or item.get("name")
-            sets = item.get("sets")
-            reps = item.get("reps")
-            rest_timer = item.get("rest_timer")
-            order = item.get("order")
-
-            if not exercise_name:
+            if not item.get("name"):
                 return Response({"detail": "Exercise name is required."}, status=status.HTTP_400_BAD_REQUEST)
-
-            # If no order given, append to end
-            if order is None:
-                max_order = Exercise.objects.filter(workout_plan=plan).aggregate(
-                    models.Max('order'))['order__max'] or 0
-                order = max_order + 1
-            else:
-                # Shift down existing exercises if order conflicts
-                Exercise.objects.filter(
+            if item.get("order") is not None and position_param(item["order"]) is None:
+                return Response({"detail": "order must be a positive integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            current, sequence = locked_plan_exercises(plan)
+            # Same result as adding the items one by one: an item without an
+            # order goes last, one with an order goes before the exercise there
+            new_keys = [("new", i) for i in range(len(exercises_data))]
+            for key, item in zip(new_keys, exercises_data):
+                order = item.get("order")
+                sequence.insert(len(sequence) if order is None else min(order, len(sequence) + 1) - 1, key)
+            ranks = place(sequence, current, set(new_keys))
+            definitions = ExerciseDefinition.for_names(dict.fromkeys(item["name"] for item in exercises_data))
+
+            created_exercises = Exercise.objects.bulk_create([
+                Exercise(
                     workout_plan=plan,
-                    order__gte=order
-                ).update(order=models.F('order') + 1)
-
-            workout_exercise = Exercise.objects.create(
-                workout_plan=plan,
-                name=exercise_name,
-                sets=sets,
-                reps=reps,
-                rest_timer=rest_timer,
-                order=order
-            )
-            created_exercises.append(workout_exercise)
-
+                    definition=definitions[item["name"]],
+                    sets=item.get("sets"),
+                    reps=item.get("reps"),
+                    rest_timer=item.get("rest_timer"),
+                    order=ranks[key],
+                )
+                for key, item in zip(new_keys, exercises_data)
+            ])
+            touch_plans(plan.id)  # bulk_create sends no post_save
+
+        positions = {key: i for i, key in enumerate(sequence, start=1)}
+        for key, exercise in zip(new_keys, created_exercises):
+            exercise.position = positions[key]
         serializer = ExerciseSerializer(created_exercises, many=True)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -143,40 +216,30 @@ class WorkoutPlanExerciseAPIView(APIView):
         except WorkoutPlan.DoesNotExist:
             return Response({"detail": "Workout plan not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        try:
-            workout_exercise = Exercise.objects.get(
-                workout_plan=plan, exercise_id=exercise_id)
-        except Exercise.DoesNotExist:
-            return Response({"detail": "Exercise not found in this plan."}, status=status.HTTP_404_NOT_FOUND)
-
-        sets = request.data.get("sets", workout_exercise.sets)
-        reps = request.data.get("reps", workout_exercise.reps)
-        rest_timer = request.data.get(
-            "rest_timer", workout_exercise.rest_timer)
-        new_order = request.data.get("order", workout_exercise.order)
-
-        # Reordering logic
-        if new_order != workout_exercise.order:
-            current_order = workout_exercise.order
-            if new_order < current_order:
-                Exercise.objects.filter(
-                    workout_plan=plan,
-                    order__gte=new_order,
-                    order__lt=current_order
-                ).update(order=models.F('order') + 1)
-            else:
-                Exercise.objects.filter(
-                    workout_plan=plan,
-                    order__gt=current_order,
-                    order__lte=new_order
-                ).update(order=models.F('order') - 1)
-            workout_exercise.order = new_order
-
-        workout_exercise.sets = sets
-        workout_exercise.reps = reps
-        workout_exercise.rest_timer = rest_timer
-        workout_exercise.save()
-
+        new_order = request.data.get("order")
+        if new_order is not None and position_param(new_order) is None:
+            return Response({"detail": "order must be a positive integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            current, sequence = locked_plan_exercises(plan)
+            if exercise_id not in current:
+                return Response({"detail": "Exercise not found in this plan."}, status=status.HTTP_404_NOT_FOUND)
+            workout_exercise = Exercise.objects.select_related("definition").get(id=exercise_id)
+
+            # Moving takes a rank between the new neighbours: only this row changes
+            if new_order is not None:
+                position = min(new_order, len(sequence)) - 1
+                if position != sequence.index(exercise_id):
+                    sequence.remove(exercise_id)
+                    sequence.insert(position, exercise_id)
+                    workout_exercise.order = place(sequence, current, {exercise_id})[exercise_id]
+
+            workout_exercise.sets = request.data.get("sets", workout_exercise.sets)
+            workout_exercise.reps = request.data.get("reps", workout_exercise.reps)
+            workout_exercise.rest_timer = request.data.get("rest_timer", workout_exercise.rest_timer)
+            workout_exercise.save()
+
+        workout_exercise.position = sequence.index(exercise_id) + 1
         serializer = ExerciseSerializer(workout_exercise)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -188,18 +251,163 @@ class WorkoutPlanExerciseAPIView(APIView):
             return Response({"detail": "Workout plan not found."}, status=status.HTTP_404_NOT_FOUND)
 
         try:
-            workout_exercise = Exercise.objects.get(
-                workout_plan=plan, exercise_id=exercise_id)
+            workout_exercise = Exercise.objects.get(workout_plan=plan, id=exercise_id)
         except Exercise.DoesNotExist:
             return Response({"detail": "Exercise not found in this plan."}, status=status.HTTP_404_NOT_FOUND)
 
-        deleted_order = workout_exercise.order
+        # The gap it leaves needs no renumbering: positions are derived from the ranks
         workout_exercise.delete()
+        return Response({"detail": "Exercise removed."}, status=status.HTTP_204_NO_CONTENT)
+
+
+class WorkoutPlanExerciseReorderAPIView(APIView):
+    """
+    PUT {"exercise_ids": [...]}: Reorder a plan's exercises in one go, e.g.
+    after a drag-and-drop in the plan editor.
+
+    ``exercise_ids`` must list every exercise of the plan exactly once, in
+    the new order. The plan is respaced with a single UPDATE inside a
+    transaction; the unique (plan, order) check is deferred to commit, so
+    the intermediate states never collide. Returns the plan's exercises in
+    their new order.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def put(self, request, plan_id):
+        try:
+            plan = WorkoutPlan.objects.get(id=plan_id, user=request.user)
+        except WorkoutPlan.DoesNotExist:
+            return Response({"detail": "Workout plan not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        exercise_ids = request.data.get("exercise_ids")
+        if not isinstance(exercise_ids, list) or not all(
+            isinstance(pk, int) and not isinstance(pk, bool) for pk in exercise_ids
+        ):
+            return Response({"detail": "exercise_ids must be a list of exercise ids."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            current, sequence = locked_plan_exercises(plan)
+            if len(exercise_ids) != len(current) or set(exercise_ids) != current.keys():
+                return Response({"detail": "exercise_ids must list every exercise in the plan exactly once."},
+                                status=status.HTTP_400_BAD_REQUEST)
+            if exercise_ids != sequence:
+                Exercise.rebalance(exercise_ids, current)
+                touch_plans(plan.id)  # a queryset update sends no post_save
+
+        exercises = list(Exercise.objects.filter(workout_plan=plan).select_related("definition"))
+        for position, exercise in enumerate(exercises, start=1):
+            exercise.position = position
+        serializer = ExerciseSerializer(exercises, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class WorkoutPlanTemplateListAPIView(APIView):
+    """
+    GET: The plan template library, i.e. every plan staff have published
+    with ``is_template``. Any of them can be cloned (see below).
+    """
+    permission_classes = [IsAuthenticated]
+    fast_serializer_class = FastWorkoutPlanListSerializer
+
+    def get(self, request):
+        templates = WorkoutPlan.objects.filter(is_template=True)
+        validator = templates.aggregate(count=models.Count('id'), updated=models.Max('updated_at'))
+
+        def build():
+            return Response(list_plans(templates.order_by('name'), self.fast_serializer_class),
+                            status=status.HTTP_200_OK)
+
+        return conditional_get(request, tuple(validator.values()), build)
+
+
+def clonable_plan(pk, user):
+    """A plan ``user`` may copy: one of their own, or a template."""
+    return WorkoutPlan.objects.filter(Q(user=user) | Q(is_template=True), pk=pk).first()
+
+
+def plan_name_param(value):
+    """A requested plan name, ``None`` for the source's name, or ``False`` when invalid."""
+    if value is None:
+        return None
+    if not isinstance(value, str) or not value.strip() or len(value) > WorkoutPlan.NAME_ROOM:
+        return False
+    return value.strip()
 
-        # Shift up remaining exercises
-        Exercise.objects.filter(
-            workout_plan=plan,
-            order__gt=deleted_order
-        ).update(order=models.F('order') - 1)
 
-        return Response({"detail": "Exercise removed and order reindexed."}, status=status.HTTP_204_NO_CONTENT)
+class WorkoutPlanCloneAPIView(APIView):
+    """
+    POST {"name"?}: Copy one of your plans, or a template, into a new plan
+    of your own with the same exercises. The copy is named after the
+    source (or ``name``), with a " (2)"-style suffix if you already have a
+    plan by that name.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        plan = clonable_plan(pk, request.user)
+        if not plan:
+            return Response({"detail": "Workout plan not found."}, status=status.HTTP_404_NOT_FOUND)
+        name = plan_name_param(request.data.get("name"))
+        if name is False:
+            return Response({"detail": f"name must be a non-empty string of at most {WorkoutPlan.NAME_ROOM} characters."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                [copy] = plan.copy_for([request.user], name=name)
+        except IntegrityError:
+            # A concurrent clone took the same name
+            return Response({"detail": "A plan with this name was just created. Please retry."},
+                            status=status.HTTP_409_CONFLICT)
+
+        copy = WorkoutPlan.objects.prefetch_related(PLAN_EXERCISES).get(pk=copy.pk)
+        return Response(WorkoutPlanSerializer(copy).data, status=status.HTTP_201_CREATED)
+
+
+class WorkoutPlanAssignAPIView(APIView):
+    """
+    POST {"user_ids": [...], "name"?}: Staff only. Give each listed user
+    their own copy of a plan (one of yours, or a template), as for clone.
+
+    Every batch is copied in one transaction with a fixed number of
+    queries, so send large rosters in batches of up to MAX_RECIPIENTS.
+    Returns ``[{"id", "user", "name"}]`` for the new plans.
+    """
+    permission_classes = [IsAdminUser]
+    MAX_RECIPIENTS = 500
+
+    def post(self, request, pk):
+        plan = clonable_plan(pk, request.user)
+        if not plan:
+            return Response({"detail": "Workout plan not found."}, status=status.HTTP_404_NOT_FOUND)
+        name = plan_name_param(request.data.get("name"))
+        if name is False:
+            return Response({"detail": f"name must be a non-empty string of at most {WorkoutPlan.NAME_ROOM} characters."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        user_ids = request.data.get("user_ids")
+        if not isinstance(user_ids, list) or not user_ids or not all(
+            isinstance(pk, int) and not isinstance(pk, bool) for pk in user_ids
+        ):
+            return Response({"detail": "user_ids must be a non-empty list of user ids."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        user_ids = list(dict.fromkeys(user_ids))
+        if len(user_ids) > self.MAX_RECIPIENTS:
+            return Response({"detail": f"At most {self.MAX_RECIPIENTS} users per request."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        users = get_user_model().objects.in_bulk(user_ids)
+        missing = [pk for pk in user_ids if pk not in users]
+        if missing:
+            return Response({"detail": f"Unknown user ids: {missing}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                copies = plan.copy_for([users[pk] for pk in user_ids], name=name)
+        except IntegrityError:
+            return Response({"detail": "A plan with this name was just created. Please retry."},
+                            status=status.HTTP_409_CONFLICT)
+
+        return Response([{"id": copy.pk, "user": copy.user_id, "name": copy.name} for copy in copies],
+                        status=status.HTTP_201_CREATED)
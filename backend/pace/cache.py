@@ -0,0 +1,72 @@
+"""
+Per-user cache for analytics responses.
+
+Each user has a generation counter that the pace.signals receivers bump
+whenever one of their sessions or set logs changes. A response is stored
+together with the generation it was computed at and only served while
+that is still the current one, so a bump makes it unreachable at once,
+and one that finishes computing after a bump can never be served. A
+repeat dashboard view costs one cache round trip (a ``get_many`` of the
+generation and the response).
+
+Generations have no expiry (so Redis' ``volatile-*`` eviction policies
+leave them alone), and a missing one is seeded from the clock rather
+than 0: even if it is evicted, it never comes back at a value an older
+response was stored with.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def _generation_key(user_id):
+    return f"pace:analytics:generation:{user_id}"
+
+
+def _response_key(user_id):
+    return f"pace:analytics:response:{user_id}"
+
+
+def get_analytics_generation(user_id):
+    """Return the user's current analytics generation, seeding it if missing."""
+    key = _generation_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_analytics_generation(user_id):
+    """Invalidate the user's cached analytics by moving to a new generation."""
+    key = _generation_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Never seeded (or evicted): a fresh seed is a new generation too
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def get_cached_analytics(user_id):
+    """
+    Return ``(generation, payload)``: the user's current generation and the
+    payload cached for it, or None. Compute a missing payload against that
+    generation.
+    """
+    generation_key, response_key = _generation_key(user_id), _response_key(user_id)
+    cached = cache.get_many([generation_key, response_key])
+    generation = cached.get(generation_key)
+    if generation is None:
+        return get_analytics_generation(user_id), None
+    stored_generation, payload = cached.get(response_key, (None, None))
+    return generation, payload if stored_generation == generation else None
+
+
+def set_cached_analytics(user_id, generation, data):
+    """Cache ``data`` computed at ``generation``."""
+    cache.set(
+        _response_key(user_id),
+        (generation, data),
+        timeout=settings.PACE_ANALYTICS_CACHE_TIMEOUT,
+    )
@@ -0,0 +1,223 @@
+"""
+Read-only fast paths for the heaviest list endpoints.
+
+A DRF ``ModelSerializer`` builds a model instance per row and then a
+bound field per attribute, which dominates a request once a user has
+thousands of plans, sessions or set logs. The serializers here render the
+same JSON straight from ``.values_list()`` rows instead.
+
+Each one is a twin of a regular serializer (``serializer_class``): its
+fields, their sources and their output formats are read from that
+serializer once per class, so the two cannot drift apart. Flat fields and
+nested one-to-one serializers come from a single query; fields listed in
+``computed`` (nested lists, method fields) are left ``None`` for
+``fill()``, which adds them with one more query per level.
+
+Views pick them with a ``fast_serializer_class`` attribute; set it to
+``None`` to fall back to the regular serializer.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F
+from rest_framework import serializers
+from rest_framework.fields import empty
+
+from pace.models import Exercise, ExerciseSetLog
+from pace.serializers import (
+    ExerciseSerializer, ExerciseSetLogSerializer, WorkoutPlanSerializer,
+    WorkoutSessionSerializer, WorkoutSessionSummarySerializer,
+)
+
+
+# Fields whose to_representation() returns a database value unchanged
+PASSTHROUGH_FIELDS = (
+    serializers.IntegerField, serializers.CharField, serializers.BooleanField,
+    serializers.PrimaryKeyRelatedField, serializers.ReadOnlyField,
+)
+
+
+def converter(field):
+    """How to turn a non-null database value into ``field``'s output (``None``: as is)."""
+    if isinstance(field, PASSTHROUGH_FIELDS):
+        return None
+    if isinstance(field, serializers.JSONField) and not field.binary:
+        return None
+    if isinstance(field, serializers.FloatField):
+        return float
+    if isinstance(field, serializers.UUIDField) and field.uuid_format == "hex_verbose":
+        return str
+    return field.to_representation
+
+
+class Layout:
+    """
+    How to render one serializer from ``values_list(*lookups)`` rows.
+
+    The serializer's fields line up with the lookups from ``offset`` on, so
+    a row becomes ``dict(zip(names, row))`` and only the fields that need
+    converting are touched afterwards. A computed field holds a placeholder
+    (the primary key) until it is reset to ``None``; a nested one-to-one
+    holds the related primary key (``None``: no related row), and its own
+    lookups follow those of its parent.
+
+    Like DRF, a field whose dotted source runs into a missing related
+    object (``plan.name`` without a plan) is left out of the output; the
+    intermediate relations are fetched to tell that apart from a null value.
+    """
+
+    def __init__(self, serializer, computed=(), prefix="", lookups=None):
+        self.lookups = [] if lookups is None else lookups
+        self.offset = len(self.lookups)
+        self.names, self.conversions, self.computed, self.optional, self.nested = [], [], [], [], []
+        nested, optional = [], []
+        for name, field in serializer.fields.items():
+            self.names.append(name)
+            if name in computed:
+                self.lookups.append(prefix + "pk")
+                self.computed.append(name)
+                continue
+            source = prefix + field.source.replace(".", "__")
+            if isinstance(field, serializers.BaseSerializer) and not isinstance(field, serializers.ListSerializer):
+                self.lookups.append(source + "__pk")
+                nested.append((name, field, source + "__"))
+            elif isinstance(field, (serializers.ListSerializer, serializers.SerializerMethodField)):
+                raise ImproperlyConfigured(
+                    f"{type(serializer).__name__}.{name} cannot be read from a values() row; list it in `computed`.")
+            else:
+                self.lookups.append(source)
+                how = converter(field)
+                if how is not None:
+                    self.conversions.append((name, how))
+                if "." in field.source and field.default is empty and not field.allow_null and not field.required:
+                    parts = source.split("__")
+                    optional.append((name, ["__".join(parts[:i]) for i in range(1, len(parts))]))
+        for name, relations in optional:
+            self.optional.append((name, range(len(self.lookups), len(self.lookups) + len(relations))))
+            self.lookups.extend(relations)
+        for name, field, prefix in nested:
+            self.nested.append((name, Layout(field, prefix=prefix, lookups=self.lookups)))
+
+    def render(self, row):
+        record = dict(zip(self.names, row[self.offset:] if self.offset else row))
+        for name, how in self.conversions:
+            value = record[name]
+            if value is not None:
+                record[name] = how(value)
+        for name in self.computed:
+            record[name] = None
+        for name, relations in self.optional:
+            if record[name] is None and any(row[index] is None for index in relations):
+                del record[name]
+        for name, layout in self.nested:
+            if record[name] is not None:
+                record[name] = layout.render(row)
+        return record
+
+    def values_list(self, queryset, *extra):
+        # F() columns get positional aliases, which cannot shadow a field named in the queryset's ordering
+        return queryset.values_list(*(F(lookup) for lookup in (*self.lookups, *extra)))
+
+
+class FastListSerializer:
+    """
+    Read-only, list-only stand-in for ``serializer_class(queryset, many=True)``.
+
+    ``extra`` lookups are fetched alongside each row and returned by
+    ``rows()`` (e.g. the parent id needed to group nested rows).
+    """
+    serializer_class = None
+    computed = ()
+
+    def __init__(self, queryset, extra=()):
+        self.queryset = queryset
+        self.extra = tuple(extra)
+
+    @classmethod
+    def layout(cls):
+        if "_layout" not in cls.__dict__:
+            cls._layout = Layout(cls.serializer_class(), cls.computed)
+        return cls._layout
+
+    def rows(self):
+        """``[(record, extras)]`` in queryset order, with the computed fields filled."""
+        layout = self.layout()
+        first_extra = len(layout.lookups)
+        rows = [(layout.render(row), row[first_extra:])
+                for row in layout.values_list(self.queryset, *self.extra)]
+        self.fill([record for record, _ in rows])
+        return rows
+
+    def fill(self, records):
+        """Set the ``computed`` fields of ``records``."""
+
+    @property
+    def data(self):
+        return [record for record, _ in self.rows()]
+
+
+class FastExerciseListSerializer(FastListSerializer):
+    """ExerciseSerializer; the caller sets each ``order`` (the position in its plan)."""
+    serializer_class = ExerciseSerializer
+    computed = ("order",)
+
+
+class FastWorkoutPlanListSerializer(FastListSerializer):
+    serializer_class = WorkoutPlanSerializer
+    computed = ("exercises",)
+
+    def fill(self, records):
+        by_plan = {}
+        for record in records:
+            record["exercises"] = by_plan[record["id"]] = []
+        if not by_plan:
+            return
+        exercises = FastExerciseListSerializer(
+            Exercise.objects.filter(workout_plan__in=list(by_plan)), extra=("workout_plan_id",))
+        for exercise, (plan_id,) in exercises.rows():
+            plan_exercises = by_plan[plan_id]
+            plan_exercises.append(exercise)
+            exercise["order"] = len(plan_exercises)
+
+
+class FastExerciseSetLogListSerializer(FastListSerializer):
+    serializer_class = ExerciseSetLogSerializer
+
+
+class FastWorkoutSessionListSerializer(FastListSerializer):
+    """
+    WorkoutSessionSerializer. With ``snapshots``, a completed session is
+    served from its SessionSummary payload (the same JSON, frozen at
+    completion) and only live sessions have their logs read.
+    """
+    serializer_class = WorkoutSessionSerializer
+    computed = ("logs",)
+
+    def __init__(self, queryset, snapshots=False):
+        super().__init__(queryset, extra=("summary__payload",) if snapshots else ())
+
+    def rows(self):
+        layout = self.layout()
+        rows, live = [], []
+        for row in layout.values_list(self.queryset, *self.extra):
+            payload = row[-1] if self.extra else None
+            if payload is None:
+                payload = layout.render(row)
+                live.append(payload)
+            rows.append((payload, ()))
+        self.fill(live)
+        return rows
+
+    def fill(self, records):
+        by_session = {}
+        for record in records:
+            record["logs"] = by_session[record["id"]] = []
+        if not by_session:
+            return
+        logs = FastExerciseSetLogListSerializer(
+            ExerciseSetLog.objects.filter(session__in=list(by_session)), extra=("session_id",))
+        for log, (session_id,) in logs.rows():
+            by_session[session_id].append(log)
+
+
+class FastWorkoutSessionSummaryListSerializer(FastListSerializer):
+    """WorkoutSessionSummarySerializer, summary card included, in one query."""
+    serializer_class = WorkoutSessionSummarySerializer
@@ -0,0 +1,110 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Prefetch
+
+from pace.fast_serializers import (
+    FastExerciseSetLogListSerializer, FastWorkoutPlanListSerializer, FastWorkoutSessionListSerializer,
+)
+from pace.models import Exercise, ExerciseDefinition, ExerciseSetLog, WorkoutPlan, WorkoutSession
+from pace.serializers import ExerciseSetLogSerializer, WorkoutPlanSerializer, WorkoutSessionSerializer
+
+
+PER_PARENT = 20
+
+
+def seed(rows):
+    """A throwaway user with ``rows`` plan exercises and ``rows`` set logs."""
+    user = get_user_model().objects.create_user(
+        username="serializer-benchmark", email="serializer-benchmark@example.com")
+    definitions = list(ExerciseDefinition.for_names([f"Benchmark {i}" for i in range(PER_PARENT)]).values())
+    parents = max(rows // PER_PARENT, 1)
+
+    plans = WorkoutPlan.objects.bulk_create(
+        [WorkoutPlan(user=user, name=f"Benchmark plan {i}", description="x" * 40) for i in range(parents)])
+    exercises = Exercise.objects.bulk_create([
+        Exercise(workout_plan=plan, definition=definitions[i % PER_PARENT],
+                 order=(i + 1) * Exercise.RANK_GAP, sets=3, reps=10, rest_timer=60)
+        for plan in plans for i in range(PER_PARENT)
+    ][:rows], batch_size=1000)
+    sessions = WorkoutSession.objects.bulk_create(
+        [WorkoutSession(user=user, plan=plans[i % len(plans)], score=80.0) for i in range(parents)])
+    ExerciseSetLog.objects.bulk_create([
+        ExerciseSetLog(session=sessions[i // PER_PARENT % len(sessions)], exercise=exercises[i % len(exercises)],
+                       set_number=i // len(exercises) + 1, reps_completed=10, weight_kg=42.5,
+                       duration_seconds=30, score=0.9)
+        for i in range(rows)
+    ], batch_size=1000)
+    return user
+
+
+def cases(user):
+    """``(name, regular, fast)`` renderers of the user's plans, sessions and set logs."""
+    plans = WorkoutPlan.objects.filter(user=user)
+    sessions = WorkoutSession.objects.filter(user=user)
+    logs = ExerciseSetLog.objects.filter(session__user=user)
+    return [
+        ("plans",
+         lambda: WorkoutPlanSerializer(plans.prefetch_related(
+             Prefetch("exercises", queryset=Exercise.objects.select_related("definition"))), many=True).data,
+         lambda: FastWorkoutPlanListSerializer(plans).data),
+        ("sessions",
+         lambda: WorkoutSessionSerializer(sessions.select_related("plan").prefetch_related(
+             Prefetch("exercisesetlog_set", queryset=ExerciseSetLog.objects.select_related("exercise__definition"))),
+             many=True).data,
+         lambda: FastWorkoutSessionListSerializer(sessions).data),
+        ("set logs",
+         lambda: ExerciseSetLogSerializer(logs.select_related("exercise__definition"), many=True).data,
+         lambda: FastExerciseSetLogListSerializer(logs).data),
+    ]
+
+
+def best_time(render, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmark(rows=10_000, repeat=3):
+    """
+    ``{case: (regular seconds, fast seconds)}`` for rendering ``rows``
+    nested rows, queries included, on synthetic data that is rolled back.
+    """
+    results = {}
+    with transaction.atomic():
+        user = seed(rows)
+        for name, regular, fast in cases(user):
+            if list(regular()) != fast():
+                raise CommandError(f"The fast {name} serializer disagrees with the regular one.")
+            results[name] = (best_time(regular, repeat), best_time(fast, repeat))
+        transaction.set_rollback(True)
+    return results
+
+
+class Command(BaseCommand):
+    help = ("Time the fast list serializers (pace.fast_serializers) against the regular "
+            "DRF serializers on synthetic data. Nothing is left in the database.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000,
+                            help="Nested rows (plan exercises / set logs) per case.")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the best is kept.")
+        parser.add_argument("--min-speedup", type=float, default=None,
+                            help="Fail if any case is less than this many times faster.")
+
+    def handle(self, *args, rows=10_000, repeat=3, min_speedup=None, **options):
+        slow = []
+        for name, (regular, fast) in run_benchmark(rows, repeat).items():
+            speedup = regular / fast
+            self.stdout.write(f"{name:>10}: regular {regular * 1000:8.1f} ms, "
+                              f"fast {fast * 1000:8.1f} ms, {speedup:5.1f}x")
+            if min_speedup is not None and speedup < min_speedup:
+                slow.append(name)
+        if slow:
+            raise CommandError(f"Less than {min_speedup}x faster: {', '.join(slow)}.")
@@ -0,0 +1,236 @@
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, IntegerField, Q, Sum, When
+from django.db.models.functions import Cast
+
+from pace.models import (
+    ExerciseSetLog, SessionTempoStats, UserDailyStats, UserExerciseStats, WorkoutSession,
+)
+from pace.signals import invalidate_analytics
+
+
+DAILY_FIELDS = ("sessions_completed", "total_duration", "score_sum", "score_count", "volume")
+EXERCISE_FIELDS = ("score_sum", "score_count")
+TEMPO_FIELDS = ("reps", "seconds", "too_fast_reps", "good_reps", "too_slow_reps")
+
+
+def _empty_daily():
+    return {
+        "sessions_completed": 0,
+        "total_duration": timedelta(0),
+        "score_sum": 0.0,
+        "score_count": 0,
+        "volume": 0.0,
+    }
+
+
+def compute_daily_stats(user_ids=None):
+    """Recompute {(user_id, date): fields} for UserDailyStats from the raw tables."""
+    sessions = WorkoutSession.objects.filter(completed=True)
+    logs = ExerciseSetLog.objects.all()
+    if user_ids:
+        sessions = sessions.filter(user_id__in=user_ids)
+        logs = logs.filter(session__user_id__in=user_ids)
+
+    stats = defaultdict(_empty_daily)
+    for row in (
+        sessions.values("user_id", "date")
+        .annotate(sessions_completed=Count("id"), total_duration=Sum("duration"))
+        .order_by()
+    ):
+        entry = stats[(row["user_id"], row["date"])]
+        entry["sessions_completed"] = row["sessions_completed"]
+        entry["total_duration"] = row["total_duration"] or timedelta(0)
+
+    for row in (
+        logs.values(user_id=F("session__user_id"), date=F("session__date"))
+        .annotate(
+            score_sum=Sum("score"),
+            score_count=Count("score"),
+            volume=Sum(F("reps_completed") * F("weight_kg")),
+        )
+        .order_by()
+    ):
+        entry = stats[(row["user_id"], row["date"])]
+        entry["score_sum"] = row["score_sum"] or 0.0
+        entry["score_count"] = row["score_count"]
+        entry["volume"] = row["volume"] or 0.0
+    return stats
+
+
+def compute_exercise_stats(user_ids=None):
+    """Recompute {(user_id, definition_id): fields} for UserExerciseStats from the raw tables."""
+    logs = ExerciseSetLog.objects.filter(score__isnull=False)
+    if user_ids:
+        logs = logs.filter(session__user_id__in=user_ids)
+    return {
+        (row["user_id"], row["definition_id"]): {
+            "score_sum": row["score_sum"],
+            "score_count": row["score_count"],
+        }
+        for row in (
+            logs.values(user_id=F("session__user_id"), definition_id=F("exercise__definition_id"))
+            .annotate(score_sum=Sum("score"), score_count=Count("score"))
+            .order_by()
+        )
+    }
+
+
+def compute_tempo_stats(user_ids=None):
+    """Recompute {(session_id, definition_id): fields} for SessionTempoStats from the raw tables."""
+    logs = ExerciseSetLog.objects.filter(reps_completed__gt=0, duration_seconds__gt=0)
+    if user_ids:
+        logs = logs.filter(session__user_id__in=user_ids)
+    seconds_per_rep = Cast("duration_seconds", FloatField()) / F("reps_completed")
+
+    def reps_where(condition):
+        return Sum(Case(When(condition, then=F("reps_completed")), default=0, output_field=IntegerField()))
+
+    return {
+        (row.pop("session_id"), row.pop("definition_id")): row
+        for row in (
+            logs.annotate(seconds_per_rep=seconds_per_rep)
+            .values("session_id", definition_id=F("exercise__definition_id"))
+            .annotate(
+                reps=Sum("reps_completed"),
+                seconds=Sum("duration_seconds"),
+                too_fast_reps=reps_where(Q(seconds_per_rep__lt=SessionTempoStats.FAST_BELOW)),
+                good_reps=reps_where(Q(seconds_per_rep__gte=SessionTempoStats.FAST_BELOW,
+                                       seconds_per_rep__lte=SessionTempoStats.SLOW_ABOVE)),
+                too_slow_reps=reps_where(Q(seconds_per_rep__gt=SessionTempoStats.SLOW_ABOVE)),
+            )
+            .order_by()
+        )
+    }
+
+
+def _is_empty(fields):
+    return not any(fields.values())
+
+
+def _matches(expected, actual):
+    for field, value in expected.items():
+        other = actual.get(field)
+        if isinstance(value, float):
+            if not math.isclose(value, other or 0.0, rel_tol=1e-9, abs_tol=1e-6):
+                return False
+        elif value != other:
+            return False
+    return True
+
+
+def _diff(expected, stored):
+    """Return the keys whose stored rollup disagrees with the recomputed one."""
+    mismatches = []
+    for key in expected.keys() | stored.keys():
+        want = expected.get(key)
+        have = stored.get(key)
+        if want is None or _is_empty(want):
+            if have is not None and not _is_empty(have):
+                mismatches.append(key)
+        elif have is None or not _matches(want, have):
+            mismatches.append(key)
+    return sorted(mismatches, key=str)
+
+
+class Command(BaseCommand):
+    help = ("Rebuild (or verify) the UserDailyStats/UserExerciseStats/SessionTempoStats "
+            "analytics rollups from the raw tables.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="user_ids",
+                            help="Limit to this user id (repeatable).")
+        parser.add_argument("--verify", action="store_true",
+                            help="Compare stored rollups with the raw tables without writing.")
+
+    def handle(self, *args, user_ids=None, verify=False, **options):
+        daily = compute_daily_stats(user_ids)
+        exercises = compute_exercise_stats(user_ids)
+        tempo = compute_tempo_stats(user_ids)
+
+        if verify:
+            self.verify(daily, exercises, tempo, user_ids)
+        else:
+            self.rebuild(daily, exercises, tempo, user_ids)
+
+    def verify(self, daily, exercises, tempo, user_ids):
+        stored_daily = UserDailyStats.objects.all()
+        stored_exercises = UserExerciseStats.objects.all()
+        stored_tempo = SessionTempoStats.objects.all()
+        if user_ids:
+            stored_daily = stored_daily.filter(user_id__in=user_ids)
+            stored_exercises = stored_exercises.filter(user_id__in=user_ids)
+            stored_tempo = stored_tempo.filter(session__user_id__in=user_ids)
+
+        daily_mismatches = _diff(daily, {
+            (row["user_id"], row["date"]): {f: row[f] for f in DAILY_FIELDS}
+            for row in stored_daily.values("user_id", "date", *DAILY_FIELDS)
+        })
+        exercise_mismatches = _diff(exercises, {
+            (row["user_id"], row["definition_id"]): {f: row[f] for f in EXERCISE_FIELDS}
+            for row in stored_exercises.values("user_id", "definition_id", *EXERCISE_FIELDS)
+        })
+
+        tempo_mismatches = _diff(tempo, {
+            (row["session_id"], row["definition_id"]): {f: row[f] for f in TEMPO_FIELDS}
+            for row in stored_tempo.values("session_id", "definition_id", *TEMPO_FIELDS)
+        })
+
+        for user_id, day in daily_mismatches:
+            self.stdout.write(f"Daily rollup mismatch: user={user_id} date={day}")
+        for user_id, definition_id in exercise_mismatches:
+            self.stdout.write(f"Exercise rollup mismatch: user={user_id} exercise={definition_id}")
+        for session_id, definition_id in tempo_mismatches:
+            self.stdout.write(f"Tempo rollup mismatch: session={session_id} exercise={definition_id}")
+
+        if daily_mismatches or exercise_mismatches or tempo_mismatches:
+            raise CommandError(
+                f"{len(daily_mismatches)} daily, {len(exercise_mismatches)} exercise and "
+                f"{len(tempo_mismatches)} tempo rollups are out of date. "
+                "Run without --verify to rebuild them.")
+        self.stdout.write(self.style.SUCCESS("Analytics rollups are up to date."))
+
+    def rebuild(self, daily, exercises, tempo, user_ids):
+        with transaction.atomic():
+            stale_daily = UserDailyStats.objects.all()
+            stale_exercises = UserExerciseStats.objects.all()
+            stale_tempo = SessionTempoStats.objects.all()
+            if user_ids:
+                stale_daily = stale_daily.filter(user_id__in=user_ids)
+                stale_exercises = stale_exercises.filter(user_id__in=user_ids)
+                stale_tempo = stale_tempo.filter(session__user_id__in=user_ids)
+            # Cached analytics were computed from the old rows: drop them once the rebuild commits
+            affected = set(user_ids or ()) or {
+                *stale_daily.values_list("user_id", flat=True),
+                *stale_exercises.values_list("user_id", flat=True),
+                *stale_tempo.values_list("session__user_id", flat=True),
+                *(user_id for user_id, _ in daily),
+                *(user_id for user_id, _ in exercises),
+            }
+            invalidate_analytics(*affected)
+            stale_daily.delete()
+            stale_exercises.delete()
+            stale_tempo.delete()
+
+            UserDailyStats.objects.bulk_create(
+                [UserDailyStats(user_id=user_id, date=day, **fields)
+                 for (user_id, day), fields in daily.items() if not _is_empty(fields)],
+                batch_size=1000,
+            )
+            UserExerciseStats.objects.bulk_create(
+                [UserExerciseStats(user_id=user_id, definition_id=definition_id, **fields)
+                 for (user_id, definition_id), fields in exercises.items()],
+                batch_size=1000,
+            )
+            SessionTempoStats.objects.bulk_create(
+                [SessionTempoStats(session_id=session_id, definition_id=definition_id, **fields)
+                 for (session_id, definition_id), fields in tempo.items()],
+                batch_size=1000,
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {len(daily)} daily, {len(exercises)} exercise and {len(tempo)} tempo rollups."))
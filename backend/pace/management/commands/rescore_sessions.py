@@ -0,0 +1,161 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from pace.models import ExerciseSetLog, SessionSummary, WorkoutSession
+from pace.recordings import Recording, recording_path
+from pace.scoring import exercise_type, landmarks_from_frames, score_landmarks, split_sets
+from pace.signals import (
+    invalidate_analytics, refresh_session_summary, set_log_contribution, set_logs_bulk_saved, touch_sessions,
+)
+
+
+def score_recording(task):
+    """
+    Worker: score one session's recording, each recorded set with the
+    tracker of the set it was logged as. Touches only the file, never the
+    database.
+
+    ``sets`` is ``[(log_id, tracker type), ...]`` in the order the sets were
+    logged, or a single ``(None, tracker type)`` for a session without logs,
+    which is scored as a whole. Returns ``(session_id, recorded sets,
+    [(log_id, reps, good_reps, accuracy), ...])``, with None instead of the
+    list when the recording does not split into one segment per logged set.
+    """
+    session_id, path, sets = task
+    frames = Recording(path).frames()
+    segments = [(0, len(frames))] if sets[0][0] is None else split_sets(frames['t_ms'])
+    if len(segments) != len(sets):
+        return session_id, len(segments), None
+
+    landmarks = landmarks_from_frames(frames)
+    results = []
+    for (log_id, exercise), (start, stop) in zip(sets, segments):
+        result = score_landmarks(landmarks[start:stop], frames['t_ms'][start:stop], exercise)
+        results.append((log_id, result['reps'], result['good_reps'], result['accuracy']))
+    return session_id, len(segments), results
+
+
+def session_sets(session_ids):
+    """
+    ``({session_id: [(log_id, tracker type), ...]}, {log_id: stored score})``
+    with each session's logs in the order they were logged; a session
+    without logs gets its plan's first exercise.
+    """
+    sets, scores = {}, {}
+    for session_id, log_id, score, name in (
+        ExerciseSetLog.objects.filter(session_id__in=session_ids)
+        .values_list('session_id', 'id', 'score', 'exercise__definition__name')
+        .order_by('session_id', 'id')
+    ):
+        sets.setdefault(session_id, []).append((log_id, exercise_type(name)))
+        scores[log_id] = score
+
+    for session_id, plan_exercise in (
+        WorkoutSession.objects.filter(id__in=session_ids)
+        .values_list('id', 'plan__exercises__definition__name')
+        .order_by('id', 'plan__exercises__order')
+    ):
+        if session_id not in sets:
+            sets[session_id] = [(None, exercise_type(plan_exercise))]
+    return sets, scores
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute form scores from recorded pose landmarks with pace.scoring, "
+        "scoring many sessions in parallel worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--session", type=int, action="append", dest="sessions",
+                            help="Only rescore this session id (repeatable).")
+        parser.add_argument("--user", type=int, action="append", dest="users",
+                            help="Only rescore sessions of this user id (repeatable).")
+        parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                            help="Worker processes (default: number of CPUs).")
+        parser.add_argument("--write", action="store_true",
+                            help="Store the new scores on WorkoutSession.score and ExerciseSetLog.score "
+                                 "(default: report only).")
+
+    def handle(self, *args, sessions=None, users=None, workers=None, write=False, **options):
+        queryset = WorkoutSession.objects.order_by('id')
+        if sessions:
+            queryset = queryset.filter(id__in=sessions)
+        if users:
+            queryset = queryset.filter(user_id__in=users)
+
+        stored, owners = {}, {}
+        for session_id, score, user_id in queryset.values_list('id', 'score', 'user_id'):
+            if os.path.exists(recording_path(session_id)):
+                stored[session_id] = score
+                owners[session_id] = user_id
+        if not stored:
+            self.stdout.write("No recorded sessions to rescore.")
+            return
+
+        sets, stored_logs = session_sets(list(stored))
+        tasks = [(session_id, recording_path(session_id), sets[session_id]) for session_id in stored]
+        with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+            results = list(pool.map(score_recording, tasks, chunksize=max(1, len(tasks) // (4 * max(1, workers)))))
+
+        changed, changed_logs, skipped = [], {}, 0
+        for session_id, recorded, set_results in results:
+            if set_results is None:
+                skipped += 1
+                self.stdout.write(
+                    f"session {session_id}: {recorded} recorded sets for {len(sets[session_id])} logged sets, skipped"
+                )
+                continue
+            reps = sum(result[1] for result in set_results)
+            good_reps = sum(result[2] for result in set_results)
+            accuracy = round(good_reps / reps * 100, 2) if reps else 100.0
+            previous = stored[session_id]
+            self.stdout.write(
+                f"session {session_id}: {good_reps}/{reps} good reps, "
+                f"score {previous if previous is not None else '-'} -> {accuracy}"
+            )
+            if previous != accuracy:
+                changed.append(WorkoutSession(id=session_id, score=accuracy))
+            for log_id, _, _, log_accuracy in set_results:
+                if log_id is not None and stored_logs[log_id] != log_accuracy:
+                    changed_logs[log_id] = log_accuracy
+
+        if write and (changed or changed_logs):
+            with transaction.atomic():
+                WorkoutSession.objects.bulk_update(changed, ['score'], batch_size=1000)
+                log_sessions = self.write_set_log_scores(changed_logs)
+                # bulk_update() sends no signals: refresh the completed sessions' snapshots
+                # and the owners' session ETags and analytics ourselves
+                for session_id in SessionSummary.objects.filter(
+                    session_id__in=[session.id for session in changed if session.id not in log_sessions]
+                ).values_list('session_id', flat=True):
+                    refresh_session_summary(session_id)
+                user_ids = {owners[session.id] for session in changed}
+                touch_sessions(*user_ids)
+                invalidate_analytics(*user_ids)
+        verb = "Updated" if write else "Would update"
+        self.stdout.write(self.style.SUCCESS(
+            f"Rescored {len(results) - skipped} sessions ({skipped} skipped). "
+            f"{verb} {len(changed)} session and {len(changed_logs)} set scores."
+        ))
+
+    def write_set_log_scores(self, scores):
+        """Store ``{log_id: score}`` and run the skipped post_save side effects; returns the sessions touched."""
+        logs = list(ExerciseSetLog.objects.filter(id__in=scores).select_related('session', 'exercise').order_by('id'))
+        by_session = {}
+        for log in logs:
+            session, session_logs, previous = by_session.setdefault(log.session_id, (log.session, [], []))
+            previous.append(set_log_contribution(
+                session.user_id, session.id, session.date, log.exercise.definition_id,
+                log.score, log.reps_completed, log.weight_kg, log.duration_seconds,
+            ))
+            log.score = scores[log.id]
+            session_logs.append(log)
+        ExerciseSetLog.objects.bulk_update(logs, ['score'], batch_size=1000)
+        # Rollup deltas, analytics, session ETags and summaries, once per session
+        for session, session_logs, previous in by_session.values():
+            set_logs_bulk_saved(session, session_logs, previous, [log.exercise_id for log in session_logs])
+        return set(by_session)
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:12
+
+import datetime
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+
+
+def backfill_rollups(apps, schema_editor):
+    """Populate the rollups from the sessions and set logs that already exist."""
+    WorkoutSession = apps.get_model('pace', 'WorkoutSession')
+    ExerciseSetLog = apps.get_model('pace', 'ExerciseSetLog')
+    UserDailyStats = apps.get_model('pace', 'UserDailyStats')
+    UserExerciseStats = apps.get_model('pace', 'UserExerciseStats')
+
+    daily = {}
+    for row in (WorkoutSession.objects.filter(completed=True)
+                .values('user_id', 'date')
+                .annotate(n=Count('id'), duration=Sum('duration')).order_by()):
+        stats = daily.setdefault((row['user_id'], row['date']), {})
+        stats['sessions_completed'] = row['n']
+        stats['total_duration'] = row['duration'] or datetime.timedelta(0)
+    for row in (ExerciseSetLog.objects
+                .values(user_id=F('session__user_id'), day=F('session__date'))
+                .annotate(score_sum=Sum('score'), score_count=Count('score'),
+                          volume=Sum(F('reps_completed') * F('weight_kg'))).order_by()):
+        stats = daily.setdefault((row['user_id'], row['day']), {})
+        stats['score_sum'] = row['score_sum'] or 0
+        stats['score_count'] = row['score_count']
+        stats['volume'] = row['volume'] or 0
+    UserDailyStats.objects.bulk_create(
+        [UserDailyStats(user_id=user_id, date=day, **stats) for (user_id, day), stats in daily.items()],
+        batch_size=1000)
+
+    UserExerciseStats.objects.bulk_create(
+        [UserExerciseStats(user_id=row['user_id'], exercise_name=row['name'],
+                           score_sum=row['score_sum'], score_count=row['score_count'])
+         for row in (ExerciseSetLog.objects.filter(score__isnull=False)
+                     .values(user_id=F('session__user_id'), name=F('exercise__name'))
+                     .annotate(score_sum=Sum('score'), score_count=Count('score')).order_by())],
+        batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pace', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('sessions_completed', models.PositiveIntegerField(default=0)),
+                ('total_duration', models.DurationField(default=datetime.timedelta(0))),
+                ('score_sum', models.FloatField(default=0)),
+                ('score_count', models.PositiveIntegerField(default=0)),
+                ('volume', models.FloatField(default=0, help_text='Sum of reps × weight (kg)')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['user', 'date'],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+        migrations.CreateModel(
+            name='UserExerciseStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('exercise_name', models.CharField(max_length=100)),
+                ('score_sum', models.FloatField(default=0)),
+                ('score_count', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['user', 'exercise_name'],
+                'unique_together': {('user', 'exercise_name')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
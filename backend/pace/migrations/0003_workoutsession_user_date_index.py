@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pace', '0002_user_analytics_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='workoutsession',
+            index=models.Index(fields=['user', 'date'], name='pace_session_user_date_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_tempo_stats(apps, schema_editor):
+    """Build SessionTempoStats from the set logs that already exist."""
+    ExerciseSetLog = apps.get_model('pace', 'ExerciseSetLog')
+    SessionTempoStats = apps.get_model('pace', 'SessionTempoStats')
+
+    stats = {}
+    logs = (ExerciseSetLog.objects.filter(reps_completed__gt=0, duration_seconds__gt=0)
+            .values_list('session_id', 'exercise__name', 'reps_completed', 'duration_seconds'))
+    for session_id, name, reps, seconds in logs.iterator():
+        row = stats.setdefault((session_id, name), {
+            'reps': 0, 'seconds': 0, 'too_fast_reps': 0, 'good_reps': 0, 'too_slow_reps': 0})
+        row['reps'] += reps
+        row['seconds'] += seconds
+        seconds_per_rep = seconds / reps
+        if seconds_per_rep < 1.0:
+            row['too_fast_reps'] += reps
+        elif seconds_per_rep > 1.5:
+            row['too_slow_reps'] += reps
+        else:
+            row['good_reps'] += reps
+    SessionTempoStats.objects.bulk_create(
+        [SessionTempoStats(session_id=session_id, exercise_name=name, **row)
+         for (session_id, name), row in stats.items()],
+        batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pace', '0003_workoutsession_user_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionTempoStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('exercise_name', models.CharField(max_length=100)),
+                ('reps', models.PositiveIntegerField(default=0)),
+                ('seconds', models.PositiveIntegerField(default=0)),
+                ('too_fast_reps', models.PositiveIntegerField(default=0)),
+                ('good_reps', models.PositiveIntegerField(default=0)),
+                ('too_slow_reps', models.PositiveIntegerField(default=0)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tempo_stats', to='pace.workoutsession')),
+            ],
+            options={
+                'ordering': ['session', 'exercise_name'],
+                'unique_together': {('session', 'exercise_name')},
+            },
+        ),
+        migrations.RunPython(backfill_tempo_stats, migrations.RunPython.noop),
+    ]
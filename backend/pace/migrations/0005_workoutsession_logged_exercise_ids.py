@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:21
+
+from django.db import migrations, models
+
+
+def backfill_logged_exercise_ids(apps, schema_editor):
+    """Record which exercises already have logged sets in existing sessions."""
+    ExerciseSetLog = apps.get_model('pace', 'ExerciseSetLog')
+    WorkoutSession = apps.get_model('pace', 'WorkoutSession')
+
+    covered = {}
+    pairs = (ExerciseSetLog.objects.values_list('session_id', 'exercise_id')
+             .distinct().order_by('session_id', 'exercise_id'))
+    for session_id, exercise_id in pairs.iterator():
+        covered.setdefault(session_id, []).append(exercise_id)
+
+    sessions = []
+    for session_id, exercise_ids in covered.items():
+        sessions.append(WorkoutSession(id=session_id, logged_exercise_ids=exercise_ids))
+    WorkoutSession.objects.bulk_update(sessions, ['logged_exercise_ids'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pace', '0004_session_tempo_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workoutsession',
+            name='logged_exercise_ids',
+            field=models.JSONField(blank=True, default=list, help_text='Plan exercises with at least one logged set (drives auto-completion)'),
+        ),
+        migrations.RunPython(backfill_logged_exercise_ids, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:05
+
+import uuid
+
+from django.db import migrations, models
+
+
+def populate_uuids(apps, schema_editor):
+    """Give every existing session and set log its own uuid."""
+    for model_name in ('WorkoutSession', 'ExerciseSetLog'):
+        model = apps.get_model('pace', model_name)
+        rows = []
+        for pk in model.objects.values_list('pk', flat=True).iterator():
+            rows.append(model(pk=pk, uuid=uuid.uuid4()))
+        model.objects.bulk_update(rows, ['uuid'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pace', '0005_workoutsession_logged_exercise_ids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workoutsession',
+            name='uuid',
+            field=models.UUIDField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='exercisesetlog',
+            name='uuid',
+            field=models.UUIDField(editable=False, null=True),
+        ),
+        migrations.RunPython(populate_uuids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='workoutsession',
+            name='uuid',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, help_text='Client-generated id used for idempotent offline sync', unique=True),
+        ),
+        migrations.AlterField(
+            model_name='exercisesetlog',
+            name='uuid',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, help_text='Client-generated id used for idempotent offline sync', unique=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:25
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pace', '0006_sync_uuids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RepLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('set_number', models.PositiveIntegerField()),
+                ('rep_number', models.PositiveIntegerField()),
+                ('duration', models.FloatField(help_text='Seconds taken for the rep')),
+                ('is_good_form', models.BooleanField(default=True)),
+                ('start_angle', models.FloatField(blank=True, null=True)),
+                ('max_angle', models.FloatField(blank=True, null=True)),
+                ('feedback', models.CharField(blank=True, default='', max_length=255)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rep_logs', to='pace.workoutsession')),
+            ],
+            options={
+                'ordering': ['session', 'set_number', 'rep_number'],
+                'unique_together': {('session', 'set_number', 'rep_number')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pace', '0007_rep_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fitnessprofile',
+            name='sessions_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False, help_text="Bumped whenever any of the user's sessions or set logs change"),
+        ),
+        migrations.AddField(
+            model_name='fitnessprofile',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:37
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pace', '0008_change_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionSummary',
+            fields=[
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='pace.workoutsession')),
+                ('exercises', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Per-exercise sets, reps, volume, average score and best set, in plan order')),
+                ('total_sets', models.PositiveIntegerField(default=0)),
+                ('total_reps', models.PositiveIntegerField(default=0)),
+                ('total_volume', models.FloatField(default=0)),
+                ('average_score', models.FloatField(blank=True, null=True)),
+                ('duration', models.DurationField(blank=True, null=True)),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:43
+
+from django.db import migrations, models
+
+RANK_GAP = 1 << 16
+
+
+def renumber(apps, step):
+    """Give every plan's exercises the orders step, 2 * step, ... in their current order, unranked ones last."""
+    Exercise = apps.get_model('pace', 'Exercise')
+    plans = {}
+    for pk, plan_id, order in (
+        Exercise.objects.filter(workout_plan__isnull=False).values_list('pk', 'workout_plan_id', 'order').iterator()
+    ):
+        plans.setdefault(plan_id, []).append((order is None, order or 0, pk))
+
+    rows = [
+        Exercise(pk=pk, order=step * position)
+        for exercises in plans.values()
+        for position, (_, _, pk) in enumerate(sorted(exercises), start=1)
+    ]
+    # Clear first: NULLs never collide in unique (workout_plan, order)
+    Exercise.objects.filter(workout_plan__isnull=False).update(order=None)
+    Exercise.objects.bulk_update(rows, ['order'], batch_size=1000)
+
+
+def spread_ranks(apps, schema_editor):
+    renumber(apps, RANK_GAP)
+
+
+def pack_ranks(apps, schema_editor):
+    renumber(apps, 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pace', '0009_session_summary'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exercise',
+            name='order',
+            field=models.PositiveBigIntegerField(blank=True, help_text='Sparse rank of the exercise in the workout', null=True),
+        ),
+        migrations.RunPython(spread_ranks, pack_ranks),
+    ]
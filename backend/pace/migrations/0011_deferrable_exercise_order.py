@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:45
+
+import django.db.models.constraints
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pace', '0010_sparse_exercise_ranks'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='exercise',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='exercise',
+            constraint=models.UniqueConstraint(deferrable=django.db.models.constraints.Deferrable['DEFERRED'], fields=('workout_plan', 'order'), name='pace_exercise_plan_order_uniq'),
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:10
+
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def normalize(name):
+    return " ".join(name.split()).casefold()
+
+
+def build_catalog(apps, schema_editor):
+    """
+    One ExerciseDefinition per distinct name (ignoring case and spacing),
+    named after its most common spelling, and every plan exercise pointed
+    at it.
+    """
+    Exercise = apps.get_model('pace', 'Exercise')
+    ExerciseDefinition = apps.get_model('pace', 'ExerciseDefinition')
+
+    spellings = {}
+    for name, count in (
+        Exercise.objects.values_list('name').annotate(count=models.Count('id')).order_by().iterator()
+    ):
+        spellings.setdefault(normalize(name), Counter())[" ".join(name.split())] += count
+
+    ExerciseDefinition.objects.bulk_create(
+        [
+            ExerciseDefinition(key=key, name=min(counts, key=lambda name: (-counts[name], name)))
+            for key, counts in spellings.items()
+        ],
+        batch_size=1000,
+    )
+    definitions = dict(ExerciseDefinition.objects.values_list('key', 'id'))
+
+    rows = [
+        Exercise(pk=pk, definition_id=definitions[normalize(name)])
+        for pk, name in Exercise.objects.values_list('pk', 'name').iterator()
+    ]
+    Exercise.objects.bulk_update(rows, ['definition'], batch_size=1000)
+
+
+def restore_names(apps, schema_editor):
+    Exercise = apps.get_model('pace', 'Exercise')
+    rows = [
+        Exercise(pk=pk, name=name)
+        for pk, name in Exercise.objects.values_list('pk', 'definition__name').iterator()
+    ]
+    Exercise.objects.bulk_update(rows, ['name'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pace', '0011_deferrable_exercise_order'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExerciseDefinition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('key', models.CharField(editable=False, help_text='Name with case and spacing folded; the catalog is unique on it', max_length=100, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='exercise',
+            name='definition',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='plan_exercises', to='pace.exercisedefinition'),
+        ),
+        migrations.AlterField(
+            model_name='exercise',
+            name='name',
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.RunPython(build_catalog, restore_names),
+        migrations.AlterField(
+            model_name='exercise',
+            name='definition',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='plan_exercises', to='pace.exercisedefinition'),
+        ),
+        migrations.RemoveField(
+            model_name='exercise',
+            name='name',
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pace', '0012_exercise_catalog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workoutplan',
+            name='is_template',
+            field=models.BooleanField(default=False, help_text='Listed in the template library for anyone to clone'),
+        ),
+        migrations.AddField(
+            model_name='workoutplan',
+            name='source',
+            field=models.ForeignKey(blank=True, editable=False, help_text='The plan this one was cloned from', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='copies', to='pace.workoutplan'),
+        ),
+        migrations.AlterField(
+            model_name='workoutplan',
+            name='name',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AddConstraint(
+            model_name='workoutplan',
+            constraint=models.UniqueConstraint(fields=('user', 'name'), name='pace_workoutplan_user_name_uniq'),
+        ),
+    ]
@@ -0,0 +1,131 @@
+# Generated by Django 5.2.18 on 2026-10-17 09:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+
+
+def rebuild_rollups(apps, schema_editor):
+    """
+    Rebuild the per-exercise rollups keyed on the catalog entry. The rows
+    keyed on the name never followed the catalog (e.g. two spellings of one
+    exercise, or a renamed plan exercise), so they are recomputed from the
+    set logs instead of converted.
+    """
+    ExerciseSetLog = apps.get_model('pace', 'ExerciseSetLog')
+    UserExerciseStats = apps.get_model('pace', 'UserExerciseStats')
+    SessionTempoStats = apps.get_model('pace', 'SessionTempoStats')
+
+    UserExerciseStats.objects.all().delete()
+    SessionTempoStats.objects.all().delete()
+
+    UserExerciseStats.objects.bulk_create(
+        [UserExerciseStats(user_id=row['user_id'], definition_id=row['definition_id'],
+                           score_sum=row['score_sum'], score_count=row['score_count'])
+         for row in (ExerciseSetLog.objects.filter(score__isnull=False)
+                     .values(user_id=F('session__user_id'), definition_id=F('exercise__definition_id'))
+                     .annotate(score_sum=Sum('score'), score_count=Count('score')).order_by())],
+        batch_size=1000)
+
+    stats = {}
+    logs = (ExerciseSetLog.objects.filter(reps_completed__gt=0, duration_seconds__gt=0)
+            .values_list('session_id', 'exercise__definition_id', 'reps_completed', 'duration_seconds'))
+    for session_id, definition_id, reps, seconds in logs.iterator():
+        row = stats.setdefault((session_id, definition_id), {
+            'reps': 0, 'seconds': 0, 'too_fast_reps': 0, 'good_reps': 0, 'too_slow_reps': 0})
+        row['reps'] += reps
+        row['seconds'] += seconds
+        seconds_per_rep = seconds / reps
+        if seconds_per_rep < 1.0:
+            row['too_fast_reps'] += reps
+        elif seconds_per_rep > 1.5:
+            row['too_slow_reps'] += reps
+        else:
+            row['good_reps'] += reps
+    SessionTempoStats.objects.bulk_create(
+        [SessionTempoStats(session_id=session_id, definition_id=definition_id, **row)
+         for (session_id, definition_id), row in stats.items()],
+        batch_size=1000)
+
+
+def restore_names(apps, schema_editor):
+    for model_name in ('UserExerciseStats', 'SessionTempoStats'):
+        model = apps.get_model('pace', model_name)
+        rows = [
+            model(pk=pk, exercise_name=name)
+            for pk, name in model.objects.values_list('pk', 'definition__name').iterator()
+        ]
+        model.objects.bulk_update(rows, ['exercise_name'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pace', '0013_plan_templates'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='userexercisestats',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='sessiontempostats',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='userexercisestats',
+            name='definition',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pace.exercisedefinition'),
+        ),
+        migrations.AddField(
+            model_name='sessiontempostats',
+            name='definition',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pace.exercisedefinition'),
+        ),
+        migrations.AlterField(
+            model_name='userexercisestats',
+            name='exercise_name',
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='sessiontempostats',
+            name='exercise_name',
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.RunPython(rebuild_rollups, restore_names),
+        migrations.RemoveField(
+            model_name='userexercisestats',
+            name='exercise_name',
+        ),
+        migrations.RemoveField(
+            model_name='sessiontempostats',
+            name='exercise_name',
+        ),
+        migrations.AlterField(
+            model_name='userexercisestats',
+            name='definition',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pace.exercisedefinition'),
+        ),
+        migrations.AlterField(
+            model_name='sessiontempostats',
+            name='definition',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pace.exercisedefinition'),
+        ),
+        migrations.AlterModelOptions(
+            name='userexercisestats',
+            options={'ordering': ['user', 'definition']},
+        ),
+        migrations.AlterModelOptions(
+            name='sessiontempostats',
+            options={'ordering': ['session', 'definition']},
+        ),
+        migrations.AlterUniqueTogether(
+            name='userexercisestats',
+            unique_together={('user', 'definition')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='sessiontempostats',
+            unique_together={('session', 'definition')},
+        ),
+    ]
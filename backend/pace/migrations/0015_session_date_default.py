@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:07
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pace', '0014_rollups_by_definition'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='workoutsession',
+            name='date',
+            field=models.DateField(default=datetime.date.today, editable=False, help_text='Day the workout took place; offline clients send it with the session'),
+        ),
+    ]
@@ -1,7 +1,9 @@
-from django.db import models
+import uuid
+from django.db import connection, models
 from django.conf import settings
-from datetime import date
+from datetime import date, timedelta
 from django.utils import timezone
+from django.core.serializers.json import DjangoJSONEncoder
 
 user = settings.AUTH_USER_MODEL
 
@@ -64,6 +66,12 @@ class FitnessProfile(models.Model):
     target_weight_kg = models.FloatField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Change counters backing the ETags of the profile and session endpoints (see pace.signals)
+    version = models.PositiveBigIntegerField(default=0, editable=False)
+    sessions_version = models.PositiveBigIntegerField(
+        default=0, editable=False,
+        help_text="Bumped whenever any of the user's sessions or set logs change")
+
     @property
     def age(self):
         """Dynamically calculate age from birthday."""
@@ -74,6 +82,18 @@ class FitnessProfile(models.Model):
             (today.month, today.day) < (self.birthday.month, self.birthday.day)
         )
 
+    COUNTER_FIELDS = ('version', 'sessions_version')
+
+    def save(self, *args, **kwargs):
+        # The counters are only ever bumped with F() updates; writing back a
+        # stale in-memory copy would let an old ETag match again
+        if self.pk and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"FitnessProfile of {self.user.username}"
 
@@ -89,28 +109,164 @@ class WorkoutPlan(models.Model):
     ]
 
     user = models.ForeignKey(user, on_delete=models.CASCADE)
-    name = models.CharField(max_length=100, unique=True)
+    name = models.CharField(max_length=100)
     description = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     duration_minutes = models.PositiveIntegerField(null=True, blank=True)
     difficulty_level = models.CharField(
         max_length=10, choices=DIFFICULTY_LEVEL_CHOICES, blank=True, null=True)
+    is_template = models.BooleanField(
+        default=False, help_text="Listed in the template library for anyone to clone")
+    source = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, editable=False,
+        related_name='copies', help_text="The plan this one was cloned from")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'name'], name='pace_workoutplan_user_name_uniq'),
+        ]
+
+    # Room left for a " (n)" suffix within max_length
+    NAME_ROOM = 100 - 8
+
+    def copy_for(self, users, name=None):
+        """
+        Clone this plan and its exercises for each of ``users``, in a fixed
+        number of queries however many users and exercises there are.
+
+        The copies share the exercises' catalog entries and ranks. A user
+        who already has a plan called ``name`` (default: this plan's name)
+        gets "name (2)", "name (3)", ... instead. Returns the new plans.
+        """
+        name = name or self.name
+        exercises = list(self.exercises.all())
+        taken = {}
+        for user_id, plan_name in WorkoutPlan.objects.filter(
+            user__in=users, name__startswith=name[:self.NAME_ROOM]
+        ).values_list('user_id', 'name'):
+            taken.setdefault(user_id, set()).add(plan_name)
+
+        plans = WorkoutPlan.objects.bulk_create([
+            WorkoutPlan(
+                user=owner,
+                name=self.free_name(name, taken.get(owner.pk, ())),
+                description=self.description,
+                duration_minutes=self.duration_minutes,
+                difficulty_level=self.difficulty_level,
+                source=self,
+            )
+            for owner in users
+        ])
+        Exercise.objects.bulk_create([
+            Exercise(
+                workout_plan=plan,
+                definition_id=exercise.definition_id,
+                description=exercise.description,
+                order=exercise.order,
+                sets=exercise.sets,
+                reps=exercise.reps,
+                rest_timer=exercise.rest_timer,
+            )
+            for plan in plans
+            for exercise in exercises
+        ], batch_size=1000)
+        return plans
+
+    @classmethod
+    def free_name(cls, name, taken):
+        """``name``, or the first "name (n)" that is not in ``taken``."""
+        if name not in taken:
+            return name
+        n = 2
+        while f"{name[:cls.NAME_ROOM]} ({n})" in taken:
+            n += 1
+        return f"{name[:cls.NAME_ROOM]} ({n})"
 
     def __str__(self):
         return f"{self.name} for {self.user.username}"
 
 
+class ExerciseDefinition(models.Model):
+    """
+    Shared catalog entry for an exercise ("Squat"). Plan exercises point
+    at it, so the name is stored once and analytics can group on its id.
+    """
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=100, unique=True, editable=False,
+                           help_text="Name with case and spacing folded; the catalog is unique on it")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+
+    @staticmethod
+    def normalize(name):
+        return " ".join(name.split()).casefold()
+
+    def clean(self):
+        # ``key`` is not on forms (e.g. the admin), so its uniqueness is checked here
+        others = ExerciseDefinition.objects.filter(key=self.normalize(self.name)).exclude(pk=self.pk)
+        if others.exists():
+            from django.core.exceptions import ValidationError
+            raise ValidationError({'name': f"The catalog already has '{others.first().name}'."})
+
+    def save(self, *args, **kwargs):
+        self.name = " ".join(self.name.split())
+        self.key = self.normalize(self.name)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'name', 'key'}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def for_names(cls, names):
+        """``{name: definition}`` for ``names``, adding the missing ones to the catalog. Two queries."""
+        keys = {name: cls.normalize(name) for name in names}
+        new = {}
+        for name, key in keys.items():
+            # The first spelling seen names a new entry
+            new.setdefault(key, cls(name=" ".join(name.split()), key=key))
+        cls.objects.bulk_create(new.values(), ignore_conflicts=True)
+        by_key = cls.objects.in_bulk(new, field_name='key')
+        return {name: by_key[key] for name, key in keys.items()}
+
+    def __str__(self):
+        return self.name
+
+
+def ranks_between(low, high, count):
+    """
+    ``count`` evenly spaced ranks strictly between ``low`` and ``high``
+    (``None`` for an open end), or ``None`` if there is no room left.
+    """
+    low = low or 0
+    if high is None:
+        return [low + Exercise.RANK_GAP * (i + 1) for i in range(count)]
+    step = (high - low) // (count + 1)
+    if step < 1:
+        return None
+    return [low + step * (i + 1) for i in range(count)]
+
+
 class Exercise(models.Model):
     """
-    Represents an exercise with its details.
+    An exercise in a workout plan: a catalog entry (``definition``) plus
+    the plan's sets, reps and rest for it.
+
+    ``order`` is a sparse rank: exercises are spaced ``RANK_GAP`` apart, so
+    inserting or moving one takes a rank between its new neighbours and
+    writes a single row, and deleting one leaves a gap. Only when two
+    neighbours run out of room is the plan rebalanced. Clients see a dense
+    1-based position instead (see pace.serializers).
     """
+    RANK_GAP = 1 << 16
+
     workout_plan = models.ForeignKey(
         WorkoutPlan, on_delete=models.CASCADE, related_name='exercises', null=True, blank=True)
-    name = models.CharField(max_length=100)
+    definition = models.ForeignKey(ExerciseDefinition, on_delete=models.PROTECT, related_name='plan_exercises')
     description = models.TextField(blank=True, null=True)
-    order = models.PositiveIntegerField(blank=True, null=True,
-                                        help_text="Order of the exercise in the workout")
+    order = models.PositiveBigIntegerField(blank=True, null=True,
+                                           help_text="Sparse rank of the exercise in the workout")
     sets = models.PositiveIntegerField(null=True, blank=True)
     reps = models.PositiveIntegerField(null=True, blank=True)
     rest_timer = models.PositiveIntegerField(
@@ -118,8 +274,59 @@ class Exercise(models.Model):
 
     class Meta:
         ordering = ['order']
-        unique_together = ('workout_plan', 'order')
-        
+        constraints = [
+            # Deferred to commit so a reorder can permute ranks in one statement
+            models.UniqueConstraint(
+                fields=['workout_plan', 'order'], name='pace_exercise_plan_order_uniq',
+                deferrable=models.Deferrable.DEFERRED,
+            ),
+        ]
+
+    @classmethod
+    def rebalance(cls, sequence, current):
+        """
+        Respace a whole plan to ``RANK_GAP`` multiples.
+
+        ``sequence`` is the plan in display order: exercise ids, plus any
+        other (non-int) keys as placeholders for exercises about to be
+        inserted. ``current`` maps every existing id to its rank. Writes
+        the new ranks of the existing rows and returns ``{key: rank}`` for
+        the whole sequence.
+        """
+        ranks = {key: cls.RANK_GAP * (i + 1) for i, key in enumerate(sequence)}
+        if not current:
+            return ranks
+        rows = cls.objects.filter(id__in=current)
+        if not connection.features.supports_deferrable_unique_constraints:
+            # Without a deferred unique check, park every row above all old and new
+            # ranks first so the update never collides part-way through
+            park = max([rank for rank in current.values() if rank is not None], default=0) + cls.RANK_GAP * (len(sequence) + 1)
+            rows.filter(order__isnull=False).update(order=models.F('order') + park)
+        rows.update(order=models.Case(
+            *(models.When(id=pk, then=models.Value(ranks[pk])) for pk in current),
+            output_field=models.PositiveBigIntegerField(),
+        ))
+        return ranks
+
+    @property
+    def name(self):
+        """The catalog name; ``Exercise(name=...)`` picks (or adds) the catalog entry on save."""
+        if '_pending_name' in self.__dict__:
+            return self.__dict__['_pending_name']
+        return self.definition.name if self.definition_id else None
+
+    @name.setter
+    def name(self, value):
+        self.__dict__['_pending_name'] = value
+
+    def save(self, *args, **kwargs):
+        if '_pending_name' in self.__dict__:
+            name = self.__dict__.pop('_pending_name')
+            self.definition = ExerciseDefinition.for_names([name])[name]
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'definition'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.name
 
@@ -129,7 +336,10 @@ class WorkoutSession(models.Model):
     A user's actual workout session (tracks performance).
     """
     user = models.ForeignKey(user, on_delete=models.CASCADE)
-    date = models.DateField(auto_now_add=True)
+    uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False,
+                            help_text="Client-generated id used for idempotent offline sync")
+    date = models.DateField(default=date.today, editable=False,
+                            help_text="Day the workout took place; offline clients send it with the session")
     plan = models.ForeignKey(
         WorkoutPlan, on_delete=models.SET_NULL, null=True, blank=True)
     rest_period_seconds = models.PositiveIntegerField(null=True, blank=True)
@@ -137,12 +347,22 @@ class WorkoutSession(models.Model):
     score = models.FloatField(null=True, blank=True)  # AI form score
     duration = models.DurationField(null=True, blank=True)
     completed = models.BooleanField(default=False)
+    logged_exercise_ids = models.JSONField(
+        default=list, blank=True,
+        help_text="Plan exercises with at least one logged set (drives auto-completion)")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date'], name='pace_session_user_date_idx'),
+        ]
 
     def __str__(self):
         return f"Session {self.date} - {self.user.username}"
 
 
 class ExerciseSetLog(models.Model):
+    uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False,
+                            help_text="Client-generated id used for idempotent offline sync")
     session = models.ForeignKey(WorkoutSession, on_delete=models.CASCADE)
     exercise = models.ForeignKey(Exercise, on_delete=models.CASCADE)
     set_number = models.PositiveIntegerField()
@@ -157,10 +377,8 @@ class ExerciseSetLog(models.Model):
 
     def clean(self):
         """Ensure exercise belongs to the plan tied to the session."""
-        if self.session.plan:
-            plan_exercises = Exercise.objects.filter(
-                workout_plan=self.session.plan)
-            if self.exercise not in plan_exercises:
+        if self.session.plan_id:
+            if self.exercise.workout_plan_id != self.session.plan_id:
                 from django.core.exceptions import ValidationError
                 raise ValidationError(
                     f"Exercise '{self.exercise.name}' is not part of the workout plan '{self.session.plan.name}'.")
@@ -173,6 +391,181 @@ class ExerciseSetLog(models.Model):
         return f"{self.exercise.name} - Set {self.set_number}"
 
 
+class RepLog(models.Model):
+    """
+    A single rep as measured by the client-side pose tracking (duration,
+    joint angles, form verdict). Stored per session in (set, rep) order so
+    rep-level analytics read one contiguous index range.
+    """
+    session = models.ForeignKey(WorkoutSession, on_delete=models.CASCADE, related_name='rep_logs')
+    set_number = models.PositiveIntegerField()
+    rep_number = models.PositiveIntegerField()
+    duration = models.FloatField(help_text="Seconds taken for the rep")
+    is_good_form = models.BooleanField(default=True)
+    start_angle = models.FloatField(null=True, blank=True)
+    max_angle = models.FloatField(null=True, blank=True)
+    feedback = models.CharField(max_length=255, blank=True, default="")
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('session', 'set_number', 'rep_number')
+        ordering = ['session', 'set_number', 'rep_number']
+
+    def __str__(self):
+        return f"{self.session_id} - Set {self.set_number} Rep {self.rep_number}"
+
+
+def apply_rollup_deltas(model, lookup, deltas):
+    """
+    Add ``deltas`` (field → amount) to the rollup row of ``model`` matching
+    ``lookup`` with a single ``UPDATE ... SET field = field + amount``.
+    Positive deltas create the row if needed; negative ones only touch
+    existing rows so cascading deletes never resurrect a rollup.
+    """
+    deltas = {field: amount for field, amount in deltas.items() if amount}
+    if not deltas:
+        return
+    increments = {field: models.F(field) + amount for field, amount in deltas.items()}
+    if model.objects.filter(**lookup).update(**increments):
+        return
+    if any(amount < timedelta(0) if isinstance(amount, timedelta) else amount < 0
+           for amount in deltas.values()):
+        return
+    row, created = model.objects.get_or_create(**lookup, defaults=deltas)
+    if not created:
+        model.objects.filter(pk=row.pk).update(**increments)
+
+
+class UserDailyStats(models.Model):
+    """
+    Per-user, per-day rollup of sessions and set logs.
+    Kept up to date by the receivers in pace.signals so analytics
+    reads scale with the days shown rather than the full history.
+    """
+    user = models.ForeignKey(user, on_delete=models.CASCADE)
+    date = models.DateField()
+    sessions_completed = models.PositiveIntegerField(default=0)
+    total_duration = models.DurationField(default=timedelta(0))
+    score_sum = models.FloatField(default=0)
+    score_count = models.PositiveIntegerField(default=0)
+    volume = models.FloatField(default=0, help_text="Sum of reps × weight (kg)")
+
+    class Meta:
+        unique_together = ('user', 'date')
+        ordering = ['user', 'date']
+
+    @classmethod
+    def apply(cls, user_id, day, **deltas):
+        """Add ``deltas`` (field → amount) to the row for ``user_id`` on ``day``."""
+        apply_rollup_deltas(cls, {'user_id': user_id, 'date': day}, deltas)
+
+    @property
+    def average_score(self):
+        return self.score_sum / self.score_count if self.score_count else None
+
+    def __str__(self):
+        return f"{self.user.username} - {self.date}"
+
+
+class UserExerciseStats(models.Model):
+    """
+    Per-user, per-exercise score rollup backing the accuracy-per-exercise
+    chart. Keyed on the catalog entry, so every spelling of an exercise
+    lands on one row and renaming the entry moves nothing.
+    """
+    user = models.ForeignKey(user, on_delete=models.CASCADE)
+    definition = models.ForeignKey(ExerciseDefinition, on_delete=models.CASCADE, related_name='+')
+    score_sum = models.FloatField(default=0)
+    score_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'definition')
+        ordering = ['user', 'definition']
+
+    @classmethod
+    def apply(cls, user_id, definition_id, **deltas):
+        """Add ``deltas`` to the row for ``user_id`` and ``definition_id``."""
+        apply_rollup_deltas(cls, {'user_id': user_id, 'definition_id': definition_id}, deltas)
+
+    @property
+    def average_score(self):
+        return self.score_sum / self.score_count if self.score_count else None
+
+    def __str__(self):
+        return f"{self.user.username} - {self.definition.name}"
+
+
+class SessionTempoStats(models.Model):
+    """
+    Per-session, per-exercise rep tempo (seconds per rep) built from the
+    sets that recorded both reps and duration. Kept up to date by
+    pace.signals so history-wide tempo analytics never rescan set logs.
+    """
+    # Seconds-per-rep boundaries for the too fast / good / too slow buckets
+    FAST_BELOW = 1.0
+    SLOW_ABOVE = 1.5
+
+    session = models.ForeignKey(WorkoutSession, on_delete=models.CASCADE, related_name='tempo_stats')
+    definition = models.ForeignKey(ExerciseDefinition, on_delete=models.CASCADE, related_name='+')
+    reps = models.PositiveIntegerField(default=0)
+    seconds = models.PositiveIntegerField(default=0)
+    too_fast_reps = models.PositiveIntegerField(default=0)
+    good_reps = models.PositiveIntegerField(default=0)
+    too_slow_reps = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('session', 'definition')
+        ordering = ['session', 'definition']
+
+    @classmethod
+    def bucket(cls, seconds_per_rep):
+        """Name of the ``*_reps`` field a set with this tempo counts towards."""
+        if seconds_per_rep < cls.FAST_BELOW:
+            return 'too_fast_reps'
+        if seconds_per_rep > cls.SLOW_ABOVE:
+            return 'too_slow_reps'
+        return 'good_reps'
+
+    @classmethod
+    def apply(cls, session_id, definition_id, **deltas):
+        """Add ``deltas`` to the row for ``session_id`` and ``definition_id``."""
+        apply_rollup_deltas(cls, {'session_id': session_id, 'definition_id': definition_id}, deltas)
+
+    @property
+    def seconds_per_rep(self):
+        return self.seconds / self.reps if self.reps else None
+
+    def __str__(self):
+        return f"{self.session_id} - {self.definition.name}"
+
+
+class SessionSummary(models.Model):
+    """
+    Snapshot of a completed session: per-exercise totals, session totals and
+    the rendered session detail (``payload``), so reading a finished
+    session is a single-row lookup instead of a join over its logs.
+
+    Built by pace.signals when the session completes and rebuilt if it or
+    its logs change afterwards. Plan and exercise names are kept as they
+    were when the snapshot was built.
+    """
+    session = models.OneToOneField(
+        WorkoutSession, on_delete=models.CASCADE, primary_key=True, related_name='summary')
+    exercises = models.JSONField(
+        default=list, encoder=DjangoJSONEncoder,
+        help_text="Per-exercise sets, reps, volume, average score and best set, in plan order")
+    total_sets = models.PositiveIntegerField(default=0)
+    total_reps = models.PositiveIntegerField(default=0)
+    total_volume = models.FloatField(default=0)  # sum of reps × weight_kg
+    average_score = models.FloatField(null=True, blank=True)
+    duration = models.DurationField(null=True, blank=True)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Summary of session {self.session_id}"
+
+
 class DailyStreak(models.Model):
     user = models.OneToOneField(user, on_delete=models.CASCADE)
     streak_count = models.PositiveIntegerField(default=0)
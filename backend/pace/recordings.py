@@ -0,0 +1,190 @@
+"""
+Compact binary storage for pose-landmark recordings.
+
+Frames arrive from pace.streaming as ``FRAME_DTYPE`` records and are spooled
+to ``<MEDIA_ROOT>/recordings/session_<id>.frames`` as-is. ``compact()``
+turns a spool into a ``.pacerec`` file (version 1, little-endian)::
+
+    header        HEADER (magic, version, landmarks, quant scale,
+                  frames per block, frame count, block count, index offset)
+    blocks        one per BLOCK_FRAMES frames:
+                    int16  keyframe[landmarks * 3]           absolute coordinates
+                    int16  velocity[landmarks * 3]           frame 1 - frame 0
+                    intN   residuals[n - 2][landmarks * 3]   change in velocity
+                                                             (delta of deltas),
+                                                             N = 8 when all fit,
+                                                             else 16
+                    uint8  visibility[n][landmarks]
+    index         uint32 t_ms[frame count], then BLOCK_DTYPE[block count]
+
+Landmarks move smoothly at 30 fps, so the change in velocity between
+frames is small and most blocks store 1-byte residuals: about 140 bytes
+per frame (~15 MB per hour) against ~40 MB for JSON.
+
+``Recording`` reads the file through ``numpy.memmap`` and decodes only
+the blocks a request touches, so seeking to a rep costs one or two
+blocks regardless of the recording's length.
+"""
+import os
+import struct
+
+import numpy as np
+from django.conf import settings
+
+
+LANDMARKS = 33
+QUANT_SCALE = 10_000
+BLOCK_FRAMES = 128  # ~4 seconds at 30 fps
+VERSION = 1
+MAGIC = b'PACEREC\x00'
+
+FRAME_DTYPE = np.dtype([
+    ('t_ms', '<u4'),
+    ('xyz', '<i2', (LANDMARKS, 3)),
+    ('visibility', 'u1', (LANDMARKS,)),
+])
+HEADER = struct.Struct('<8sHHIIQQQ')
+BLOCK_DTYPE = np.dtype([('offset', '<u8'), ('residual_width', 'u1')])
+
+
+def quantize(xyz, visibility):
+    """Pack float landmarks (frames × 33 × 3) and visibility (frames × 33) into int16 / uint8."""
+    xyz = np.clip(np.rint(np.asarray(xyz) * QUANT_SCALE), -32768, 32767).astype('<i2')
+    visibility = np.rint(np.clip(np.asarray(visibility), 0, 1) * 255).astype('u1')
+    return xyz, visibility
+
+
+def dequantize(frames):
+    """Float ``(xyz, visibility)`` arrays from a ``FRAME_DTYPE`` array."""
+    return frames['xyz'] / QUANT_SCALE, frames['visibility'] / 255
+
+
+def spool_path(session_id):
+    return os.path.join(settings.MEDIA_ROOT, 'recordings', f'session_{session_id}.frames')
+
+
+def recording_path(session_id):
+    return os.path.join(settings.MEDIA_ROOT, 'recordings', f'session_{session_id}.pacerec')
+
+
+def append_frames(session_id, chunk):
+    """Append a chunk of raw ``FRAME_DTYPE`` frames to the session's spool."""
+    path = spool_path(session_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'ab') as f:
+        f.write(chunk)
+
+
+def _encode_block(frames):
+    xyz = frames['xyz'].reshape(len(frames), -1).astype(np.int32)
+    velocity = np.diff(xyz, axis=0)
+    residuals = np.diff(velocity, axis=0)
+    width = 1 if residuals.size == 0 or (residuals.min() >= -128 and residuals.max() <= 127) else 2
+    # int16 values may wrap around; decoding wraps the same way, so it stays lossless
+    return width, b''.join((
+        xyz[0].astype('<i2').tobytes(),
+        velocity[:1].astype('<i2').tobytes(),
+        residuals.astype(f'<i{width}').tobytes(),
+        np.ascontiguousarray(frames['visibility']).tobytes(),
+    ))
+
+
+def write_recording(path, frames, block_frames=BLOCK_FRAMES):
+    """
+    Write ``frames`` (a ``FRAME_DTYPE`` array, possibly memory-mapped) to
+    ``path``, encoding one block at a time.
+    """
+    blocks = np.zeros((len(frames) + block_frames - 1) // block_frames, dtype=BLOCK_DTYPE)
+    with open(path, 'wb') as f:
+        f.write(b'\x00' * HEADER.size)
+        for i, start in enumerate(range(0, len(frames), block_frames)):
+            width, data = _encode_block(frames[start:start + block_frames])
+            blocks[i] = (f.tell(), width)
+            f.write(data)
+        index_offset = f.tell()
+        f.write(np.ascontiguousarray(frames['t_ms']).tobytes())
+        f.write(blocks.tobytes())
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, LANDMARKS, QUANT_SCALE, block_frames,
+                            len(frames), len(blocks), index_offset))
+
+
+def compact(session_id):
+    """Rewrite a session's spool as a ``.pacerec`` recording (atomically replacing any previous one)."""
+    spool = spool_path(session_id)
+    if not os.path.exists(spool) or not os.path.getsize(spool):
+        return None
+    path = recording_path(session_id)
+    write_recording(f'{path}.tmp', np.memmap(spool, dtype=FRAME_DTYPE, mode='r'))
+    os.replace(f'{path}.tmp', path)
+    return path
+
+
+class Recording:
+    """
+    Memory-mapped reader for a ``.pacerec`` file.
+
+    ``frames(start, stop)`` and ``between(start_ms, end_ms)`` return
+    ``FRAME_DTYPE`` arrays, decoding only the blocks they overlap.
+    """
+
+    def __init__(self, path):
+        self._data = np.memmap(path, dtype='u1', mode='r')
+        magic, version, landmarks, quant_scale, self.block_frames, frame_count, block_count, index_offset = (
+            HEADER.unpack(self._data[:HEADER.size].tobytes())
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a pose recording.")
+        if version != VERSION or landmarks != LANDMARKS or quant_scale != QUANT_SCALE:
+            raise ValueError(f"Unsupported recording format in {path}.")
+
+        timestamps_end = index_offset + 4 * frame_count
+        self.timestamps = self._data[index_offset:timestamps_end].view('<u4')
+        self._blocks = self._data[timestamps_end:timestamps_end + BLOCK_DTYPE.itemsize * block_count].view(BLOCK_DTYPE)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def block(self, i):
+        """Decode block ``i``."""
+        offset, width = int(self._blocks[i]['offset']), int(self._blocks[i]['residual_width'])
+        n = min(self.block_frames, len(self) - i * self.block_frames)
+        values = LANDMARKS * 3
+
+        velocity_start = offset + 2 * values
+        residuals_start = velocity_start + 2 * values * min(n - 1, 1)
+        visibility_start = residuals_start + width * values * max(n - 2, 0)
+        residuals = self._data[residuals_start:visibility_start].view(f'<i{width}').reshape(-1, values)
+
+        # Integrate twice: residuals → velocity → position (int16 arithmetic wraps like the encoder)
+        velocity = np.empty((n - 1, values), dtype=np.int16)
+        if n > 1:
+            velocity[0] = self._data[velocity_start:residuals_start].view('<i2')
+            np.cumsum(residuals, axis=0, dtype=np.int16, out=velocity[1:])
+            velocity[1:] += velocity[0]
+        xyz = np.empty((n, values), dtype=np.int16)
+        xyz[0] = self._data[offset:velocity_start].view('<i2')
+        np.cumsum(velocity, axis=0, dtype=np.int16, out=xyz[1:])
+        xyz[1:] += xyz[0]
+
+        frames = np.empty(n, dtype=FRAME_DTYPE)
+        start = i * self.block_frames
+        frames['t_ms'] = self.timestamps[start:start + n]
+        frames['xyz'] = xyz.reshape(n, LANDMARKS, 3)
+        frames['visibility'] = self._data[visibility_start:visibility_start + n * LANDMARKS].reshape(n, LANDMARKS)
+        return frames
+
+    def frames(self, start=0, stop=None):
+        """Frames ``start`` up to (not including) ``stop``."""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            return np.empty(0, dtype=FRAME_DTYPE)
+        first, last = start // self.block_frames, (stop - 1) // self.block_frames
+        decoded = np.concatenate([self.block(i) for i in range(first, last + 1)])
+        offset = first * self.block_frames
+        return decoded[start - offset:stop - offset]
+
+    def between(self, start_ms, end_ms):
+        """Frames with ``start_ms <= t_ms < end_ms``, e.g. a single rep."""
+        start, stop = np.searchsorted(self.timestamps, [start_ms, end_ms])
+        return self.frames(int(start), int(stop))
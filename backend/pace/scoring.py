@@ -0,0 +1,200 @@
+"""
+Server-side form scoring for recorded sessions.
+
+Reimplements the browser trackers (frontend/src/utils/geometry.ts and the
+per-frame loops in hooks/use-squat-tracker.tsx / use-bicep-tracker.tsx) as
+batched NumPy operations over a ``(frames, 33, 4)`` array of MediaPipe
+landmarks (x, y, z, visibility):
+
+- joint angles for every frame at once (``joint_angles``)
+- the visibility gate (``visible``); frames failing it are skipped, like
+  the early ``return`` in the hooks
+- rep segmentation: the trackers' two-threshold state machine is the
+  forward-filled last threshold crossing, so reps fall out of a few
+  array comparisons instead of a Python loop (``segment_reps``)
+- form faults as runs of consecutive failing frames (``run_lengths``)
+
+A rep is good when it is slow enough, deep enough (squats) and no fault
+persisted for more than ``FAULT_FRAMES`` frames during it. The hooks only
+flag a rep when a warning fires on its final frame; scoring the whole rep
+is the stricter, order-independent version of that check. Session accuracy
+is good reps / reps × 100, as in utils/rep-tracker.ts.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from pace.recordings import dequantize
+
+
+# MediaPipe pose landmark indices (right side, left side)
+SHOULDER = (12, 11)
+ELBOW = (14, 13)
+WRIST = (16, 15)
+HIP = (24, 23)
+KNEE = (26, 25)
+ANKLE = (28, 27)
+
+VISIBILITY_THRESHOLD = 0.5
+FAULT_FRAMES = 45  # ~1.5 seconds at 30 fps
+SET_GAP_MS = 10_000  # a pause this long in a recording separates two sets
+
+
+@dataclass(frozen=True)
+class Thresholds:
+    """Angles (degrees) and timings used to segment and judge reps."""
+    start_angle: float  # crossing this starts a rep
+    end_angle: float  # crossing this completes it
+    start_above: bool  # whether the start crossing is upwards (angle > start_angle)
+    min_seconds: float
+    depth_angle: float = None  # squat only: the minimum angle must go below this
+
+
+SQUAT = Thresholds(start_angle=120, end_angle=140, start_above=False, min_seconds=2.0, depth_angle=110)
+BICEP_CURL = Thresholds(start_angle=165, end_angle=35, start_above=True, min_seconds=1.0)
+
+
+def exercise_type(name):
+    """Tracker used for an exercise name, as in hooks/use-exercise-tracker.tsx."""
+    name = (name or "").lower()
+    if "squat" in name:
+        return "squat"
+    return "bicep_curl"
+
+
+def landmarks_from_frames(frames):
+    """``(frames, 33, 4)`` float landmarks from a pace.recordings ``FRAME_DTYPE`` array."""
+    xyz, visibility = dequantize(frames)
+    return np.concatenate([xyz, visibility[..., None]], axis=-1)
+
+
+def joint_angles(landmarks, a, b, c):
+    """Angle ABC in degrees (0-180) per frame, using x and y like calculateAngle()."""
+    a, b, c = landmarks[:, a, :2], landmarks[:, b, :2], landmarks[:, c, :2]
+    radians = (np.arctan2(c[:, 1] - b[:, 1], c[:, 0] - b[:, 0])
+               - np.arctan2(a[:, 1] - b[:, 1], a[:, 0] - b[:, 0]))
+    angle = np.abs(np.degrees(radians))
+    return np.where(angle > 180, 360 - angle, angle)
+
+
+def visible(landmarks, indices, threshold=VISIBILITY_THRESHOLD):
+    """Frames where every landmark in ``indices`` is visible, like checkLandmarkVisibility()."""
+    return (landmarks[:, list(indices), 3] > threshold).all(axis=1)
+
+
+def run_lengths(mask):
+    """Length of the run of consecutive True values ending at each frame (0 where False)."""
+    index = np.arange(1, len(mask) + 1)
+    last_false = np.maximum.accumulate(np.where(mask, 0, index))
+    return index - last_false
+
+
+def segment_reps(angles, thresholds):
+    """
+    ``(starts, ends)`` frame indices of completed reps.
+
+    A frame is a start event when it crosses ``start_angle`` and an end event
+    when it crosses ``end_angle``; the tracker's stage after any frame is
+    the most recent event. A rep starts at a start event not already in a
+    rep and completes at the first end event after it.
+    """
+    if thresholds.start_above:
+        start_event, end_event = angles > thresholds.start_angle, angles < thresholds.end_angle
+    else:
+        start_event, end_event = angles < thresholds.start_angle, angles > thresholds.end_angle
+
+    # Stage after each frame: index of the latest event, and whether it was a start
+    events = start_event | end_event
+    latest = np.maximum.accumulate(np.where(events, np.arange(len(angles)), -1))
+    in_rep = np.where(latest >= 0, start_event[np.maximum(latest, 0)], False)
+    was_in_rep = np.concatenate([[False], in_rep[:-1]])
+
+    starts = np.flatnonzero(start_event & ~was_in_rep)
+    ends = np.flatnonzero(end_event & was_in_rep)
+    return starts[:len(ends)], ends
+
+
+def _per_rep(ufunc, values, starts, ends):
+    """Reduce ``values`` over each rep's frames ``[start, end]`` with one ``reduceat``."""
+    if not len(ends):
+        return np.empty(0, dtype=values.dtype)
+    padded = np.append(values, values[-1:])  # keeps end + 1 a valid index
+    return ufunc.reduceat(padded, np.column_stack([starts, ends + 1]).ravel())[::2]
+
+
+def _faults(landmarks, exercise, side):
+    """Per-frame form faults (frames × checks) for ``exercise``."""
+    if exercise == "squat":
+        knee, ankle = landmarks[:, KNEE[side]], landmarks[:, ANKLE[side]]
+        shoulder, hip = landmarks[:, SHOULDER[side]], landmarks[:, HIP[side]]
+        return np.stack([
+            np.abs(knee[:, 0] - ankle[:, 0]) > 0.1,  # knees past toes
+            np.abs(shoulder[:, 1] - hip[:, 1]) < 0.12,  # chest down
+        ], axis=1)
+    shoulder, elbow, wrist = landmarks[:, SHOULDER[side]], landmarks[:, ELBOW[side]], landmarks[:, WRIST[side]]
+    return np.stack([
+        np.abs(elbow[:, 1] - shoulder[:, 1]) > 0.25,  # elbow overextended
+        np.abs(wrist[:, 1] - elbow[:, 1]) < 0.08,  # partial range of motion
+    ], axis=1)
+
+
+def score_landmarks(landmarks, t_ms, exercise, side="right"):
+    """
+    Score one recorded set or session of ``exercise`` ("squat" or
+    "bicep_curl") from ``(frames, 33, 4)`` landmarks and frame timestamps.
+
+    Returns a dict with the rep count, good reps, accuracy (0-100) and
+    per-rep arrays (``rep_seconds``, ``rep_good``, ``rep_min_angle``).
+    """
+    side = 0 if side == "right" else 1
+    if exercise == "squat":
+        thresholds, joints = SQUAT, (HIP[side], KNEE[side], ANKLE[side])
+    else:
+        thresholds, joints = BICEP_CURL, (SHOULDER[side], ELBOW[side], WRIST[side])
+
+    # Frames the tracker would skip never reach the state machine
+    keep = visible(landmarks, joints)
+    landmarks, t_ms = landmarks[keep], np.asarray(t_ms)[keep]
+    angles = joint_angles(landmarks, *joints)
+    starts, ends = segment_reps(angles, thresholds)
+
+    seconds = (t_ms[ends].astype(np.int64) - t_ms[starts]) / 1000
+    min_angle = _per_rep(np.minimum, angles, starts, ends)
+    good = seconds >= thresholds.min_seconds
+    if thresholds.depth_angle is not None:
+        good &= min_angle < thresholds.depth_angle
+
+    faults = _faults(landmarks, exercise, side)
+    if exercise == "squat":
+        # Squat checks only count while in the squatting stage: frames (start, end]
+        marks = np.zeros(len(angles) + 2, dtype=np.int64)
+        np.add.at(marks, starts + 1, 1)
+        np.add.at(marks, ends + 1, -1)
+        faults &= (np.cumsum(marks)[:len(angles)] > 0)[:, None]
+    persistent = np.zeros(len(angles), dtype=bool)
+    for check in faults.T:
+        persistent |= run_lengths(check) > FAULT_FRAMES
+    good &= ~_per_rep(np.logical_or, persistent, starts, ends)
+
+    reps = len(ends)
+    return {
+        "reps": reps,
+        "good_reps": int(good.sum()),
+        "accuracy": round(good.sum() / reps * 100, 2) if reps else 100.0,
+        "rep_seconds": seconds,
+        "rep_good": good,
+        "rep_min_angle": min_angle,
+    }
+
+
+def split_sets(t_ms, min_gap_ms=SET_GAP_MS):
+    """
+    ``(start, stop)`` frame ranges of the sets in a session recording: the
+    client stops streaming while resting, so sets are the runs of frames
+    separated by at least ``min_gap_ms`` without any.
+    """
+    if not len(t_ms):
+        return []
+    cuts = np.flatnonzero(np.diff(np.asarray(t_ms, dtype=np.int64)) >= min_gap_ms) + 1
+    bounds = [0, *cuts.tolist(), len(t_ms)]
+    return list(zip(bounds[:-1], bounds[1:]))
@@ -1,3 +1,5 @@
+from datetime import date, timedelta
+
 from rest_framework import serializers
 from pace.models import *
 
@@ -20,6 +22,11 @@ class FitnessProfileSerializer(serializers.ModelSerializer):
 
 
 class ExerciseSerializer(serializers.ModelSerializer):
+    name = serializers.CharField(source='definition.name', read_only=True)
+    # Dense 1-based position in the plan (the stored ``order`` is a sparse rank),
+    # which callers set on each exercise as ``position`` from the plan they loaded
+    order = serializers.IntegerField(source='position', read_only=True)
+
     class Meta:
         model = Exercise
         fields = ['id', 'name', 'order', 'sets',
@@ -27,27 +34,83 @@ class ExerciseSerializer(serializers.ModelSerializer):
 
 
 class WorkoutPlanSerializer(serializers.ModelSerializer):
-    exercises = ExerciseSerializer(many=True, read_only=True)
+    exercises = serializers.SerializerMethodField()
+
+    def get_exercises(self, obj):
+        # Views prefetch the exercises with their definitions (PLAN_EXERCISES)
+        exercises = list(obj.exercises.all())
+        for position, exercise in enumerate(exercises, start=1):
+            exercise.position = position
+        return ExerciseSerializer(exercises, many=True).data
+
+    def validate(self, attrs):
+        # Views pass the request in the context; the owner is the editing user for new plans
+        request = self.context.get('request')
+        owner_id = self.instance.user_id if self.instance else (request.user.pk if request else None)
+        name = attrs.get('name')
+        if name and owner_id is not None:
+            others = WorkoutPlan.objects.filter(user_id=owner_id, name=name)
+            if self.instance:
+                others = others.exclude(pk=self.instance.pk)
+            if others.exists():
+                raise serializers.ValidationError({'name': ["You already have a workout plan with this name."]})
+        if attrs.get('is_template') and not (request and request.user.is_staff):
+            raise serializers.ValidationError({'is_template': ["Only staff can publish plan templates."]})
+        return attrs
 
     class Meta:
         model = WorkoutPlan
         fields = ['id', 'name', 'description',
-                  'created_at', 'updated_at', 'duration_minutes', 'difficulty_level', 'exercises']
-        read_only_fields = ['id', 'created_at', 'updated_at']
+                  'created_at', 'updated_at', 'duration_minutes', 'difficulty_level',
+                  'is_template', 'source', 'exercises']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'source']
 
 
 class ExerciseSetLogSerializer(serializers.ModelSerializer):
     exercise_name = serializers.CharField(
-        source="exercise.name", read_only=True)
+        source="exercise.definition.name", read_only=True)
 
     class Meta:
         model = ExerciseSetLog
         fields = [
-            "id", "exercise", "exercise_name", "set_number",
+            "id", "uuid", "exercise", "exercise_name", "set_number",
             "reps_completed", "weight_kg", "duration_seconds", "score"
         ]
 
 
+class ExerciseSetLogItemSerializer(serializers.ModelSerializer):
+    """One set of a bulk set-log POST; the exercise is checked against the plan by the view."""
+    exercise_id = serializers.IntegerField()
+
+    class Meta:
+        model = ExerciseSetLog
+        fields = [
+            "exercise_id", "set_number", "reps_completed", "weight_kg", "duration_seconds", "score",
+        ]
+        extra_kwargs = {
+            "set_number": {"min_value": 1},
+            "weight_kg": {"min_value": 0},
+            "score": {"min_value": 0, "max_value": 100},
+        }
+        # Uniqueness is checked once per batch by the bulk insert, not per set
+        validators = []
+
+
+class RepLogSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RepLog
+        fields = [
+            "id", "session_id", "set_number", "rep_number", "duration", "is_good_form",
+            "start_angle", "max_angle", "feedback", "timestamp",
+        ]
+        extra_kwargs = {
+            "set_number": {"min_value": 1},
+            "rep_number": {"min_value": 1},
+        }
+        # Uniqueness is checked once per batch by the bulk insert, not per rep
+        validators = []
+
+
 class WorkoutSessionSerializer(serializers.ModelSerializer):
     plan_name = serializers.CharField(source="plan.name", read_only=True)
     logs = ExerciseSetLogSerializer(
@@ -56,11 +119,31 @@ class WorkoutSessionSerializer(serializers.ModelSerializer):
     class Meta:
         model = WorkoutSession
         fields = [
-            "id", "date", "plan", "plan_name", "rest_period_seconds",
+            "id", "uuid", "date", "plan", "plan_name", "rest_period_seconds",
             "score", "duration", "completed", "logs"
         ]
 
 
+class SessionSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SessionSummary
+        fields = [
+            "exercises", "total_sets", "total_reps", "total_volume",
+            "average_score", "duration", "built_at",
+        ]
+
+
+class WorkoutSessionSummarySerializer(WorkoutSessionSerializer):
+    """
+    A session without its set logs (session history pages). Completed
+    sessions carry their ``summary`` card; it is null until completion.
+    """
+    summary = SessionSummarySerializer(read_only=True)
+
+    class Meta(WorkoutSessionSerializer.Meta):
+        fields = [field for field in WorkoutSessionSerializer.Meta.fields if field != "logs"] + ["summary"]
+
+
 class DailyStreakSerializer(serializers.ModelSerializer):
     class Meta:
         model = DailyStreak
@@ -73,3 +156,53 @@ class FitnessAnalyticsSerializer(serializers.Serializer):
     average_accuracy = serializers.FloatField()
     accuracy_over_time = serializers.ListField()
     accuracy_per_exercise = serializers.ListField()
+
+
+class AccuracyTrendSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    accuracy = serializers.FloatField()
+
+
+class WeeklyVolumeSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    exercises = serializers.DictField(child=serializers.FloatField())
+    total = serializers.FloatField()
+
+
+class RepSpeedSerializer(serializers.Serializer):
+    session_id = serializers.IntegerField(required=False)
+    too_fast = serializers.IntegerField()
+    good = serializers.IntegerField()
+    too_slow = serializers.IntegerField()
+    average_seconds_per_rep = serializers.FloatField(allow_null=True)
+    exercises = serializers.ListField()
+    sets = serializers.ListField(required=False)
+
+
+class SyncSessionSerializer(serializers.Serializer):
+    """A queued ``session.create`` / ``session.update`` mutation."""
+    uuid = serializers.UUIDField()
+    plan = serializers.IntegerField(allow_null=True, required=False)
+    rest_period_seconds = serializers.IntegerField(min_value=0, allow_null=True, required=False)
+    score = serializers.FloatField(allow_null=True, required=False)
+    duration = serializers.DurationField(allow_null=True, required=False)
+    completed = serializers.BooleanField(required=False)
+    date = serializers.DateField(required=False)
+
+    def validate_date(self, value):
+        # A day of slack for clients in time zones ahead of the server
+        if value > date.today() + timedelta(days=1):
+            raise serializers.ValidationError("A session cannot be dated in the future.")
+        return value
+
+
+class SyncSetLogSerializer(serializers.Serializer):
+    """A queued ``set_log.upsert`` mutation."""
+    uuid = serializers.UUIDField()
+    session_uuid = serializers.UUIDField()
+    exercise_id = serializers.IntegerField()
+    set_number = serializers.IntegerField(min_value=1)
+    reps_completed = serializers.IntegerField(min_value=0, allow_null=True, required=False)
+    weight_kg = serializers.FloatField(allow_null=True, required=False)
+    duration_seconds = serializers.IntegerField(min_value=0, allow_null=True, required=False)
+    score = serializers.FloatField(allow_null=True, required=False)
@@ -1,7 +1,16 @@
+from datetime import timedelta
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models import Count, F, Prefetch, Sum
+from django.db.models.signals import post_save, pre_save, pre_delete, post_delete
 from django.dispatch import receiver
-from pace.models import FitnessProfile, ExerciseSetLog, WorkoutSession, DailyStreak 
+from django.utils import timezone
+from pace.models import (
+    FitnessProfile, ExerciseDefinition, ExerciseSetLog, WorkoutSession, DailyStreak,
+    UserDailyStats, UserExerciseStats, SessionTempoStats, Exercise, WorkoutPlan, SessionSummary,
+)
+from pace.cache import bump_analytics_generation
+from pace.serializers import WorkoutSessionSerializer
 
 # Works for all CustomUser creations (manual, admin, scripts)
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
@@ -13,29 +22,97 @@ def create_fitness_profile_for_user(sender, instance, created, **kwargs):
             FitnessProfile.objects.create(user=instance)
 
 
-@receiver(post_save, sender=ExerciseSetLog)
-def mark_session_completed(sender, instance, **kwargs):
-    session = instance.session
-    plan = session.plan
+def cover_session_exercises(session, exercise_ids):
+    """
+    Record that ``exercise_ids`` now have at least one logged set in
+    ``session`` and mark the session completed once every exercise in its
+    plan is covered.
 
-    if not plan:
+    Coverage is tracked incrementally in ``WorkoutSession.logged_exercise_ids``:
+    a set for an already covered exercise costs no queries, and a newly
+    covered exercise locks the session row so concurrent writers (e.g. two
+    devices) never lose an update.
+    """
+    if not session.plan_id:
         return  # No plan linked, cannot auto-complete
 
-    # Get all exercise IDs in the plan
-    plan_exercise_ids = list(plan.exercises.values_list("id", flat=True))
+    new_ids = set(exercise_ids) - set(session.logged_exercise_ids)
+    if not new_ids:
+        return
+
+    with transaction.atomic():
+        locked = WorkoutSession.objects.select_for_update().get(pk=session.pk)
+        covered = set(locked.logged_exercise_ids)
+        if not new_ids - covered:
+            session.logged_exercise_ids = locked.logged_exercise_ids
+            return
+
+        locked.logged_exercise_ids = sorted(covered | new_ids)
+        update_fields = ["logged_exercise_ids"]
+        # All exercises in the plan have been logged → mark session completed
+        if not locked.completed and not (
+            locked.plan.exercises.exclude(id__in=locked.logged_exercise_ids).exists()
+        ):
+            locked.completed = True
+            update_fields.append("completed")
+        locked.save(update_fields=update_fields)
+
+    session.logged_exercise_ids = locked.logged_exercise_ids
+    session.completed = locked.completed
+
+
+def uncover_session_exercises(session, exercise_ids):
+    """
+    Drop ``exercise_ids`` from the coverage of ``session`` unless a set is
+    still logged for them, e.g. after a log was deleted or moved to another
+    exercise. A session that was already completed stays completed.
+    """
+    exercise_ids = set(exercise_ids)
+    if not exercise_ids:
+        return
+
+    with transaction.atomic():
+        locked = WorkoutSession.objects.select_for_update().filter(pk=session.pk).first()
+        if locked is None:
+            return  # The session is being deleted along with its logs
+        covered = set(locked.logged_exercise_ids)
+        candidates = covered & exercise_ids
+        gone = candidates and candidates - set(
+            ExerciseSetLog.objects.filter(session_id=session.pk, exercise_id__in=candidates)
+            .values_list("exercise_id", flat=True)
+        )
+        if gone:
+            # Bookkeeping only: an update() keeps the session's save signals (streak, summary) out of it
+            locked.logged_exercise_ids = sorted(covered - gone)
+            WorkoutSession.objects.filter(pk=session.pk).update(logged_exercise_ids=locked.logged_exercise_ids)
+
+    session.logged_exercise_ids = locked.logged_exercise_ids
+
+
+def deleted_with_session(origin):
+    """
+    Whether a delete started at a session (or a queryset of sessions), so
+    every log it cascades to goes along with its session. The per-log
+    receivers then skip their work (coverage, summary, ETag and rollup
+    lookups); the session's own receivers handle the logs in one go.
+    """
+    return isinstance(origin, WorkoutSession) or getattr(origin, "model", None) is WorkoutSession
 
-    # Check if all exercises in the plan have at least one set logged
-    logged_exercise_ids = list(
-        ExerciseSetLog.objects.filter(session=session)
-        .values_list("exercise_id", flat=True)
-        .distinct()
-    )
 
-    if set(plan_exercise_ids).issubset(set(logged_exercise_ids)):
-        # All exercises have been logged → mark session completed
-        if not session.completed:
-            session.completed = True
-            session.save()
+@receiver(post_save, sender=ExerciseSetLog)
+def mark_session_completed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous_exercise_id = getattr(instance, "_previous_exercise_id", None)
+    if previous_exercise_id not in (None, instance.exercise_id):
+        uncover_session_exercises(instance.session, [previous_exercise_id])
+    cover_session_exercises(instance.session, [instance.exercise_id])
+
+
+@receiver(post_delete, sender=ExerciseSetLog)
+def uncover_deleted_set_log(sender, instance, origin=None, **kwargs):
+    if not deleted_with_session(origin):
+        uncover_session_exercises(instance.session, [instance.exercise_id])
 
 
 @receiver(post_save, sender=WorkoutSession)
@@ -46,3 +123,476 @@ def update_daily_streak(sender, instance, created, **kwargs):
     if instance.completed:
         streak, _ = DailyStreak.objects.get_or_create(user=instance.user)
         streak.update_streak()
+
+
+# -------------------------
+# Analytics rollups (UserDailyStats / UserExerciseStats / SessionTempoStats)
+# -------------------------
+# Each row's contribution is captured before a write and re-applied after it,
+# so every save or delete adjusts the rollups by a delta instead of rescanning.
+
+def set_log_contribution(user_id, session_id, day, definition_id, score,
+                         reps_completed, weight_kg, duration_seconds):
+    """Rollup contribution of a single set log."""
+    contribution = {
+        "user_id": user_id,
+        "session_id": session_id,
+        "day": day,
+        "definition_id": definition_id,
+        "score_sum": score or 0,
+        "score_count": 1 if score is not None else 0,
+        "volume": (reps_completed or 0) * (weight_kg or 0),
+        "reps": 0,
+        "seconds": 0,
+        "too_fast_reps": 0,
+        "good_reps": 0,
+        "too_slow_reps": 0,
+    }
+    if reps_completed and duration_seconds:
+        contribution["reps"] = reps_completed
+        contribution["seconds"] = duration_seconds
+        contribution[SessionTempoStats.bucket(duration_seconds / reps_completed)] = reps_completed
+    return contribution
+
+
+# Additive fields of a set log contribution (the rest identify the rollup rows)
+SET_LOG_TOTALS = (
+    "score_sum", "score_count", "volume",
+    "reps", "seconds", "too_fast_reps", "good_reps", "too_slow_reps",
+)
+TEMPO_TOTALS = SET_LOG_TOTALS[3:]
+
+
+def session_contribution(user_id, day, completed, duration):
+    """Rollup contribution of a single workout session."""
+    return {
+        "user_id": user_id,
+        "day": day,
+        "sessions_completed": 1 if completed else 0,
+        "total_duration": (duration or timedelta(0)) if completed else timedelta(0),
+    }
+
+
+def _net_change(previous, current, keys):
+    """
+    Yield ``(contribution, sign)`` pairs that move the rollups from
+    ``previous`` to ``current``, collapsing them into one delta when both
+    land on the same rollup rows.
+    """
+    if previous and all(previous[k] == current[k] for k in keys):
+        yield {k: (v if k in keys else v - previous[k]) for k, v in current.items()}, 1
+        return
+    if previous:
+        yield previous, -1
+    yield current, 1
+
+
+def invalidate_analytics(*user_ids):
+    """Bump the users' analytics cache generation once the write commits."""
+    for user_id in set(user_ids):
+        transaction.on_commit(lambda user_id=user_id: bump_analytics_generation(user_id))
+
+
+def apply_set_log_contribution(contribution, sign=1):
+    UserDailyStats.apply(
+        contribution["user_id"], contribution["day"],
+        score_sum=sign * contribution["score_sum"],
+        score_count=sign * contribution["score_count"],
+        volume=sign * contribution["volume"],
+    )
+    UserExerciseStats.apply(
+        contribution["user_id"], contribution["definition_id"],
+        score_sum=sign * contribution["score_sum"],
+        score_count=sign * contribution["score_count"],
+    )
+    SessionTempoStats.apply(
+        contribution["session_id"], contribution["definition_id"],
+        **{field: sign * contribution[field] for field in TEMPO_TOTALS},
+    )
+
+
+def apply_session_contribution(contribution, sign=1):
+    UserDailyStats.apply(
+        contribution["user_id"], contribution["day"],
+        sessions_completed=sign * contribution["sessions_completed"],
+        total_duration=sign * contribution["total_duration"],
+    )
+
+
+def _stored_set_log(pk):
+    """``(rollup contribution, exercise id)`` of the stored log, or ``(None, None)``."""
+    row = (
+        ExerciseSetLog.objects.filter(pk=pk)
+        .values_list("session__user_id", "session_id", "session__date", "exercise__definition_id",
+                     "score", "reps_completed", "weight_kg", "duration_seconds", "exercise_id")
+        .first()
+    )
+    return (set_log_contribution(*row[:-1]), row[-1]) if row else (None, None)
+
+
+def _stored_session_contribution(pk):
+    row = (
+        WorkoutSession.objects.filter(pk=pk)
+        .values_list("user_id", "date", "completed", "duration")
+        .first()
+    )
+    return session_contribution(*row) if row else None
+
+
+@receiver(pre_save, sender=ExerciseSetLog)
+def capture_set_log_rollup(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # The stored exercise also tells mark_session_completed() whether the log moved
+    instance._rollup_previous, instance._previous_exercise_id = (
+        _stored_set_log(instance.pk) if instance.pk else (None, None))
+
+
+@receiver(post_save, sender=ExerciseSetLog)
+def update_set_log_rollup(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    current = set_log_contribution(
+        instance.session.user_id, instance.session_id, instance.session.date, instance.exercise.definition_id,
+        instance.score, instance.reps_completed, instance.weight_kg, instance.duration_seconds,
+    )
+    previous = getattr(instance, "_rollup_previous", None)
+    for contribution, sign in _net_change(previous, current, ("user_id", "session_id", "day", "definition_id")):
+        apply_set_log_contribution(contribution, sign)
+    invalidate_analytics(current["user_id"], *([previous["user_id"]] if previous else []))
+
+
+@receiver(pre_delete, sender=ExerciseSetLog)
+def capture_deleted_set_log_rollup(sender, instance, origin=None, **kwargs):
+    # Left unset (so nothing is removed per log) when the session takes its logs along
+    if not deleted_with_session(origin):
+        instance._rollup_previous, _ = _stored_set_log(instance.pk)
+
+
+@receiver(post_delete, sender=ExerciseSetLog)
+def remove_set_log_rollup(sender, instance, **kwargs):
+    previous = getattr(instance, "_rollup_previous", None)
+    if previous:
+        apply_set_log_contribution(previous, sign=-1)
+        invalidate_analytics(previous["user_id"])
+
+
+@receiver(pre_save, sender=Exercise)
+def capture_exercise_definition(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance._previous_definition_id = (
+        Exercise.objects.filter(pk=instance.pk).values_list("definition_id", flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Exercise)
+def move_exercise_rollups(sender, instance, raw=False, **kwargs):
+    """Renaming a plan exercise can move it to another catalog entry, and its logs with it."""
+    previous = getattr(instance, "_previous_definition_id", None)
+    if raw or previous is None or previous == instance.definition_id:
+        return
+    per_user, per_session = {}, {}
+    rows = (
+        ExerciseSetLog.objects.filter(exercise_id=instance.pk)
+        .values_list("session__user_id", "session_id", "session__date",
+                     "score", "reps_completed", "weight_kg", "duration_seconds")
+    )
+    for user_id, session_id, day, *values in rows:
+        contribution = set_log_contribution(user_id, session_id, day, previous, *values)
+        user_total = per_user.setdefault(user_id, dict.fromkeys(("score_sum", "score_count"), 0))
+        session_total = per_session.setdefault(session_id, dict.fromkeys(TEMPO_TOTALS, 0))
+        for total in (user_total, session_total):
+            for field in total:
+                total[field] += contribution[field]
+    for definition_id, sign in ((previous, -1), (instance.definition_id, 1)):
+        for user_id, total in per_user.items():
+            UserExerciseStats.apply(user_id, definition_id, **{f: sign * v for f, v in total.items()})
+        for session_id, total in per_session.items():
+            SessionTempoStats.apply(session_id, definition_id, **{f: sign * v for f, v in total.items()})
+    invalidate_analytics(*per_user)
+
+
+@receiver(pre_save, sender=WorkoutSession)
+def capture_session_rollup(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance._rollup_previous = _stored_session_contribution(instance.pk) if instance.pk else None
+
+
+@receiver(post_save, sender=WorkoutSession)
+def update_session_rollup(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    current = session_contribution(
+        instance.user_id, instance.date, instance.completed, instance.duration,
+    )
+    previous = getattr(instance, "_rollup_previous", None)
+    for contribution, sign in _net_change(previous, current, ("user_id", "day")):
+        apply_session_contribution(contribution, sign)
+    invalidate_analytics(current["user_id"], *([previous["user_id"]] if previous else []))
+
+
+def _stored_session_set_logs(session):
+    """Rollup contributions of all of ``session``'s logs, one per exercise."""
+    rows = (
+        ExerciseSetLog.objects.filter(session_id=session.pk)
+        .values("exercise__definition_id")
+        .annotate(score_sum=Sum("score"), score_count=Count("score"),
+                  volume=Sum(F("reps_completed") * F("weight_kg")))
+        .order_by()
+    )
+    # SessionTempoStats goes with the session, so the tempo fields stay 0
+    return [
+        {
+            **set_log_contribution(session.user_id, session.pk, session.date, row["exercise__definition_id"],
+                                   None, None, None, None),
+            "score_sum": row["score_sum"] or 0,
+            "score_count": row["score_count"],
+            "volume": row["volume"] or 0,
+        }
+        for row in rows
+    ]
+
+
+@receiver(pre_delete, sender=WorkoutSession)
+def capture_deleted_session_rollup(sender, instance, origin=None, **kwargs):
+    instance._rollup_previous = _stored_session_contribution(instance.pk)
+    instance._set_log_rollups_previous = _stored_session_set_logs(instance) if deleted_with_session(origin) else []
+
+
+@receiver(post_delete, sender=WorkoutSession)
+def remove_session_rollup(sender, instance, **kwargs):
+    previous = getattr(instance, "_rollup_previous", None)
+    if previous:
+        apply_session_contribution(previous, sign=-1)
+        invalidate_analytics(previous["user_id"])
+    for contribution in getattr(instance, "_set_log_rollups_previous", ()):
+        apply_set_log_contribution(contribution, sign=-1)
+
+
+# -------------------------
+# Change counters / validators (ETags, see pace.api.conditional)
+# -------------------------
+
+def touch_sessions(*user_ids):
+    """Invalidate the ETags of the users' session list and detail responses."""
+    FitnessProfile.objects.filter(user_id__in=set(user_ids)).update(sessions_version=F("sessions_version") + 1)
+
+
+@receiver(post_save, sender=FitnessProfile)
+def bump_profile_version(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    FitnessProfile.objects.filter(pk=instance.pk).update(version=F("version") + 1)
+
+
+@receiver(post_save, sender=WorkoutSession)
+@receiver(post_delete, sender=WorkoutSession)
+def session_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        touch_sessions(instance.user_id)
+
+
+@receiver(post_save, sender=WorkoutPlan)
+@receiver(post_delete, sender=WorkoutPlan)
+def plan_changed(sender, instance, raw=False, **kwargs):
+    """Sessions show their plan (and a deleted plan is SET_NULL without signals)."""
+    if not raw:
+        touch_sessions(instance.user_id)
+
+
+@receiver(post_save, sender=ExerciseSetLog)
+@receiver(post_delete, sender=ExerciseSetLog)
+def set_log_changed(sender, instance, raw=False, origin=None, **kwargs):
+    if raw or deleted_with_session(origin):
+        return  # a deleted session touches its owner's sessions itself
+    previous = getattr(instance, "_rollup_previous", None)
+    touch_sessions(*([previous["user_id"]] if previous else [instance.session.user_id]))
+
+
+def touch_plans(*plan_ids):
+    """
+    Move the plans' ``updated_at`` (their ETag validator) after a change to
+    their exercises. Sessions and set logs embed the exercise names too, so
+    the owners' session ETags move with them.
+    """
+    _touch_plan_rows(WorkoutPlan.objects.filter(pk__in=set(plan_ids)))
+
+
+def _touch_plan_rows(plans):
+    plans.update(updated_at=timezone.now())
+    FitnessProfile.objects.filter(user_id__in=plans.values("user_id")).update(
+        sessions_version=F("sessions_version") + 1)
+
+
+@receiver(post_save, sender=Exercise)
+@receiver(post_delete, sender=Exercise)
+def exercise_changed(sender, instance, raw=False, **kwargs):
+    """A plan's representation includes its exercises, so they move its ``updated_at``."""
+    if not raw and instance.workout_plan_id:
+        touch_plans(instance.workout_plan_id)
+
+
+@receiver(post_save, sender=ExerciseDefinition)
+def definition_changed(sender, instance, created, raw=False, **kwargs):
+    """Renaming a catalog entry renames it in every plan (and session) that uses it."""
+    if not raw and not created:
+        _touch_plan_rows(WorkoutPlan.objects.filter(exercises__definition=instance))
+
+
+# -------------------------
+# Session summaries (snapshot of completed sessions, see SessionSummary)
+# -------------------------
+
+def _average(total, count):
+    return round(total / count, 2) if count else None
+
+
+def summarize_logs(logs):
+    """Per-exercise totals and best set (most volume, then score) for a session's logs."""
+    exercises = {}
+    def plan_order(log):
+        return log.exercise.order is None, log.exercise.order or 0, log.exercise_id, log.set_number
+
+    for log in sorted(logs, key=plan_order):
+        entry = exercises.setdefault(log.exercise_id, {
+            "exercise": log.exercise_id, "definition": log.exercise.definition_id, "name": log.exercise.name,
+            "sets": 0, "reps": 0, "volume": 0.0, "score_sum": 0.0, "score_count": 0, "best_set": None,
+        })
+        volume = (log.reps_completed or 0) * (log.weight_kg or 0)
+        entry["sets"] += 1
+        entry["reps"] += log.reps_completed or 0
+        entry["volume"] += volume
+        if log.score is not None:
+            entry["score_sum"] += log.score
+            entry["score_count"] += 1
+        best = entry["best_set"]
+        if best is None or (volume, log.score or 0) > (best["volume"], best["score"] or 0):
+            entry["best_set"] = {
+                "set_number": log.set_number, "reps_completed": log.reps_completed,
+                "weight_kg": log.weight_kg, "score": log.score, "volume": volume,
+            }
+    for entry in exercises.values():
+        entry["average_score"] = _average(entry.pop("score_sum"), entry.pop("score_count"))
+    return list(exercises.values())
+
+
+def refresh_session_summary(session_id):
+    """
+    (Re)build the summary of a completed session, or drop it if the
+    session is gone or no longer completed. Three queries: the session
+    with its plan, its logs with their exercises, and the upsert.
+    """
+    session = (
+        WorkoutSession.objects.filter(pk=session_id, completed=True)
+        .select_related("plan")
+        .prefetch_related(Prefetch("exercisesetlog_set", queryset=ExerciseSetLog.objects.select_related("exercise__definition")))
+        .first()
+    )
+    if session is None:
+        SessionSummary.objects.filter(session_id=session_id).delete()
+        return None
+
+    logs = list(session.exercisesetlog_set.all())
+    scores = [log.score for log in logs if log.score is not None]
+    summary, _ = SessionSummary.objects.update_or_create(session=session, defaults={
+        "exercises": summarize_logs(logs),
+        "total_sets": len(logs),
+        "total_reps": sum(log.reps_completed or 0 for log in logs),
+        "total_volume": sum((log.reps_completed or 0) * (log.weight_kg or 0) for log in logs),
+        "average_score": _average(sum(scores), len(scores)),
+        "duration": session.duration,
+        "payload": WorkoutSessionSerializer(session).data,
+    })
+    return summary
+
+
+@receiver(post_save, sender=WorkoutSession)
+def update_session_summary(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields and set(update_fields) <= {"logged_exercise_ids"}):
+        return  # coverage bookkeeping is not part of the summary
+    previous = getattr(instance, "_rollup_previous", None)
+    if instance.completed or (previous and previous["sessions_completed"]):
+        refresh_session_summary(instance.pk)
+
+
+@receiver(pre_save, sender=ExerciseSetLog)
+def capture_session_completed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance._session_was_completed = instance.session.completed
+
+
+@receiver(post_save, sender=ExerciseSetLog)
+def update_session_summary_for_log(sender, instance, raw=False, **kwargs):
+    # A log that completes its session is already in the summary the session save built
+    if not raw and instance._session_was_completed:
+        refresh_session_summary(instance.session_id)
+
+
+@receiver(post_delete, sender=ExerciseSetLog)
+def remove_log_from_session_summary(sender, instance, origin=None, **kwargs):
+    if deleted_with_session(origin):
+        return  # the summary goes with the session
+    # Deferred: in other cascades (e.g. a deleted user) the session itself may be about to go
+    session_id = instance.session_id
+    transaction.on_commit(lambda: refresh_session_summary(session_id))
+
+
+def set_logs_bulk_saved(session, logs, previous=(), previous_exercise_ids=()):
+    """
+    Run the post_save side effects for ``logs`` that were written to
+    ``session`` with ``bulk_create`` (which sends no signals), once per
+    batch: rollups get one delta per exercise, then the analytics cache
+    and session completion (and with it the streak) are updated.
+
+    ``previous`` holds the set_log_contribution() of every row an upsert
+    overwrote, so re-sent logs are not counted twice, and
+    ``previous_exercise_ids`` the exercises those rows were logged against.
+    """
+    merged = {}
+    for contribution, sign in [(c, -1) for c in previous] + [
+        (set_log_contribution(
+            session.user_id, session.id, session.date, log.exercise.definition_id,
+            log.score, log.reps_completed, log.weight_kg, log.duration_seconds,
+        ), 1)
+        for log in logs
+    ]:
+        total = merged.setdefault(contribution["definition_id"], {**contribution, **dict.fromkeys(SET_LOG_TOTALS, 0)})
+        for field in SET_LOG_TOTALS:
+            total[field] += sign * contribution[field]
+
+    for contribution in merged.values():
+        apply_set_log_contribution(contribution)
+    invalidate_analytics(session.user_id)
+    touch_sessions(session.user_id)
+    was_completed = session.completed
+    exercise_ids = {log.exercise_id for log in logs}
+    uncover_session_exercises(session, set(previous_exercise_ids) - exercise_ids)
+    cover_session_exercises(session, exercise_ids)
+    if was_completed:
+        refresh_session_summary(session.id)
+
+
+def sessions_bulk_saved(sessions, previous):
+    """
+    Run the post_save side effects for ``sessions`` upserted with
+    ``bulk_create``. ``previous`` maps a session's uuid to the
+    session_contribution() of the row it overwrote (absent for new rows).
+    """
+    for session in sessions:
+        current = session_contribution(session.user_id, session.date, session.completed, session.duration)
+        for contribution, sign in _net_change(previous.get(session.uuid), current, ("user_id", "day")):
+            apply_session_contribution(contribution, sign)
+
+    for session in sessions:
+        stored = previous.get(session.uuid)
+        if session.completed or (stored and stored["sessions_completed"]):
+            refresh_session_summary(session.pk)
+
+    completed = [session for session in sessions if session.completed]
+    if completed:
+        update_daily_streak(sender=WorkoutSession, instance=completed[0], created=False)
+    invalidate_analytics(*(session.user_id for session in sessions))
+    touch_sessions(*(session.user_id for session in sessions))
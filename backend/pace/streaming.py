@@ -0,0 +1,182 @@
+"""
+Live pose-landmark streaming over a WebSocket.
+
+The client sends its MediaPipe pose results as compact binary frames
+instead of JSON: each WebSocket message carries one or more
+``pace.recordings.FRAME_DTYPE`` records (little-endian, 235 bytes per frame
+versus ~3 KB of JSON)::
+
+    uint32  t_ms            milliseconds since the stream started
+    int16   xyz[33][3]      landmark coordinates × QUANT_SCALE
+    uint8   visibility[33]  landmark visibility × 255
+
+Frames are buffered per session in memory and flushed to the session's
+spool file in ``FLUSH_BYTES`` chunks; pace.recordings compacts the spool
+into a ``.pacerec`` recording when the connection closes, provided every
+write succeeded. While a flush is
+running, a connection whose buffer reaches ``MAX_BUFFER_BYTES`` stops
+reading until the flush is done, so a slow disk pushes back on the client
+through TCP flow control rather than growing memory. After every flush
+the server sends ``{"persisted": <frames>}`` so the client knows what is
+safe to drop.
+
+A session takes one stream at a time: its spool is shared, so a second
+connection (e.g. another tab, or a reconnect racing the old socket) is
+closed with ``CLOSE_STREAM_IN_USE`` until the first one has flushed and
+compacted. The claim lives in the cache so it holds across workers, and
+it expires after ``STREAM_CLAIM_SECONDS`` without a message in case a
+worker dies mid-stream.
+
+Mounted next to Django in backend/asgi.py at
+``/ws/pace/sessions/<session_id>/landmarks/?token=<JWT access token>``.
+"""
+import asyncio
+import json
+import re
+import uuid
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+from pace.models import WorkoutSession
+from pace.recordings import FRAME_DTYPE, append_frames, compact
+
+
+FLUSH_BYTES = 1 << 20  # ~4,500 frames, about 2.5 minutes at 30 fps
+MAX_BUFFER_BYTES = 4 * FLUSH_BYTES
+
+STREAM_CLAIM_SECONDS = 5 * 60
+
+PATH_PATTERN = re.compile(r'^/ws/pace/sessions/(?P<session_id>\d+)/landmarks/$')
+
+# WebSocket close codes
+CLOSE_POLICY_VIOLATION = 1008
+CLOSE_INVALID_PAYLOAD = 1007
+CLOSE_STREAM_IN_USE = 4409  # application range: another connection is streaming this session
+
+
+@sync_to_async
+def authorize(token, session_id):
+    """The session's id if ``token`` is a valid access token for its owner, else None."""
+    from accounts.authentication import CachedJWTAuthentication
+    from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+    auth = CachedJWTAuthentication()
+    try:
+        user = auth.get_user(auth.get_validated_token(token))
+    except (AuthenticationFailed, InvalidToken):
+        return None
+    if not WorkoutSession.objects.filter(id=session_id, user=user).exists():
+        return None
+    return session_id
+
+
+class StreamClaim:
+    """Cache-held claim on a session's stream; ``acquire()`` is False while another connection holds it."""
+
+    def __init__(self, session_id):
+        self.key = f"pace:landmark-stream:{session_id}"
+        self.token = uuid.uuid4().hex
+        self._renewed_at = None
+
+    async def acquire(self):
+        if not await cache.aadd(self.key, self.token, STREAM_CLAIM_SECONDS):
+            return False
+        self._renewed_at = asyncio.get_running_loop().time()
+        return True
+
+    async def renew(self):
+        """Push the expiry back, at most once a minute."""
+        now = asyncio.get_running_loop().time()
+        if now - self._renewed_at >= 60:
+            self._renewed_at = now
+            await cache.atouch(self.key, STREAM_CLAIM_SECONDS)
+
+    async def release(self):
+        # Only drop the claim if it is still ours (it may have expired and been taken over)
+        if await cache.aget(self.key) == self.token:
+            await cache.adelete(self.key)
+
+
+class LandmarkBuffer:
+    """
+    In-memory frame buffer for one session, flushed to ``sink`` in the
+    background once it holds ``flush_bytes``.
+    """
+
+    def __init__(self, session_id, sink=append_frames, flush_bytes=FLUSH_BYTES, max_bytes=MAX_BUFFER_BYTES):
+        self.session_id = session_id
+        self.sink = sync_to_async(sink, thread_sensitive=False)
+        self.flush_bytes = flush_bytes
+        self.max_bytes = max_bytes
+        self.buffer = bytearray()
+        self.persisted_frames = 0
+        self._flushing = None
+
+    async def add(self, data):
+        """Buffer ``data``; waits for an in-flight flush when the buffer is full."""
+        self.buffer += data
+        if len(self.buffer) < self.flush_bytes:
+            return
+        if self._flushing:
+            if not self._flushing.done() and len(self.buffer) < self.max_bytes:
+                return  # keep buffering while the previous chunk is written
+            await self._flushing  # backpressure: stop reading until the disk catches up
+        self._flushing = asyncio.ensure_future(self._flush())
+
+    async def close(self):
+        """Flush whatever is left and wait for all writes to finish; raises if any write failed."""
+        if self._flushing:
+            await self._flushing
+        if self.buffer:
+            await self._flush()
+
+    async def _flush(self):
+        chunk, self.buffer = bytes(self.buffer), bytearray()
+        await self.sink(self.session_id, chunk)
+        self.persisted_frames += len(chunk) // FRAME_DTYPE.itemsize
+        return self.persisted_frames
+
+
+async def landmark_stream(scope, receive, send, sink=append_frames):
+    """ASGI WebSocket application receiving a session's landmark frames."""
+    match = PATH_PATTERN.match(scope['path'])
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+
+    token = parse_qs(scope.get('query_string', b'').decode()).get('token', [''])[0]
+    if not match or not token or not await authorize(token, int(match['session_id'])):
+        await send({'type': 'websocket.close', 'code': CLOSE_POLICY_VIOLATION})
+        return
+
+    claim = StreamClaim(int(match['session_id']))
+    if not await claim.acquire():
+        await send({'type': 'websocket.close', 'code': CLOSE_STREAM_IN_USE})
+        return
+
+    await send({'type': 'websocket.accept'})
+    buffer = LandmarkBuffer(int(match['session_id']), sink=sink)
+    acknowledged = 0
+    try:
+        while True:
+            message = await receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+            await claim.renew()
+            data = message.get('bytes')
+            if not data or len(data) % FRAME_DTYPE.itemsize:
+                await send({'type': 'websocket.close', 'code': CLOSE_INVALID_PAYLOAD})
+                break
+            await buffer.add(data)
+            if buffer.persisted_frames != acknowledged:
+                acknowledged = buffer.persisted_frames
+                await send({'type': 'websocket.send', 'text': json.dumps({'persisted': acknowledged})})
+    finally:
+        try:
+            # A failed write leaves a gap in the spool, so it is not compacted into a recording
+            await buffer.close()
+            await sync_to_async(compact, thread_sensitive=False)(buffer.session_id)
+        finally:
+            await claim.release()
@@ -1,22 +1,60 @@
 from django.test import TestCase
+import csv
+import json
+import math
+import os
+import tempfile
+import time
+import uuid
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.utils import timezone
 from datetime import timedelta
 from datetime import date
+from io import BytesIO, StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import IntegrityError, connection
+from django.core.serializers.json import DjangoJSONEncoder
+from asgiref.testing import ApplicationCommunicator
+from rest_framework_simplejwt.tokens import AccessToken
+import numpy as np
+import openpyxl
 
+from pace.models import ranks_between, ExerciseDefinition
 from pace.models import (
     FitnessProfile,
     WorkoutPlan,
-    WorkoutExercise,
     WorkoutSession,
     Exercise,
     ExerciseSetLog,
     DailyStreak,
-    TrainingStyle,
-    MuscleGroup
+    UserDailyStats,
+    UserExerciseStats,
+    SessionTempoStats,
+    RepLog,
+    SessionSummary,
 )
+from pace.recordings import (
+    FRAME_DTYPE, Recording, dequantize, quantize, recording_path, spool_path, write_recording,
+)
+from pace.streaming import LandmarkBuffer, landmark_stream
+from pace import scoring
+from pace.analytics.cohort import score_distribution
+from pace.cache import bump_analytics_generation, get_cached_analytics, set_cached_analytics
+from pace.serializers import (
+    ExerciseSetLogSerializer, WorkoutPlanSerializer, WorkoutSessionSerializer, WorkoutSessionSummarySerializer,
+)
+from pace import fast_serializers
+from pace.api.workout_log import ExerciseSetLogListCreateAPIView, WorkoutSessionListCreateAPIView
+from pace.api.workout_plan import WorkoutPlanListCreateAPIView
+from rest_framework.renderers import JSONRenderer
+from unittest import mock
 
 User = get_user_model()
 
@@ -28,17 +66,10 @@ class BaseTestCase(TestCase):
         self.client.force_authenticate(user=self.user)
 
         # Create related objects
-        self.training_style = TrainingStyle.objects.create(name="Strength")
-        self.muscle_group = MuscleGroup.objects.create(name="Chest")
+        self.plan = WorkoutPlan.objects.create(user=self.user, name="Test Plan")
         self.exercise = Exercise.objects.create(
-            name="Push-up",
-            Training_style=self.training_style,
-        )
-        self.exercise.muscle_group.add(self.muscle_group)
-        self.plan = WorkoutPlan.objects.create(user=self.user, name="Test Plan", training_style=self.training_style)
-        self.workout_exercise = WorkoutExercise.objects.create(
             workout_plan=self.plan,
-            exercise=self.exercise,
+            name="Push-up",
             order=1,
             sets=3,
             reps=10
@@ -50,13 +81,19 @@ class BaseTestCase(TestCase):
 # -------------------------
 class FitnessProfileTests(BaseTestCase):
     def test_create_profile(self):
-        profile = FitnessProfile.objects.create(user=self.user, display_name="Tester", birthday=date(2000, 1, 1))
+        # A profile is created along with every user
+        profile = FitnessProfile.objects.get(user=self.user)
+        profile.pronouns = "they/them"
+        profile.birthday = date(2000, 1, 1)
+        profile.save()
+        profile.refresh_from_db()
         self.assertEqual(profile.user.username, "testuser")
-        self.assertEqual(profile.display_name, "Tester")
+        self.assertEqual(profile.pronouns, "they/them")
 
     def test_age_property_calculation(self):
-        profile = FitnessProfile.objects.create(user=self.user, birthday=date(2000, 1, 1))
-        today = timezone.localdate()
+        profile = FitnessProfile.objects.get(user=self.user)
+        profile.birthday = date(2000, 1, 1)
+        today = date.today()
         expected_age = today.year - 2000
         if today.month < 1 or (today.month == 1 and today.day < 1):
             expected_age -= 1
@@ -79,14 +116,13 @@ class WorkoutSessionTests(BaseTestCase):
 
     def test_create_set_log_invalid_exercise(self):
         session = WorkoutSession.objects.create(user=self.user, plan=self.plan)
-        other_exercise = Exercise.objects.create(name="Squat")
-        from django.core.exceptions import ValidationError
+        other_plan = WorkoutPlan.objects.create(user=self.user, name="Other Plan")
+        other_exercise = Exercise.objects.create(workout_plan=other_plan, name="Squat", order=1)
         log = ExerciseSetLog(session=session, exercise=other_exercise, set_number=1, reps_completed=10)
         with self.assertRaises(ValidationError):
             log.full_clean()  # triggers validation
 
 
-
 # -------------------------
 # WorkoutSession API Tests
 # -------------------------
@@ -122,24 +158,24 @@ class ExerciseSetLogDetailAPITests(BaseTestCase):
 
     def test_patch_set_log(self):
         data = {"reps_completed": 12, "weight_kg": 20}
-        response = self.client.patch(f"/api/pace/logs/{self.log.id}/", data, format="json")
+        response = self.client.patch(f"/api/pace/sessions/{self.session.id}/logs/{self.log.id}/", data, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.log.refresh_from_db()
         self.assertEqual(self.log.reps_completed, 12)
         self.assertEqual(self.log.weight_kg, 20)
 
     def test_delete_set_log(self):
-        response = self.client.delete(f"/api/pace/logs/{self.log.id}/")
+        response = self.client.delete(f"/api/pace/sessions/{self.session.id}/logs/{self.log.id}/")
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         with self.assertRaises(ExerciseSetLog.DoesNotExist):
             ExerciseSetLog.objects.get(id=self.log.id)
 
     def test_patch_invalid_log(self):
-        response = self.client.patch("/api/pace/logs/9999/", {"reps_completed": 5}, format="json")
+        response = self.client.patch(f"/api/pace/sessions/{self.session.id}/logs/9999/", {"reps_completed": 5}, format="json")
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_delete_invalid_log(self):
-        response = self.client.delete("/api/pace/logs/9999/")
+        response = self.client.delete(f"/api/pace/sessions/{self.session.id}/logs/9999/")
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
 
@@ -148,10 +184,9 @@ class ExerciseSetLogDetailAPITests(BaseTestCase):
 # -------------------------
 class UpdateProfileAPITests(BaseTestCase):
     def test_put_update_profile(self):
-        # Create initial profile
-        profile = FitnessProfile.objects.create(user=self.user, display_name="Old Name", fitness_goal="weight_loss")
+        profile = FitnessProfile.objects.get(user=self.user)
         data = {
-            "display_name": "New Name",
+            "pronouns": "they/them",
             "fitness_goal": "muscle_gain",
             "height_cm": 180,
             "weight_kg": 75
@@ -159,18 +194,21 @@ class UpdateProfileAPITests(BaseTestCase):
         response = self.client.put("/api/pace/profile/update/", data, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         profile.refresh_from_db()
-        self.assertEqual(profile.display_name, "New Name")
+        self.assertEqual(profile.pronouns, "they/them")
         self.assertEqual(profile.fitness_goal, "muscle_gain")
         self.assertEqual(profile.height_cm, 180)
         self.assertEqual(profile.weight_kg, 75)
 
     def test_put_partial_update_profile(self):
-        profile = FitnessProfile.objects.create(user=self.user, display_name="Partial Name")
-        data = {"display_name": "Updated Partial"}
+        profile = FitnessProfile.objects.get(user=self.user)
+        profile.fitness_goal = "weight_loss"
+        profile.save()
+        data = {"pronouns": "she/they"}
         response = self.client.put("/api/pace/profile/update/", data, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         profile.refresh_from_db()
-        self.assertEqual(profile.display_name, "Updated Partial")
+        self.assertEqual(profile.pronouns, "she/they")
+        self.assertEqual(profile.fitness_goal, "weight_loss")
 
     # def test_put_invalid_profile(self):
     #     data = {"height_cm": -10}  # Invalid height
@@ -180,18 +218,15 @@ class UpdateProfileAPITests(BaseTestCase):
 
 
 # -------------------------
-# WorkoutSession API Tests
+# WorkoutSession Create API Tests
 # -------------------------
-class WorkoutSessionAPITests(BaseTestCase):
+class WorkoutSessionCreateAPITests(BaseTestCase):
     def setUp(self):
         super().setUp()
         # Ensure the user has a plan
-        self.plan = WorkoutPlan.objects.create(user=self.user, name="Test Plan")
-        self.exercise1 = Exercise.objects.create(name="Push Up")
-        self.exercise2 = Exercise.objects.create(name="Squat")
-        # Add exercises to plan through WorkoutExercise
-        WorkoutExercise.objects.create(workout_plan=self.plan, exercise=self.exercise1, order=1, sets=3, reps=10)
-        WorkoutExercise.objects.create(workout_plan=self.plan, exercise=self.exercise2, order=2, sets=3, reps=15)
+        self.plan = WorkoutPlan.objects.create(user=self.user, name="Two Exercise Plan")
+        self.exercise1 = Exercise.objects.create(workout_plan=self.plan, name="Push Up", order=1, sets=3, reps=10)
+        self.exercise2 = Exercise.objects.create(workout_plan=self.plan, name="Squat", order=2, sets=3, reps=15)
 
     def test_create_workout_session(self):
         data = {"plan_id": self.plan.id, "rest_period_seconds": 60}
@@ -214,11 +249,9 @@ class WorkoutSessionAPITests(BaseTestCase):
 class ExerciseSetLogListCreateAPITests(BaseTestCase):
     def setUp(self):
         super().setUp()
-        self.plan = WorkoutPlan.objects.create(user=self.user, name="Test Plan")
-        self.exercise1 = Exercise.objects.create(name="Push Up")
-        self.exercise2 = Exercise.objects.create(name="Squat")
-        WorkoutExercise.objects.create(workout_plan=self.plan, exercise=self.exercise1, order=1, sets=3, reps=10)
-        WorkoutExercise.objects.create(workout_plan=self.plan, exercise=self.exercise2, order=2, sets=3, reps=15)
+        self.plan = WorkoutPlan.objects.create(user=self.user, name="Two Exercise Plan")
+        self.exercise1 = Exercise.objects.create(workout_plan=self.plan, name="Push Up", order=1, sets=3, reps=10)
+        self.exercise2 = Exercise.objects.create(workout_plan=self.plan, name="Squat", order=2, sets=3, reps=15)
         self.session = WorkoutSession.objects.create(user=self.user, plan=self.plan)
 
     def test_create_multiple_set_logs(self):
@@ -302,20 +335,10 @@ class MarkSessionCompletedSignalTests(TestCase):
         # User
         self.user = User.objects.create_user(username="tester", password="pass123")
 
-        # Basic setup
-        style = TrainingStyle.objects.create(name="Strength")
-        group = MuscleGroup.objects.create(name="Chest")
-
-        # Exercises
-        self.exercise1 = Exercise.objects.create(name="Push Up", Training_style=style)
-        self.exercise1.muscle_group.add(group)
-        self.exercise2 = Exercise.objects.create(name="Bench Press", Training_style=style)
-        self.exercise2.muscle_group.add(group)
-
         # Workout Plan with both exercises
-        self.plan = WorkoutPlan.objects.create(user=self.user, name="Upper Body", training_style=style)
-        WorkoutExercise.objects.create(workout_plan=self.plan, exercise=self.exercise1, order=1)
-        WorkoutExercise.objects.create(workout_plan=self.plan, exercise=self.exercise2, order=2)
+        self.plan = WorkoutPlan.objects.create(user=self.user, name="Upper Body")
+        self.exercise1 = Exercise.objects.create(workout_plan=self.plan, name="Push Up", order=1)
+        self.exercise2 = Exercise.objects.create(workout_plan=self.plan, name="Bench Press", order=2)
 
         # Session linked to the plan
         self.session = WorkoutSession.objects.create(user=self.user, plan=self.plan)
@@ -341,3 +364,1588 @@ class MarkSessionCompletedSignalTests(TestCase):
 
         no_plan_session.refresh_from_db()
         self.assertFalse(no_plan_session.completed, "Session without plan should remain incomplete")
+
+
+# -------------------------
+# Analytics Rollup Tests
+# -------------------------
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AnalyticsRollupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="roller", email="roller@example.com", password="pass123")
+        self.client.force_authenticate(user=self.user)
+        self.plan = WorkoutPlan.objects.create(user=self.user, name="Rollup Plan")
+        self.squat = Exercise.objects.create(workout_plan=self.plan, name="Squat", order=1)
+        self.curl = Exercise.objects.create(workout_plan=self.plan, name="Bicep Curl", order=2)
+        self.session = WorkoutSession.objects.create(user=self.user, plan=self.plan)
+
+    def daily(self):
+        return UserDailyStats.objects.get(user=self.user, date=self.session.date)
+
+    def test_set_logs_update_daily_and_exercise_rollups(self):
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=1,
+                                      reps_completed=10, weight_kg=20, score=80)
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=2,
+                                      reps_completed=8, weight_kg=20, score=90)
+
+        daily = self.daily()
+        self.assertEqual(daily.score_count, 2)
+        self.assertAlmostEqual(daily.score_sum, 170)
+        self.assertAlmostEqual(daily.volume, 360)
+        squat_stats = UserExerciseStats.objects.get(user=self.user, definition=self.squat.definition)
+        self.assertAlmostEqual(squat_stats.average_score, 85)
+
+    def test_editing_and_deleting_logs_adjusts_rollups(self):
+        log = ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=1,
+                                            reps_completed=10, weight_kg=20, score=80)
+        log.score = 60
+        log.weight_kg = 10
+        log.save()
+        daily = self.daily()
+        self.assertAlmostEqual(daily.score_sum, 60)
+        self.assertAlmostEqual(daily.volume, 100)
+
+        log.delete()
+        daily = self.daily()
+        self.assertEqual(daily.score_count, 0)
+        self.assertAlmostEqual(daily.volume, 0)
+
+    def test_completed_sessions_are_counted_once(self):
+        self.session.duration = timedelta(minutes=30)
+        self.session.completed = True
+        self.session.save()
+        self.session.save()
+        daily = self.daily()
+        self.assertEqual(daily.sessions_completed, 1)
+        self.assertEqual(daily.total_duration, timedelta(minutes=30))
+
+        self.session.delete()
+        self.assertEqual(self.daily().sessions_completed, 0)
+
+    def test_analytics_view_reads_rollups(self):
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=1,
+                                      reps_completed=10, score=80)
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.curl, set_number=1,
+                                      reps_completed=12, score=60)
+
+        response = self.client.get("/api/pace/analytics/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_workouts"], 1)
+        self.assertEqual(response.data["average_accuracy"], 70)
+        self.assertEqual(len(response.data["accuracy_over_time"]), 1)
+        self.assertEqual(
+            [row["exercise__name"] for row in response.data["accuracy_per_exercise"]],
+            ["Bicep Curl", "Squat"],
+        )
+
+    def test_rebuild_command_restores_and_verifies_rollups(self):
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=1,
+                                      reps_completed=10, weight_kg=20, score=80)
+        UserDailyStats.objects.filter(user=self.user).update(volume=0)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_analytics_rollups", "--verify", stdout=StringIO())
+        call_command("rebuild_analytics_rollups", stdout=StringIO())
+        call_command("rebuild_analytics_rollups", "--verify", stdout=StringIO())
+        self.assertAlmostEqual(self.daily().volume, 200)
+
+    def test_deleting_a_session_skips_the_per_log_work(self):
+        def delete_session_with(log_count):
+            session = WorkoutSession.objects.create(user=self.user, plan=self.plan, completed=True)
+            for number in range(1, log_count + 1):
+                ExerciseSetLog.objects.create(session=session, exercise=self.squat, set_number=number,
+                                              reps_completed=10, weight_kg=20, score=80, duration_seconds=10)
+            with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+                session.delete()
+            return queries
+
+        few, many = delete_session_with(1), delete_session_with(6)
+        self.assertEqual(len(few), len(many))
+        self.assertFalse([q for q in many if "FOR UPDATE" in q["sql"]])
+        self.assertFalse(SessionTempoStats.objects.filter(session__user=self.user).exists())
+        call_command("rebuild_analytics_rollups", "--verify", stdout=StringIO())
+
+        # Logs deleted on their own still do their bookkeeping
+        log = ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=1,
+                                            reps_completed=10, weight_kg=20, score=80)
+        log.delete()
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.logged_exercise_ids, [])
+        call_command("rebuild_analytics_rollups", "--verify", stdout=StringIO())
+
+    def test_analytics_view_runs_at_most_two_queries(self):
+        for offset, exercise in enumerate([self.squat, self.curl, self.squat]):
+            session = WorkoutSession.objects.create(user=self.user, plan=self.plan, completed=True)
+            ExerciseSetLog.objects.create(session=session, exercise=exercise, set_number=1,
+                                          reps_completed=10, score=70 + offset)
+            WorkoutSession.objects.filter(pk=session.pk).update(date=session.date - timedelta(days=offset))
+        call_command("rebuild_analytics_rollups", stdout=StringIO())
+
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/pace/analytics/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_workouts"], 3)
+        self.assertEqual(response.data["average_accuracy"], 71)
+        self.assertEqual(len(response.data["accuracy_over_time"]), 3)
+        self.assertEqual(len(response.data["accuracy_per_exercise"]), 2)
+
+    def test_repeat_analytics_view_is_served_from_cache(self):
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=1,
+                                      reps_completed=10, score=80)
+        first = self.client.get("/api/pace/analytics/")
+
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/pace/analytics/")
+        self.assertEqual(first.data, second.data)
+
+    def test_set_log_write_invalidates_cached_analytics(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=1,
+                                          reps_completed=10, score=80)
+        self.assertEqual(self.client.get("/api/pace/analytics/").data["average_accuracy"], 80)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ExerciseSetLog.objects.create(session=self.session, exercise=self.curl, set_number=1,
+                                          reps_completed=10, score=60)
+        self.assertEqual(self.client.get("/api/pace/analytics/").data["average_accuracy"], 70)
+
+    def test_rebuild_invalidates_cached_analytics(self):
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=1,
+                                      reps_completed=10, score=80)
+        UserDailyStats.objects.filter(user=self.user).update(score_sum=40)  # drifted rollup
+        self.assertEqual(self.client.get("/api/pace/analytics/").data["average_accuracy"], 40)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("rebuild_analytics_rollups", stdout=StringIO())
+        self.assertEqual(self.client.get("/api/pace/analytics/").data["average_accuracy"], 80)
+
+    def test_response_computed_before_a_bump_is_never_served(self):
+        generation, cached = get_cached_analytics(self.user.id)
+        self.assertIsNone(cached)
+        bump_analytics_generation(self.user.id)  # a write lands mid-computation
+        set_cached_analytics(self.user.id, generation, {"stale": True})
+        self.assertIsNone(get_cached_analytics(self.user.id)[1])
+        self.assertNotIn("stale", self.client.get("/api/pace/analytics/").data)
+
+    def test_evicted_generation_does_not_revive_old_responses(self):
+        generation, _ = get_cached_analytics(self.user.id)
+        set_cached_analytics(self.user.id, generation, {"stale": True})
+        bump_analytics_generation(self.user.id)
+        cache.delete("pace:analytics:generation:%d" % self.user.id)  # evicted
+        self.assertIsNone(get_cached_analytics(self.user.id)[1])
+
+    def test_repeat_view_is_one_cache_round_trip(self):
+        self.client.get("/api/pace/analytics/")
+        with mock.patch("pace.cache.cache.get_many", wraps=cache.get_many) as get_many, \
+                mock.patch("pace.cache.get_analytics_generation") as seed:
+            self.assertEqual(self.client.get("/api/pace/analytics/").status_code, status.HTTP_200_OK)
+        get_many.assert_called_once()
+        seed.assert_not_called()
+
+    def test_accuracy_trend_is_limited_to_requested_days(self):
+        today = timezone.localdate()
+        for offset, score in [(0, 80), (5, 70), (40, 50)]:
+            UserDailyStats.objects.create(user=self.user, date=today - timedelta(days=offset),
+                                          score_sum=score, score_count=1)
+
+        response = self.client.get("/api/pace/analytics/accuracy/?days=30")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["accuracy"] for row in response.data], [70, 80])
+
+        response = self.client.get("/api/pace/analytics/accuracy/?days=0")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_weekly_volume_buckets_sets_by_week_and_exercise(self):
+        last_week = WorkoutSession.objects.create(user=self.user, plan=self.plan)
+        WorkoutSession.objects.filter(pk=last_week.pk).update(date=self.session.date - timedelta(weeks=1))
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=1,
+                                      reps_completed=10, weight_kg=20)
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=2,
+                                      reps_completed=5, weight_kg=20)
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.curl, set_number=1,
+                                      duration_seconds=45)
+        ExerciseSetLog.objects.create(session=last_week, exercise=self.curl, set_number=1,
+                                      reps_completed=10, weight_kg=10)
+
+        response = self.client.get("/api/pace/analytics/weekly-volume/?weeks=1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["exercises"], {"Bicep Curl": 45, "Squat": 300})
+        self.assertEqual(response.data[0]["total"], 345)
+
+        response = self.client.get("/api/pace/analytics/weekly-volume/?weeks=2")
+        self.assertEqual([week["total"] for week in response.data], [100, 345])
+
+    def test_rep_speed_for_session_and_history(self):
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=1,
+                                      reps_completed=10, duration_seconds=8)
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=2,
+                                      reps_completed=10, duration_seconds=12)
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.curl, set_number=1,
+                                      reps_completed=5, duration_seconds=10)
+        tempo = SessionTempoStats.objects.get(session=self.session, definition=self.squat.definition)
+        self.assertEqual((tempo.reps, tempo.too_fast_reps, tempo.good_reps), (20, 10, 10))
+
+        response = self.client.get(f"/api/pace/analytics/rep-speed/?session_id={self.session.id}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["too_fast"], response.data["good"], response.data["too_slow"]), (10, 10, 5))
+        self.assertEqual(response.data["exercises"][1], {"exercise": "Squat", "reps": 20, "seconds_per_rep": 1.0})
+        self.assertEqual([row["seconds_per_rep"] for row in response.data["sets"]], [0.8, 1.2, 2.0])
+
+        history = self.client.get("/api/pace/analytics/rep-speed/")
+        self.assertEqual(history.data["average_seconds_per_rep"], 1.2)
+        self.assertNotIn("sets", history.data)
+
+        call_command("rebuild_analytics_rollups", "--verify", stdout=StringIO())
+
+
+# -------------------------
+# Cohort Analytics Tests
+# -------------------------
+class CohortAnalyticsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.coach = User.objects.create_user(username="coach", email="coach@example.com",
+                                              password="pass123", is_staff=True)
+        self.athletes = []
+        for i, (level, frequency) in enumerate([("beginner", 2), ("beginner", 4), ("advanced", 3)]):
+            athlete = User.objects.create_user(username=f"athlete{i}", email=f"athlete{i}@example.com",
+                                               password="pass123")
+            FitnessProfile.objects.filter(user=athlete).update(
+                fitness_level=level, fitness_goal="endurance", exercise_frequency=frequency)
+            plan = WorkoutPlan.objects.create(user=athlete, name=f"Plan {i}")
+            squat = Exercise.objects.create(workout_plan=plan, name="Squat", order=1)
+            session = WorkoutSession.objects.create(user=athlete, plan=plan)
+            ExerciseSetLog.objects.create(session=session, exercise=squat, set_number=1, score=60 + 10 * i)
+            self.athletes.append(athlete)
+
+    def test_cohort_report_is_staff_only(self):
+        self.client.force_authenticate(user=self.athletes[0])
+        response = self.client.get("/api/pace/analytics/cohort/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_score_distribution_is_accumulated_across_chunks(self):
+        (squat,) = score_distribution(chunk_size=2)
+        self.assertEqual(squat["count"], 3)
+        self.assertEqual(squat["mean"], 70)
+        self.assertEqual([bucket["count"] for bucket in squat["histogram"]][6:9], [1, 1, 1])
+
+    def test_cohort_report(self):
+        self.client.force_authenticate(user=self.coach)
+        response = self.client.get("/api/pace/analytics/cohort/?weeks=2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        by_level = {row["fitness_level"]: row for row in response.data["adherence"]["fitness_level"]}
+        self.assertEqual(by_level["beginner"]["users"], 2)
+        # The set logs completed every session
+        self.assertEqual(by_level["beginner"]["completion_rate"], 1)
+        self.assertAlmostEqual(by_level["advanced"]["target_adherence"], 1 / 6, places=4)
+        self.assertEqual(len(response.data["retention"]), 2)
+
+
+# -------------------------
+# Training History Export Tests
+# -------------------------
+class WorkoutSessionExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="exporter", email="exporter@example.com", password="pass123")
+        self.client.force_authenticate(user=self.user)
+        self.plan = WorkoutPlan.objects.create(user=self.user, name="Export Plan")
+        self.squat = Exercise.objects.create(workout_plan=self.plan, name="Squat", order=1)
+        session = WorkoutSession.objects.create(user=self.user, plan=self.plan, duration=timedelta(minutes=5))
+        ExerciseSetLog.objects.create(session=session, exercise=self.squat, set_number=1, reps_completed=10)
+        ExerciseSetLog.objects.create(session=session, exercise=self.squat, set_number=2, reps_completed=8)
+        WorkoutSession.objects.create(user=self.user, plan=self.plan)
+
+    def test_csv_export_streams_one_row_per_set(self):
+        response = self.client.get("/api/pace/sessions/export/?format=csv")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        rows = list(csv.DictReader(b"".join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual([row["reps_completed"] for row in rows], ["10", "8", ""])
+        self.assertEqual(rows[0]["session_duration_seconds"], "300.0")
+
+    def test_xlsx_export(self):
+        response = self.client.get("/api/pace/sessions/export/?format=xlsx")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sheet = openpyxl.load_workbook(BytesIO(b"".join(response.streaming_content))).active
+        self.assertEqual(sheet.max_row, 4)
+        self.assertEqual(sheet.cell(row=2, column=1).value, WorkoutSession.objects.order_by("id").first().id)
+        date_cell = sheet.cell(row=2, column=2)
+        self.assertEqual(date_cell.value.date(), timezone.localdate())
+        self.assertEqual(date_cell.number_format, "yyyy-mm-dd")
+        self.assertEqual(sheet.cell(row=2, column=7).value, "Squat")
+
+    def test_unknown_export_format(self):
+        response = self.client.get("/api/pace/sessions/export/?format=pdf")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# -------------------------
+# Bulk Set Log Ingestion Tests
+# -------------------------
+@override_settings(CACHES=LOCMEM_CACHES)
+class BulkSetLogIngestionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="bulk", email="bulk@example.com", password="pass123")
+        self.client.force_authenticate(user=self.user)
+        self.plan = WorkoutPlan.objects.create(user=self.user, name="Bulk Plan")
+        self.squat = Exercise.objects.create(workout_plan=self.plan, name="Squat", order=1)
+        self.curl = Exercise.objects.create(workout_plan=self.plan, name="Bicep Curl", order=2)
+
+    def post_sets(self, session, count):
+        sets = [
+            {"exercise_id": exercise.id, "set_number": number, "reps_completed": 10,
+             "weight_kg": 20, "duration_seconds": 12, "score": 80}
+            for exercise in (self.squat, self.curl)
+            for number in range(1, count + 1)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f"/api/pace/sessions/{session.id}/logs/", {"sets": sets}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_batch_size(self):
+        # Warm up: the first batch of the day also creates the streak and rollup rows
+        self.post_sets(WorkoutSession.objects.create(user=self.user, plan=self.plan), 1)
+        small = self.post_sets(WorkoutSession.objects.create(user=self.user, plan=self.plan), 2)
+        large = self.post_sets(WorkoutSession.objects.create(user=self.user, plan=self.plan), 15)
+        self.assertEqual(small, large)
+
+    def test_bulk_ingestion_completes_session_and_updates_rollups(self):
+        session = WorkoutSession.objects.create(user=self.user, plan=self.plan)
+        self.post_sets(session, 3)
+
+        session.refresh_from_db()
+        self.assertTrue(session.completed)
+        self.assertEqual(DailyStreak.objects.get(user=self.user).streak_count, 1)
+        daily = UserDailyStats.objects.get(user=self.user, date=session.date)
+        self.assertEqual((daily.sessions_completed, daily.score_count), (1, 6))
+        self.assertAlmostEqual(daily.volume, 1200)
+        call_command("rebuild_analytics_rollups", "--verify", stdout=StringIO())
+
+    def test_batch_is_rejected_as_a_whole(self):
+        session = WorkoutSession.objects.create(user=self.user, plan=self.plan)
+        self.post_sets(session, 1)
+        response = self.client.post(
+            f"/api/pace/sessions/{session.id}/logs/",
+            {"sets": [{"exercise_id": self.squat.id, "set_number": 2},
+                      {"exercise_id": self.squat.id, "set_number": 1}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["detail"], "One or more of these sets are already logged for this session.")
+        self.assertEqual(ExerciseSetLog.objects.filter(session=session).count(), 2)
+
+    def test_each_set_is_validated(self):
+        session = WorkoutSession.objects.create(user=self.user, plan=self.plan)
+        for bad in ({"set_number": 0}, {"set_number": "one"}, {"reps_completed": -1}, {"reps_completed": "ten"},
+                    {"weight_kg": -5}, {"duration_seconds": 1.5}, {"score": 101}, {"score": "NaN"}):
+            with self.subTest(**bad):
+                item = {"exercise_id": self.squat.id, "set_number": 1, **bad}
+                response = self.client.post(f"/api/pace/sessions/{session.id}/logs/",
+                                            {"sets": [{"exercise_id": self.curl.id, "set_number": 1}, item]},
+                                            format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                # Errors are keyed by the index of each invalid set
+                self.assertEqual(list(response.data["sets"]), [1])
+                self.assertEqual(set(response.data["sets"][1]), set(bad))
+        self.assertFalse(ExerciseSetLog.objects.filter(session=session).exists())
+
+    def test_other_integrity_errors_are_not_reported_as_duplicates(self):
+        session = WorkoutSession.objects.create(user=self.user, plan=self.plan)
+        with mock.patch("pace.api.workout_log.set_logs_bulk_saved", side_effect=IntegrityError("boom")):
+            with self.assertRaises(IntegrityError):
+                self.client.post(f"/api/pace/sessions/{session.id}/logs/",
+                                 {"sets": [{"exercise_id": self.squat.id, "set_number": 1}]}, format="json")
+
+
+# -------------------------
+# Incremental Session Completion Tests
+# -------------------------
+class IncrementalSessionCompletionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tracker", email="tracker@example.com", password="pass123")
+        self.plan = WorkoutPlan.objects.create(user=self.user, name="Tracked Plan")
+        self.squat = Exercise.objects.create(workout_plan=self.plan, name="Squat", order=1)
+        self.curl = Exercise.objects.create(workout_plan=self.plan, name="Bicep Curl", order=2)
+        self.session = WorkoutSession.objects.create(user=self.user, plan=self.plan)
+
+    def test_coverage_is_tracked_per_exercise(self):
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=1)
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=2)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.logged_exercise_ids, [self.squat.id])
+        self.assertFalse(self.session.completed)
+
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.curl, set_number=1)
+        self.session.refresh_from_db()
+        self.assertTrue(self.session.completed)
+
+    def test_set_for_covered_exercise_does_not_touch_session_or_plan(self):
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=1)
+        log = ExerciseSetLog(session=self.session, exercise=self.squat, set_number=2)
+        with CaptureQueriesContext(connection) as queries:
+            log.save()
+        touched = " ".join(query["sql"] for query in queries)
+        self.assertNotIn('"pace_workoutsession"', touched)
+        self.assertNotIn('"pace_exercise"', touched)
+
+    def test_stale_session_instance_does_not_lose_coverage(self):
+        # Two devices holding their own copy of the session
+        first = WorkoutSession.objects.get(pk=self.session.pk)
+        second = WorkoutSession.objects.get(pk=self.session.pk)
+        ExerciseSetLog.objects.create(session=first, exercise=self.squat, set_number=1)
+        ExerciseSetLog.objects.create(session=second, exercise=self.curl, set_number=1)
+
+        self.session.refresh_from_db()
+        self.assertEqual(sorted(self.session.logged_exercise_ids), sorted([self.squat.id, self.curl.id]))
+        self.assertTrue(self.session.completed)
+
+    def test_deleted_log_no_longer_covers_its_exercise(self):
+        log = ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=1)
+        log.delete()
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.curl, set_number=1)
+
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.logged_exercise_ids, [self.curl.id])
+        self.assertFalse(self.session.completed)
+
+    def test_exercise_stays_covered_while_a_set_remains(self):
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=1)
+        ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=2).delete()
+
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.logged_exercise_ids, [self.squat.id])
+
+    def test_moved_log_covers_its_new_exercise_only(self):
+        log = ExerciseSetLog.objects.create(session=self.session, exercise=self.squat, set_number=1)
+        log.exercise = self.curl
+        log.save()
+
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.logged_exercise_ids, [self.curl.id])
+        self.assertFalse(self.session.completed)
+
+
+# -------------------------
+# Offline Sync Tests
+# -------------------------
+class SyncAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="offline", email="offline@example.com", password="pass123")
+        self.client.force_authenticate(user=self.user)
+        self.plan = WorkoutPlan.objects.create(user=self.user, name="Offline Plan")
+        self.squat = Exercise.objects.create(workout_plan=self.plan, name="Squat", order=1)
+        self.curl = Exercise.objects.create(workout_plan=self.plan, name="Bicep Curl", order=2)
+        self.session_uuid = str(uuid.uuid4())
+        self.log_uuids = [str(uuid.uuid4()) for _ in range(2)]
+
+    def workout(self, score=80):
+        return [
+            {"type": "session.create", "uuid": self.session_uuid, "plan": self.plan.id},
+            {"type": "set_log.upsert", "uuid": self.log_uuids[0], "session_uuid": self.session_uuid,
+             "exercise_id": self.squat.id, "set_number": 1, "reps_completed": 10, "weight_kg": 20, "score": score},
+            {"type": "set_log.upsert", "uuid": self.log_uuids[1], "session_uuid": self.session_uuid,
+             "exercise_id": self.curl.id, "set_number": 1, "reps_completed": 8, "weight_kg": 10, "score": score},
+            {"type": "session.update", "uuid": self.session_uuid, "duration": "00:30:00"},
+        ]
+
+    def sync(self, mutations):
+        return self.client.post("/api/pace/sync/", {"mutations": mutations}, format="json")
+
+    def test_offline_workout_uploads_in_one_request(self):
+        response = self.sync(self.workout())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        session = WorkoutSession.objects.get(uuid=self.session_uuid)
+        self.assertEqual(response.data["sessions"], {self.session_uuid: session.id})
+        self.assertEqual(set(response.data["set_logs"]), set(self.log_uuids))
+        self.assertEqual(session.duration, timedelta(minutes=30))
+        self.assertTrue(session.completed)
+        self.assertEqual(DailyStreak.objects.get(user=self.user).streak_count, 1)
+        call_command("rebuild_analytics_rollups", "--verify", stdout=StringIO())
+
+    def test_retried_batch_is_idempotent(self):
+        first = self.sync(self.workout())
+        second = self.sync(self.workout())
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(WorkoutSession.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(ExerciseSetLog.objects.filter(session__user=self.user).count(), 2)
+        daily = UserDailyStats.objects.get(user=self.user)
+        self.assertEqual((daily.sessions_completed, daily.score_count), (1, 2))
+        call_command("rebuild_analytics_rollups", "--verify", stdout=StringIO())
+
+    def test_resent_set_log_updates_in_place(self):
+        self.sync(self.workout())
+        self.sync(self.workout(score=95))
+        self.assertEqual(
+            sorted(ExerciseSetLog.objects.values_list("score", flat=True)), [95, 95],
+        )
+        self.assertEqual(UserDailyStats.objects.get(user=self.user).score_sum, 190)
+        call_command("rebuild_analytics_rollups", "--verify", stdout=StringIO())
+
+    def test_offline_workout_keeps_its_own_date(self):
+        workout_day = date.today() - timedelta(days=3)
+        mutations = self.workout()
+        mutations[0] = {**mutations[0], "date": workout_day.isoformat()}
+        self.assertEqual(self.sync(mutations).status_code, status.HTTP_200_OK)
+        self.assertEqual(WorkoutSession.objects.get(uuid=self.session_uuid).date, workout_day)
+        daily = UserDailyStats.objects.get(user=self.user)
+        self.assertEqual((daily.date, daily.sessions_completed, daily.score_count), (workout_day, 1, 2))
+        call_command("rebuild_analytics_rollups", "--verify", stdout=StringIO())
+
+        # A re-sent create keeps the stored date; an update cannot move it
+        resent = {**mutations[0], "date": date.today().isoformat()}
+        self.assertEqual(self.sync([resent]).status_code, status.HTTP_200_OK)
+        self.assertEqual(WorkoutSession.objects.get(uuid=self.session_uuid).date, workout_day)
+        moved = {"type": "session.update", "uuid": self.session_uuid, "date": date.today().isoformat()}
+        self.assertEqual(self.sync([moved]).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_future_session_date_is_rejected(self):
+        mutations = self.workout()
+        mutations[0] = {**mutations[0], "date": (date.today() + timedelta(days=7)).isoformat()}
+        response = self.sync(mutations)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("date", response.data["errors"])
+        self.assertFalse(WorkoutSession.objects.filter(uuid=self.session_uuid).exists())
+
+    def test_resent_set_log_can_move_to_another_exercise(self):
+        self.sync(self.workout()[:2])
+        moved = {**self.workout()[1], "exercise_id": self.curl.id}
+        self.assertEqual(self.sync([moved]).status_code, status.HTTP_200_OK)
+        session = WorkoutSession.objects.get(uuid=self.session_uuid)
+        self.assertEqual(session.logged_exercise_ids, [self.curl.id])
+        self.assertFalse(session.completed)
+
+    def test_other_users_session_is_rejected(self):
+        other = User.objects.create_user(username="intruder", email="intruder@example.com", password="pass123")
+        foreign = WorkoutSession.objects.create(user=other, plan=self.plan)
+        response = self.sync([
+            {"type": "session.update", "uuid": str(foreign.uuid), "score": 1},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        foreign.refresh_from_db()
+        self.assertIsNone(foreign.score)
+
+    def test_invalid_mutation_rolls_back_batch(self):
+        mutations = self.workout()
+        mutations[2]["exercise_id"] = Exercise.objects.create(name="Loose").id
+        response = self.sync(mutations)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(WorkoutSession.objects.filter(uuid=self.session_uuid).exists())
+
+
+# -------------------------
+# Rep Telemetry Tests
+# -------------------------
+class RepLogIngestionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="reps", email="reps@example.com", password="pass123")
+        self.client.force_authenticate(user=self.user)
+        self.session = WorkoutSession.objects.create(user=self.user)
+        self.url = f"/api/pace/workouts/{self.session.id}/reps/"
+
+    def reps(self, sets, per_set):
+        return [
+            {"set_number": set_number, "rep_number": rep_number, "duration": 1.2,
+             "is_good_form": rep_number % 4 != 0, "start_angle": 170, "max_angle": 40}
+            for set_number in range(1, sets + 1)
+            for rep_number in range(1, per_set + 1)
+        ]
+
+    def test_whole_session_is_one_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {"reps": self.reps(10, 30)}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 300)
+        self.assertEqual(RepLog.objects.filter(session=self.session).count(), 300)
+        # One statement, unless the backend caps parameters per query (SQLite)
+        fields = [field for field in RepLog._meta.concrete_fields if not field.primary_key]
+        batch_size = min(1000, connection.ops.bulk_batch_size(fields, [None] * 300))
+        inserts = [q for q in queries if q["sql"].startswith('INSERT INTO "pace_replog"')]
+        self.assertEqual(len(inserts), -(-300 // batch_size))
+        self.assertLess(len(queries), 10)
+
+    def test_single_rep_and_listing_in_order(self):
+        self.client.post(self.url, self.reps(1, 2)[1], format="json")
+        self.client.post(self.url, self.reps(1, 1), format="json")
+        response = self.client.get(self.url)
+        self.assertEqual([rep["rep_number"] for rep in response.data], [1, 2])
+
+    def test_duplicate_rep_rejects_batch(self):
+        self.client.post(self.url, self.reps(1, 1), format="json")
+        response = self.client.post(self.url, self.reps(1, 3), format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(RepLog.objects.filter(session=self.session).count(), 1)
+
+    def test_other_users_session_is_not_found(self):
+        other = User.objects.create_user(username="stranger", email="stranger@example.com", password="pass123")
+        foreign = WorkoutSession.objects.create(user=other)
+        response = self.client.post(f"/api/pace/workouts/{foreign.id}/reps/", self.reps(1, 1), format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+# -------------------------
+# Live Landmark Streaming Tests
+# -------------------------
+def landmark_frames(count, smooth=False):
+    frames = np.zeros(count, dtype=FRAME_DTYPE)
+    frames['t_ms'] = np.arange(count) * 33
+    if smooth:
+        # Landmarks moving through ~1 rep per 2 seconds with tracking jitter
+        phase = np.linspace(0, count / 60 * np.pi, count)[:, None, None]
+        xyz = 0.5 + 0.2 * np.sin(phase + np.arange(33 * 3).reshape(1, 33, 3))
+        xyz += np.random.normal(0, 0.0005, xyz.shape)
+    else:
+        xyz = np.random.rand(count, 33, 3)
+    frames['xyz'], frames['visibility'] = quantize(xyz, np.random.rand(count, 33))
+    return frames
+
+
+class LandmarkStreamTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="streamer", email="streamer@example.com", password="pass123")
+        self.session = WorkoutSession.objects.create(user=self.user)
+        self.token = str(AccessToken.for_user(self.user))
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+
+    def connect(self, token=None, session_id=None):
+        return ApplicationCommunicator(landmark_stream, {
+            "type": "websocket",
+            "path": f"/ws/pace/sessions/{session_id or self.session.id}/landmarks/",
+            "query_string": f"token={token or self.token}".encode(),
+        })
+
+    async def test_frames_are_recorded(self):
+        frames = landmark_frames(90)
+        with override_settings(MEDIA_ROOT=self.media.name):
+            communicator = self.connect()
+            await communicator.send_input({"type": "websocket.connect"})
+            self.assertEqual((await communicator.receive_output())["type"], "websocket.accept")
+            for second in range(3):
+                await communicator.send_input({"type": "websocket.receive",
+                                               "bytes": frames[second * 30:(second + 1) * 30].tobytes()})
+            await communicator.send_input({"type": "websocket.disconnect", "code": 1000})
+            await communicator.wait()
+
+            with open(spool_path(self.session.id), "rb") as f:
+                stored = np.frombuffer(f.read(), dtype=FRAME_DTYPE)
+            recorded = Recording(recording_path(self.session.id)).frames()
+        np.testing.assert_array_equal(stored, frames)
+        np.testing.assert_array_equal(recorded, frames)
+        xyz, visibility = dequantize(stored)
+        self.assertLess(np.abs(xyz - frames["xyz"] / 10_000).max(), 1e-4)
+
+    async def test_invalid_token_is_rejected(self):
+        communicator = self.connect(token="not-a-token")
+        await communicator.send_input({"type": "websocket.connect"})
+        self.assertEqual(await communicator.receive_output(), {"type": "websocket.close", "code": 1008})
+
+    async def test_partial_frame_closes_connection(self):
+        with override_settings(MEDIA_ROOT=self.media.name):
+            communicator = self.connect()
+            await communicator.send_input({"type": "websocket.connect"})
+            await communicator.receive_output()
+            await communicator.send_input({"type": "websocket.receive", "bytes": b"\x00" * 10})
+            self.assertEqual(await communicator.receive_output(), {"type": "websocket.close", "code": 1007})
+
+    async def test_second_stream_for_a_session_is_rejected(self):
+        with override_settings(MEDIA_ROOT=self.media.name):
+            first = self.connect()
+            await first.send_input({"type": "websocket.connect"})
+            self.assertEqual((await first.receive_output())["type"], "websocket.accept")
+
+            second = self.connect()
+            await second.send_input({"type": "websocket.connect"})
+            self.assertEqual(await second.receive_output(), {"type": "websocket.close", "code": 4409})
+
+            await first.send_input({"type": "websocket.disconnect", "code": 1000})
+            await first.wait()
+            third = self.connect()
+            await third.send_input({"type": "websocket.connect"})
+            self.assertEqual((await third.receive_output())["type"], "websocket.accept")
+            await third.send_input({"type": "websocket.disconnect", "code": 1000})
+            await third.wait()
+
+    async def test_failed_flush_is_not_compacted(self):
+        def failing_sink(session_id, chunk):
+            raise OSError("disk full")
+
+        async def app(scope, receive, send):
+            await landmark_stream(scope, receive, send, sink=failing_sink)
+
+        with override_settings(MEDIA_ROOT=self.media.name):
+            communicator = ApplicationCommunicator(app, {
+                "type": "websocket",
+                "path": f"/ws/pace/sessions/{self.session.id}/landmarks/",
+                "query_string": f"token={self.token}".encode(),
+            })
+            await communicator.send_input({"type": "websocket.connect"})
+            await communicator.receive_output()
+            await communicator.send_input({"type": "websocket.receive", "bytes": landmark_frames(30).tobytes()})
+            await communicator.send_input({"type": "websocket.disconnect", "code": 1000})
+            with self.assertRaises(OSError):
+                await communicator.wait()
+            self.assertFalse(os.path.exists(recording_path(self.session.id)))
+
+    async def test_buffer_flushes_in_chunks_with_backpressure(self):
+        chunks = []
+
+        def slow_sink(session_id, chunk):
+            time.sleep(0.05)
+            chunks.append(len(chunk))
+
+        frame = landmark_frames(1).tobytes()
+        buffer = LandmarkBuffer(self.session.id, sink=slow_sink,
+                                flush_bytes=10 * len(frame), max_bytes=20 * len(frame))
+        for _ in range(100):
+            await buffer.add(frame)
+            # Never more than one flush in flight plus max_bytes buffered
+            self.assertLessEqual(len(buffer.buffer), 20 * len(frame))
+        await buffer.close()
+        self.assertEqual(sum(chunks), 100 * len(frame))
+        self.assertEqual(buffer.persisted_frames, 100)
+        self.assertGreaterEqual(min(chunks[:-1]), 10 * len(frame))
+
+
+# -------------------------
+# Pose Recording Format Tests
+# -------------------------
+class PoseRecordingTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "session.pacerec")
+
+    def test_round_trip_is_lossless(self):
+        for frames in (landmark_frames(1000, smooth=True), landmark_frames(300), landmark_frames(1)):
+            write_recording(self.path, frames)
+            recording = Recording(self.path)
+            self.assertEqual(len(recording), len(frames))
+            np.testing.assert_array_equal(recording.frames(), frames)
+
+    def test_seek_decodes_only_touched_blocks(self):
+        frames = landmark_frames(3000, smooth=True)
+        write_recording(self.path, frames)
+        recording = Recording(self.path)
+
+        # One rep somewhere in the middle, addressed by time
+        rep = recording.between(40_000, 42_000)
+        np.testing.assert_array_equal(rep, frames[(frames["t_ms"] >= 40_000) & (frames["t_ms"] < 42_000)])
+        decoded = []
+        original = recording.block
+        recording.block = lambda i: decoded.append(i) or original(i)
+        recording.frames(1500, 1510)
+        self.assertEqual(decoded, [1500 // recording.block_frames])
+
+    def test_size_against_json_and_raw_frames(self):
+        frames = landmark_frames(1800, smooth=True)  # one minute at 30 fps
+        write_recording(self.path, frames)
+        size = os.path.getsize(self.path)
+
+        xyz, visibility = dequantize(frames[:30])
+        sample = json.dumps([
+            {"t": int(t), "landmarks": [
+                {"x": round(x, 4), "y": round(y, 4), "z": round(z, 4), "visibility": round(v, 3)}
+                for (x, y, z), v in zip(points.tolist(), vis.tolist())
+            ]}
+            for t, points, vis in zip(frames["t_ms"][:30], xyz, visibility)
+        ])
+        json_size = len(sample) * len(frames) / 30
+
+        self.assertLess(size, 0.6 * frames.nbytes)
+        self.assertLess(size, 0.25 * json_size)
+        self.assertLess(size * 60, 20 * 1024 * 1024)  # < 20 MB per hour
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"\x00" * 64)
+        with self.assertRaises(ValueError):
+            Recording(self.path)
+
+
+# -------------------------
+# Form Scoring Engine Tests
+# -------------------------
+def squat_landmarks(reps, fps=30):
+    """
+    Right-side squat landmarks for ``reps`` = [(seconds, depth_angle), ...],
+    with half a second of standing around every rep. Returns (landmarks, t_ms).
+    """
+    angles = [np.full(fps // 2, 170.0)]
+    for seconds, depth in reps:
+        phase = np.linspace(0, 2 * np.pi, int(seconds * fps))
+        angles.append(170 - (170 - depth) * (1 - np.cos(phase)) / 2)
+        angles.append(np.full(fps // 2, 170.0))
+    angles = np.radians(np.concatenate(angles))
+
+    landmarks = np.zeros((len(angles), 33, 4))
+    landmarks[:, :, 3] = 1.0
+    landmarks[:, 28, :2] = (0.5, 0.9)  # ankle
+    landmarks[:, 26, :2] = (0.5, 0.7)  # knee
+    landmarks[:, 24, 0] = 0.5 + 0.2 * np.sin(angles)  # hip, at ``angle`` from the shin
+    landmarks[:, 24, 1] = 0.7 + 0.2 * np.cos(angles)
+    landmarks[:, 12, 0] = landmarks[:, 24, 0]  # shoulder well above the hip (chest up)
+    landmarks[:, 12, 1] = landmarks[:, 24, 1] - 0.3
+    return landmarks, np.arange(len(angles)) * 1000 // fps
+
+
+class FormScoringTests(TestCase):
+    def test_joint_angles_match_calculate_angle(self):
+        def calculate_angle(a, b, c):  # frontend/src/utils/geometry.ts
+            radians = math.atan2(c[1] - b[1], c[0] - b[0]) - math.atan2(a[1] - b[1], a[0] - b[0])
+            angle = abs(radians * 180.0 / math.pi)
+            return 360 - angle if angle > 180.0 else angle
+
+        landmarks = np.random.rand(200, 33, 4)
+        expected = [calculate_angle(frame[12], frame[14], frame[16]) for frame in landmarks]
+        np.testing.assert_allclose(scoring.joint_angles(landmarks, 12, 14, 16), expected)
+
+    def test_segmentation_matches_tracker_state_machine(self):
+        angles = np.clip(np.cumsum(np.random.normal(0, 12, 5000)) % 360 - 90, 0, 180)
+
+        # use-bicep-tracker.tsx, one frame at a time
+        stage, start, expected = None, None, []
+        for i, angle in enumerate(angles):
+            if angle > 165:
+                if stage != "down":
+                    stage, start = "down", i
+            elif angle < 35 and stage == "down":
+                expected.append((start, i))
+                stage = "up"
+
+        starts, ends = scoring.segment_reps(angles, scoring.BICEP_CURL)
+        self.assertEqual(list(zip(starts.tolist(), ends.tolist())), expected)
+
+    def test_squat_reps_are_judged_on_tempo_and_depth(self):
+        landmarks, t_ms = squat_landmarks([(5, 90), (2, 90), (5, 115)])
+        result = scoring.score_landmarks(landmarks, t_ms, "squat")
+        self.assertEqual(result["reps"], 3)
+        self.assertEqual(result["rep_good"].tolist(), [True, False, False])
+        self.assertAlmostEqual(result["accuracy"], 33.33)
+        self.assertLess(result["rep_min_angle"][0], 95)
+
+    def test_hidden_frames_are_skipped(self):
+        landmarks, t_ms = squat_landmarks([(5, 90), (5, 90)])
+        landmarks[:, 26, 3] = np.where(np.arange(len(landmarks)) % 2, 0.1, 1.0)  # knee flickers
+        self.assertEqual(scoring.score_landmarks(landmarks, t_ms, "squat")["good_reps"], 2)
+        landmarks[:, 26, 3] = 0.0
+        self.assertEqual(scoring.score_landmarks(landmarks, t_ms, "squat")["reps"], 0)
+
+    def test_rescore_command_updates_scores(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        user = User.objects.create_user(username="rescored", email="rescored@example.com", password="pass123")
+        plan = WorkoutPlan.objects.create(user=user, name="Leg Day")
+        Exercise.objects.create(workout_plan=plan, name="Bodyweight Squat", order=1)
+        good = WorkoutSession.objects.create(user=user, plan=plan, score=50, completed=True)
+        mixed = WorkoutSession.objects.create(user=user, plan=plan, score=50)
+        unrecorded = WorkoutSession.objects.create(user=user, plan=plan, score=50)
+
+        with override_settings(MEDIA_ROOT=media.name):
+            os.makedirs(os.path.join(media.name, "recordings"))
+            for session, reps in ((good, [(5, 90)] * 2), (mixed, [(5, 90), (2, 90)])):
+                landmarks, t_ms = squat_landmarks(reps)
+                frames = np.zeros(len(t_ms), dtype=FRAME_DTYPE)
+                frames["t_ms"] = t_ms
+                frames["xyz"], frames["visibility"] = quantize(landmarks[..., :3], landmarks[..., 3])
+                write_recording(recording_path(session.id), frames)
+
+            out = StringIO()
+            version = FitnessProfile.objects.get(user=user).sessions_version
+            with mock.patch("pace.signals.bump_analytics_generation") as bump:
+                with self.captureOnCommitCallbacks(execute=True):
+                    call_command("rescore_sessions", "--workers", "2", "--write", stdout=out)
+
+        self.assertIn("Rescored 2 sessions", out.getvalue())
+        scores = dict(WorkoutSession.objects.values_list("id", "score"))
+        self.assertEqual((scores[good.id], scores[mixed.id], scores[unrecorded.id]), (100, 50, 50))
+        # The side effects bulk_update() skips
+        self.assertEqual(SessionSummary.objects.get(session=good).payload["score"], 100)
+        self.assertGreater(FitnessProfile.objects.get(user=user).sessions_version, version)
+        bump.assert_called_once_with(user.id)
+
+    def test_rescore_scores_each_recorded_set_with_its_exercise(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        user = User.objects.create_user(username="setwise", email="setwise@example.com", password="pass123")
+        plan = WorkoutPlan.objects.create(user=user, name="Legs and Arms")
+        squat = Exercise.objects.create(workout_plan=plan, name="Squat", order=1)
+        curl = Exercise.objects.create(workout_plan=plan, name="Bicep Curl", order=2)
+        session = WorkoutSession.objects.create(user=user, plan=plan)
+        misaligned = WorkoutSession.objects.create(user=user, plan=plan, score=50)
+        slow = ExerciseSetLog.objects.create(session=session, exercise=squat, set_number=1, reps_completed=2, score=10)
+        fast = ExerciseSetLog.objects.create(session=session, exercise=squat, set_number=2, reps_completed=2, score=10)
+        ExerciseSetLog.objects.create(session=misaligned, exercise=squat, set_number=1, score=10)
+        ExerciseSetLog.objects.create(session=misaligned, exercise=curl, set_number=1, score=10)
+
+        def write(session, sets):
+            recorded, offset = [], 0
+            for reps in sets:  # one run of frames per set, a minute of rest in between
+                landmarks, t_ms = squat_landmarks(reps)
+                frames = np.zeros(len(t_ms), dtype=FRAME_DTYPE)
+                frames["t_ms"] = t_ms + offset
+                frames["xyz"], frames["visibility"] = quantize(landmarks[..., :3], landmarks[..., 3])
+                recorded.append(frames)
+                offset = int(frames["t_ms"][-1]) + 60_000
+            write_recording(recording_path(session.id), np.concatenate(recorded))
+
+        with override_settings(MEDIA_ROOT=media.name):
+            os.makedirs(os.path.join(media.name, "recordings"))
+            write(session, [[(5, 90)] * 2, [(2, 90)] * 2])
+            write(misaligned, [[(5, 90)] * 2])
+            out = StringIO()
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command("rescore_sessions", "--workers", "1", "--write", stdout=out)
+
+        self.assertIn("1 recorded sets for 2 logged sets, skipped", out.getvalue())
+        scores = dict(ExerciseSetLog.objects.values_list("id", "score"))
+        self.assertEqual((scores[slow.id], scores[fast.id]), (100, 0))
+        self.assertEqual(WorkoutSession.objects.get(pk=session.pk).score, 50)
+        self.assertEqual(WorkoutSession.objects.get(pk=misaligned.pk).score, 50)
+        self.assertEqual(sorted(v for k, v in scores.items() if k not in (slow.id, fast.id)), [10, 10])
+        # bulk_update() skips the rollup receivers; the command applies the deltas itself
+        call_command("rebuild_analytics_rollups", "--verify", stdout=StringIO())
+
+    def test_split_sets_cuts_at_rest_pauses(self):
+        t_ms = np.array([0, 33, 66, 20_000, 20_033, 45_000])
+        self.assertEqual(scoring.split_sets(t_ms), [(0, 3), (3, 5), (5, 6)])
+        self.assertEqual(scoring.split_sets(np.array([], dtype=np.uint32)), [])
+
+
+# -------------------------
+# Session History Pagination Tests
+# -------------------------
+class SessionHistoryPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="historian", email="historian@example.com", password="pass123")
+        self.client.force_authenticate(user=self.user)
+        self.plan = WorkoutPlan.objects.create(user=self.user, name="History Plan")
+        self.exercise = Exercise.objects.create(workout_plan=self.plan, name="Squat", order=1)
+
+    def create_sessions(self, count, logs_per_session=0):
+        for i in range(count):
+            session = WorkoutSession.objects.create(user=self.user, plan=self.plan)
+            # Spread over a few days, several sessions per day, to exercise the (date, id) tie-break
+            WorkoutSession.objects.filter(pk=session.pk).update(date=date(2026, 1, 1) + timedelta(days=i // 3))
+            for number in range(1, logs_per_session + 1):
+                ExerciseSetLog.objects.create(session=session, exercise=self.exercise, set_number=number)
+
+    def test_pages_walk_the_whole_history_once(self):
+        self.create_sessions(25)
+        seen, url = [], "/api/pace/sessions/?page_size=7"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["results"]), 7)
+            seen += [(row["date"], row["id"]) for row in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+        self.assertNotIn("logs", response.data["results"][0])
+
+    def test_query_count_is_fixed_per_page(self):
+        self.create_sessions(3, logs_per_session=2)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get("/api/pace/sessions/?include=logs")
+        self.create_sessions(15, logs_per_session=4)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get("/api/pace/sessions/?include=logs")
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(len(response.data["results"]), 18)
+        self.assertEqual(response.data["results"][0]["logs"][0]["exercise_name"], "Squat")
+
+    def test_invalid_cursor_and_page_size(self):
+        self.assertEqual(self.client.get("/api/pace/sessions/?cursor=nope").status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get("/api/pace/sessions/?page_size=1000").status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="etag", email="etag@example.com", password="pass123")
+        self.client.force_authenticate(user=self.user)
+        self.plan = WorkoutPlan.objects.create(user=self.user, name="ETag Plan")
+        self.exercise = Exercise.objects.create(workout_plan=self.plan, name="Squat", order=1)
+        self.session = WorkoutSession.objects.create(user=self.user, plan=self.plan)
+
+    def urls(self):
+        return [
+            "/api/pace/plans/",
+            f"/api/pace/plans/{self.plan.id}/",
+            "/api/pace/sessions/",
+            f"/api/pace/sessions/{self.session.id}/",
+            "/api/pace/profile/",
+        ]
+
+    def etags(self):
+        return {url: self.client.get(url)["ETag"] for url in self.urls()}
+
+    def test_matching_etag_gets_304_from_one_query(self):
+        for url in self.urls():
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response["Cache-Control"], "private, no-cache")
+            with CaptureQueriesContext(connection) as queries:
+                cached = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+            self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED, url)
+            self.assertEqual(cached["ETag"], response["ETag"])
+            self.assertFalse(cached.content)
+            self.assertEqual(len(queries), 1, url)
+
+    def rename_exercise_definition(self):
+        definition = ExerciseDefinition.objects.get(pk=self.exercise.definition_id)
+        definition.name = "Back Squat"
+        definition.save()
+
+    def test_writes_change_the_etag(self):
+        writes = {
+            "plan": lambda: WorkoutPlan.objects.get(pk=self.plan.pk).save(),
+            "exercise": lambda: Exercise.objects.filter(pk=self.exercise.pk).first().save(),
+            "catalog rename": self.rename_exercise_definition,
+            "session": lambda: WorkoutSession.objects.get(pk=self.session.pk).save(),
+            "set log": lambda: ExerciseSetLog.objects.create(session=self.session, exercise=self.exercise, set_number=1),
+            "profile": lambda: self.client.put("/api/pace/profile/update/", {"weight_kg": 70}, format="json"),
+        }
+        affected = {
+            "plan": self.urls()[:4],
+            "exercise": self.urls()[:4],
+            "catalog rename": self.urls()[:4],
+            "session": self.urls()[2:4],
+            "set log": self.urls()[2:4],
+            "profile": self.urls()[4:],
+        }
+        for name, write in writes.items():
+            before = self.etags()
+            write()
+            after = self.etags()
+            for url in self.urls():
+                if url in affected[name]:
+                    self.assertNotEqual(before[url], after[url], f"{name} -> {url}")
+                else:
+                    self.assertEqual(before[url], after[url], f"{name} -> {url}")
+
+    def test_deleting_a_plan_changes_the_session_etags(self):
+        before = self.etags()
+        self.client.delete(f"/api/pace/plans/{self.plan.id}/")
+        for url in self.urls()[2:4]:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=before[url])
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+        self.assertIsNone(self.client.get(f"/api/pace/sessions/{self.session.id}/").data["plan"])
+
+    def test_stale_or_foreign_etag_gets_full_response(self):
+        etag = self.client.get("/api/pace/sessions/")["ETag"]
+        other = User.objects.create_user(username="other", email="other@example.com", password="pass123")
+        other_client = APIClient()
+        other_client.force_authenticate(user=other)
+        response = other_client.get("/api/pace/sessions/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        WorkoutSession.objects.create(user=self.user, plan=self.plan)
+        response = self.client.get("/api/pace/sessions/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_profile_save_keeps_change_counters(self):
+        profile = FitnessProfile.objects.get(user=self.user)
+        WorkoutSession.objects.create(user=self.user, plan=self.plan)
+        profile.save()
+        profile.refresh_from_db()
+        # setUp's plan, exercise and session, then this session
+        self.assertEqual(profile.sessions_version, 4)
+        self.assertEqual(profile.version, 1)
+
+
+class SessionSummaryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="summary", email="summary@example.com", password="pass123")
+        self.client.force_authenticate(user=self.user)
+        self.plan = WorkoutPlan.objects.create(user=self.user, name="Summary Plan")
+        self.squat = Exercise.objects.create(workout_plan=self.plan, name="Squat", order=1)
+        self.curl = Exercise.objects.create(workout_plan=self.plan, name="Curl", order=2)
+        self.session = WorkoutSession.objects.create(user=self.user, plan=self.plan, duration=timedelta(minutes=30))
+
+    def log(self, exercise, set_number, reps, weight, score):
+        return ExerciseSetLog.objects.create(session=self.session, exercise=exercise, set_number=set_number,
+                                             reps_completed=reps, weight_kg=weight, score=score)
+
+    def complete(self):
+        self.log(self.squat, 1, 10, 60, 80)
+        self.log(self.squat, 2, 8, 70, 90)
+        return self.log(self.curl, 1, 12, 10, None)
+
+    def test_built_when_session_completes(self):
+        self.log(self.squat, 1, 10, 60, 80)
+        self.assertFalse(SessionSummary.objects.exists())
+
+        self.log(self.squat, 2, 8, 70, 90)
+        self.log(self.curl, 1, 12, 10, None)
+        summary = SessionSummary.objects.get(session=self.session)
+        self.assertEqual((summary.total_sets, summary.total_reps, summary.total_volume), (3, 30, 1280))
+        self.assertEqual(summary.average_score, 85)
+        self.assertEqual(summary.duration, timedelta(minutes=30))
+        squat, curl = summary.exercises
+        self.assertEqual((squat["name"], squat["sets"], squat["volume"], squat["average_score"]), ("Squat", 2, 1160, 85))
+        self.assertEqual(squat["best_set"]["set_number"], 1)  # 600 kg beats 560 kg
+        self.assertEqual((curl["name"], curl["average_score"]), ("Curl", None))
+        self.assertEqual(summary.payload["id"], self.session.id)
+        self.assertEqual(len(summary.payload["logs"]), 3)
+
+    def test_detail_is_served_from_the_snapshot(self):
+        self.complete()
+        self.session.refresh_from_db()
+        live = WorkoutSessionSerializer(self.session).data
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"/api/pace/sessions/{self.session.id}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content), json.loads(json.dumps(live, cls=DjangoJSONEncoder)))
+        self.assertEqual(len(queries), 2)  # ETag validator + session with its summary
+
+    def test_edited_and_deleted_logs_rebuild_the_snapshot(self):
+        curl_log = self.complete()
+        squat_log = ExerciseSetLog.objects.get(session=self.session, exercise=self.squat, set_number=1)
+        squat_log.weight_kg = 100
+        squat_log.save()
+        self.assertEqual(SessionSummary.objects.get(session=self.session).total_volume, 1680)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            curl_log.delete()
+        summary = SessionSummary.objects.get(session=self.session)
+        self.assertEqual((summary.total_sets, summary.total_volume), (2, 1560))
+        self.assertEqual(len(summary.payload["logs"]), 2)
+
+    def test_history_cards_and_uncompleting(self):
+        self.complete()
+        WorkoutSession.objects.create(user=self.user, plan=self.plan)
+        response = self.client.get("/api/pace/sessions/")
+        open_session, completed = response.data["results"]
+        self.assertIsNone(open_session["summary"])
+        self.assertEqual(completed["summary"]["total_volume"], 1280)
+
+        response = self.client.get("/api/pace/sessions/?include=logs")
+        self.assertEqual([len(row["logs"]) for row in response.data["results"]], [0, 3])
+
+        response = self.client.patch(f"/api/pace/sessions/{self.session.id}/", {"completed": False}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(SessionSummary.objects.exists())
+
+    def test_deleting_the_user_removes_the_snapshot(self):
+        self.complete()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertFalse(SessionSummary.objects.exists())
+
+
+class PlanExerciseBatchInsertTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="planner", email="planner@example.com", password="pass123")
+        self.client.force_authenticate(user=self.user)
+        self.plan = WorkoutPlan.objects.create(user=self.user, name="Batch Plan")
+        self.url = f"/api/pace/plans/{self.plan.id}/exercises/"
+
+    def names_in_order(self):
+        response = self.client.get(f"/api/pace/plans/{self.plan.id}/")
+        return [(row["name"], row["order"]) for row in response.data["exercises"]]
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.post(self.url, {"exercises": [{"name": "A"}, {"name": "B"}]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post(
+                self.url, {"exercises": [{"name": f"E{i}", "sets": 3, "reps": 10} for i in range(20)]}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(small), len(large))
+        self.assertEqual([row["order"] for row in response.data], list(range(3, 23)))
+        self.assertTrue(all(row["id"] for row in response.data))
+
+    def test_explicit_orders_shift_like_one_by_one_inserts(self):
+        for order, name in enumerate("ABC", start=1):
+            Exercise.objects.create(workout_plan=self.plan, name=name, order=order * Exercise.RANK_GAP)
+        response = self.client.post(self.url, {"exercises": [
+            {"name": "X", "order": 2}, {"name": "Y"}, {"name": "Z", "order": 1},
+        ]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([(row["name"], row["order"]) for row in response.data], [("X", 3), ("Y", 6), ("Z", 1)])
+        self.assertEqual(self.names_in_order(), [("Z", 1), ("A", 2), ("X", 3), ("B", 4), ("C", 5), ("Y", 6)])
+
+    def test_invalid_item_saves_nothing(self):
+        for exercises in ([{"name": "A"}, {"sets": 3}], [{"name": "A"}, {"name": "B", "order": 0}]):
+            response = self.client.post(self.url, {"exercises": exercises}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.names_in_order(), [])
+
+
+class SparseExerciseRankTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="ranker", email="ranker@example.com", password="pass123")
+        self.client.force_authenticate(user=self.user)
+        self.plan = WorkoutPlan.objects.create(user=self.user, name="Rank Plan")
+        self.exercises = [
+            Exercise.objects.create(workout_plan=self.plan, name=name, order=(i + 1) * Exercise.RANK_GAP)
+            for i, name in enumerate("ABCDE")
+        ]
+
+    def url(self, exercise):
+        return f"/api/pace/plans/{self.plan.id}/exercises/{exercise.id}/"
+
+    def plan_exercises(self):
+        return [(row["name"], row["order"]) for row in self.client.get(f"/api/pace/plans/{self.plan.id}/").data["exercises"]]
+
+    def exercise_writes(self, queries):
+        return [q["sql"] for q in queries if q["sql"].startswith(("UPDATE", "INSERT", "DELETE")) and "pace_exercise" in q["sql"]]
+
+    def test_move_writes_only_the_moved_row(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(self.url(self.exercises[4]), {"order": 2, "sets": 4}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["order"], response.data["sets"]), (2, 4))
+        self.assertEqual(len(self.exercise_writes(queries)), 1)
+        self.assertEqual(self.plan_exercises(), [("A", 1), ("E", 2), ("B", 3), ("C", 4), ("D", 5)])
+
+        response = self.client.put(self.url(self.exercises[0]), {"order": 99}, format="json")
+        self.assertEqual(response.data["order"], 5)
+        self.assertEqual([name for name, _ in self.plan_exercises()], list("EBCDA"))
+
+    def test_positions_cost_no_query_per_exercise(self):
+        response = self.client.post(f"/api/pace/plans/{self.plan.id}/exercises/",
+                                    {"exercises": [{"name": "F", "order": 2}, {"name": "G"}]}, format="json")
+        self.assertEqual([row["order"] for row in response.data], [2, 7])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f"/api/pace/plans/{self.plan.id}/")
+        self.assertFalse([q for q in queries if "COUNT(" in q["sql"]])
+
+    def test_delete_leaves_a_gap_and_positions_stay_dense(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(self.url(self.exercises[1]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(len(self.exercise_writes(queries)), 1)
+        self.assertEqual(self.plan_exercises(), [("A", 1), ("C", 2), ("D", 3), ("E", 4)])
+
+    def test_full_gap_rebalances_the_plan(self):
+        # Keep moving the last exercise to second place until A and the one after it are adjacent ranks
+        for _ in range(20):
+            last = self.client.get(f"/api/pace/plans/{self.plan.id}/").data["exercises"][-1]
+            response = self.client.put(f"/api/pace/plans/{self.plan.id}/exercises/{last['id']}/", {"order": 2}, format="json")
+            self.assertEqual(response.data["order"], 2)
+        ranks = list(Exercise.objects.filter(workout_plan=self.plan).values_list("order", flat=True))
+        self.assertEqual(len(set(ranks)), 5)
+        self.assertEqual([name for name, _ in self.plan_exercises()], list("ABCDE"))
+
+    def test_ranks_between(self):
+        self.assertEqual(ranks_between(None, None, 2), [Exercise.RANK_GAP, 2 * Exercise.RANK_GAP])
+        self.assertEqual(ranks_between(10, 20, 1), [15])
+        self.assertEqual(ranks_between(10, 11, 1), None)
+
+    def test_rebalance_makes_room_for_placeholders(self):
+        current = {exercise.id: exercise.order for exercise in self.exercises}
+        sequence = [self.exercises[0].id, "new", *current.keys() - {self.exercises[0].id}]
+        sequence[2:] = sorted(sequence[2:], key=current.get)
+        ranks = Exercise.rebalance(sequence, current)
+        self.assertEqual(ranks["new"], 2 * Exercise.RANK_GAP)
+        self.assertEqual(
+            list(Exercise.objects.filter(workout_plan=self.plan).values_list("definition__name", "order")),
+            [(name, step * Exercise.RANK_GAP) for name, step in zip("ABCDE", [1, 3, 4, 5, 6])],
+        )
+
+
+class PlanExerciseReorderTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="reorder", email="reorder@example.com", password="pass123")
+        self.client.force_authenticate(user=self.user)
+        self.plan = WorkoutPlan.objects.create(user=self.user, name="Reorder Plan")
+        self.url = f"/api/pace/plans/{self.plan.id}/exercises/reorder/"
+
+    def create_exercises(self, count, start=0):
+        return [
+            Exercise.objects.create(workout_plan=self.plan, name=f"E{i}", order=(i + 1) * Exercise.RANK_GAP).id
+            for i in range(start, start + count)
+        ]
+
+    def test_reorder_is_a_fixed_number_of_queries(self):
+        ids = self.create_exercises(3)
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.put(self.url, {"exercise_ids": ids[::-1]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        ids = ids[::-1] + self.create_exercises(12, start=3)
+        ids = ids[::2] + ids[1::2]
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.put(self.url, {"exercise_ids": ids}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(small), len(large))
+        self.assertEqual([row["id"] for row in response.data], ids)
+        self.assertEqual([row["order"] for row in response.data], list(range(1, 16)))
+        plan = self.client.get(f"/api/pace/plans/{self.plan.id}/").data
+        self.assertEqual([row["id"] for row in plan["exercises"]], ids)
+
+    def test_unchanged_order_writes_nothing(self):
+        ids = self.create_exercises(4)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.put(self.url, {"exercise_ids": ids}, format="json")
+        self.assertFalse([q for q in queries if q["sql"].startswith("UPDATE")])
+
+    def test_rejects_partial_or_foreign_orders(self):
+        ids = self.create_exercises(3)
+        other = WorkoutPlan.objects.create(user=self.user, name="Other Plan")
+        foreign = Exercise.objects.create(workout_plan=other, name="X", order=Exercise.RANK_GAP).id
+        for exercise_ids in (ids[:2], ids + [ids[0]], ids[:2] + [foreign], "1,2,3", None):
+            response = self.client.put(self.url, {"exercise_ids": exercise_ids}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, exercise_ids)
+
+        stranger = User.objects.create_user(username="stranger", email="stranger@example.com", password="pass123")
+        self.client.force_authenticate(user=stranger)
+        response = self.client.put(self.url, {"exercise_ids": ids}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ExerciseCatalogTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="catalog", email="catalog@example.com", password="pass123")
+        self.client.force_authenticate(user=self.user)
+        self.plan = WorkoutPlan.objects.create(user=self.user, name="Catalog Plan")
+        self.other_plan = WorkoutPlan.objects.create(user=self.user, name="Other Catalog Plan")
+
+    def test_plans_share_one_definition_per_name(self):
+        first = Exercise.objects.create(workout_plan=self.plan, name="Squat", order=1)
+        second = Exercise.objects.create(workout_plan=self.other_plan, name="  squat ", order=1)
+        self.assertEqual(first.definition_id, second.definition_id)
+        self.assertEqual(second.name, "Squat")
+        self.assertEqual(ExerciseDefinition.objects.count(), 1)
+
+    def test_api_resolves_names_in_bulk(self):
+        ExerciseDefinition.for_names(["Bicep Curl"])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f"/api/pace/plans/{self.plan.id}/exercises/", {"exercises": [
+                {"name": "Squat"}, {"name": "bicep curl"}, {"name": "Lunge"}, {"name": "SQUAT"},
+            ]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([row["name"] for row in response.data], ["Squat", "Bicep Curl", "Lunge", "Squat"])
+        self.assertEqual(ExerciseDefinition.objects.count(), 3)
+        self.assertEqual(len([q for q in queries if "pace_exercisedefinition" in q["sql"]]), 2)
+
+        plan = self.client.get(f"/api/pace/plans/{self.plan.id}/").data
+        self.assertEqual([row["name"] for row in plan["exercises"]], ["Squat", "Bicep Curl", "Lunge", "Squat"])
+
+    def test_volume_groups_on_the_definition(self):
+        for plan, name in ((self.plan, "Squat"), (self.other_plan, "squat")):
+            exercise = Exercise.objects.create(workout_plan=plan, name=name, order=1)
+            session = WorkoutSession.objects.create(user=self.user, plan=plan)
+            ExerciseSetLog.objects.create(session=session, exercise=exercise, set_number=1,
+                                          reps_completed=10, weight_kg=50)
+        response = self.client.get("/api/pace/analytics/weekly-volume/")
+        self.assertEqual(response.data[-1]["exercises"], {"Squat": 1000})
+
+    def test_renaming_a_plan_exercise_moves_its_rollups(self):
+        squat = Exercise.objects.create(workout_plan=self.plan, name="Squat", order=1)
+        session = WorkoutSession.objects.create(user=self.user, plan=self.plan)
+        ExerciseSetLog.objects.create(session=session, exercise=squat, set_number=1,
+                                      reps_completed=10, duration_seconds=12, score=80)
+
+        squat.name = "Front Squat"
+        squat.save()
+        call_command("rebuild_analytics_rollups", "--verify", stdout=StringIO())
+        stats = UserExerciseStats.objects.get(user=self.user, definition=squat.definition)
+        self.assertEqual((stats.score_count, stats.score_sum), (1, 80))
+        self.assertEqual(SessionTempoStats.objects.get(session=session, reps__gt=0).definition, squat.definition)
+        self.assertFalse(UserExerciseStats.objects.filter(definition__name="Squat", score_count__gt=0).exists())
+
+        response = self.client.get("/api/pace/analytics/")
+        self.assertEqual([row["exercise__name"] for row in response.data["accuracy_per_exercise"]], ["Front Squat"])
+
+    def test_admin_keeps_the_catalog_key_in_step(self):
+        admin_user = User.objects.create_superuser(username="curator", email="curator@example.com", password="pass123")
+        self.client.force_login(admin_user)
+        add_url = "/admin/pace/exercisedefinition/add/"
+        for name in ("Deadlift", "Plank"):
+            response = self.client.post(add_url, {"name": name})
+            self.assertEqual(response.status_code, 302, name)
+        self.assertEqual(dict(ExerciseDefinition.objects.values_list("name", "key")),
+                         {"Deadlift": "deadlift", "Plank": "plank"})
+
+        response = self.client.post(add_url, {"name": "  PLANK"})
+        self.assertEqual(response.status_code, 200)  # the form is shown again with the error
+        self.assertEqual(ExerciseDefinition.objects.count(), 2)
+
+        plank = ExerciseDefinition.objects.get(key="plank")
+        response = self.client.post(f"/admin/pace/exercisedefinition/{plank.pk}/change/", {"name": "Side Plank"})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(ExerciseDefinition.for_names(["side plank"])["side plank"], plank)
+
+
+class PlanCloneTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.coach = User.objects.create_user(username="clonecoach", email="clonecoach@example.com",
+                                              password="pass123", is_staff=True)
+        self.athlete = User.objects.create_user(username="athlete", email="athlete@example.com", password="pass123")
+        self.template = WorkoutPlan.objects.create(user=self.coach, name="Starter", is_template=True,
+                                                   difficulty_level="easy", duration_minutes=30)
+        for i, name in enumerate(["Squat", "Push Up", "Plank"], start=1):
+            Exercise.objects.create(workout_plan=self.template, name=name, order=i * Exercise.RANK_GAP,
+                                    sets=3, reps=10)
+
+    def exercises_of(self, plan_id):
+        return list(Exercise.objects.filter(workout_plan_id=plan_id)
+                    .values_list("definition_id", "order", "sets", "reps"))
+
+    def test_plan_names_are_unique_per_user(self):
+        WorkoutPlan.objects.create(user=self.athlete, name="Starter")
+        self.client.force_authenticate(user=self.athlete)
+        response = self.client.post("/api/pace/plans/", {"name": "Starter"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("name", response.data)
+
+    def test_clone_template(self):
+        self.client.force_authenticate(user=self.athlete)
+        response = self.client.post(f"/api/pace/plans/{self.template.id}/clone/", {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        copy = WorkoutPlan.objects.get(pk=response.data["id"])
+        self.assertEqual((copy.user, copy.name, copy.source, copy.is_template), (self.athlete, "Starter", self.template, False))
+        self.assertEqual(self.exercises_of(copy.id), self.exercises_of(self.template.id))
+        self.assertEqual([(row["name"], row["order"]) for row in response.data["exercises"]],
+                         [("Squat", 1), ("Push Up", 2), ("Plank", 3)])
+
+        again = self.client.post(f"/api/pace/plans/{self.template.id}/clone/", {}, format="json")
+        self.assertEqual(again.data["name"], "Starter (2)")
+
+    def test_cannot_clone_someone_elses_private_plan(self):
+        private = WorkoutPlan.objects.create(user=self.coach, name="Private")
+        self.client.force_authenticate(user=self.athlete)
+        response = self.client.post(f"/api/pace/plans/{private.id}/clone/", {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_only_staff_publish_templates(self):
+        self.client.force_authenticate(user=self.athlete)
+        response = self.client.post("/api/pace/plans/", {"name": "Mine", "is_template": True}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get("/api/pace/plans/templates/")
+        self.assertEqual([plan["name"] for plan in response.data], ["Starter"])
+
+    def test_assign_copies_in_constant_queries(self):
+        def assign(count, start):
+            users = [User.objects.create_user(username=f"a{i}", email=f"a{i}@example.com", password="pass123")
+                     for i in range(start, start + count)]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(f"/api/pace/plans/{self.template.id}/assign/",
+                                            {"user_ids": [u.id for u in users]}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return users, response, len(queries)
+
+        self.client.force_authenticate(user=self.coach)
+        _, _, few = assign(2, 0)
+        users, response, many = assign(40, 100)
+        self.assertEqual(few, many)
+        self.assertEqual(len(response.data), 40)
+        for user, row in zip(users, response.data):
+            self.assertEqual(row["user"], user.id)
+            self.assertEqual(self.exercises_of(row["id"]), self.exercises_of(self.template.id))
+
+    def test_assign_is_staff_only_and_validates_users(self):
+        self.client.force_authenticate(user=self.athlete)
+        response = self.client.post(f"/api/pace/plans/{self.template.id}/assign/",
+                                    {"user_ids": [self.athlete.id]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.coach)
+        response = self.client.post(f"/api/pace/plans/{self.template.id}/assign/",
+                                    {"user_ids": [self.athlete.id, 999999]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(WorkoutPlan.objects.filter(user=self.athlete).exists())
+
+
+class FastSerializerParityTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="fast", email="fast@example.com", password="pass123")
+        self.client.force_authenticate(user=self.user)
+        self.plan = WorkoutPlan.objects.create(user=self.user, name="Fast Plan", description="Legs",
+                                               duration_minutes=45, difficulty_level="hard")
+        self.squat = Exercise.objects.create(workout_plan=self.plan, name="Squat", order=2 * Exercise.RANK_GAP,
+                                             sets=3, reps=8, rest_timer=90)
+        self.curl = Exercise.objects.create(workout_plan=self.plan, name="Curl", order=Exercise.RANK_GAP)
+        WorkoutPlan.objects.create(user=self.user, name="Empty Plan")
+        [self.copy] = self.plan.copy_for([self.user], name="Fast Copy")
+
+        # One completed session (with a summary), one in progress and one without a plan
+        done = WorkoutSession.objects.create(user=self.user, plan=self.plan, duration=timedelta(minutes=30),
+                                             rest_period_seconds=60)
+        for exercise, set_number, weight in ((self.squat, 1, 60.5), (self.squat, 2, 70), (self.curl, 1, 12)):
+            ExerciseSetLog.objects.create(session=done, exercise=exercise, set_number=set_number,
+                                          reps_completed=10, weight_kg=weight, score=88.5)
+        live = WorkoutSession.objects.create(user=self.user, plan=self.plan, score=71.25)
+        ExerciseSetLog.objects.create(session=live, exercise=self.curl, set_number=1, reps_completed=None)
+        WorkoutSession.objects.create(user=self.user, plan=None)
+        self.assertTrue(SessionSummary.objects.filter(session=done).exists())
+
+    def assertSameJSON(self, fast, regular):
+        self.assertEqual(JSONRenderer().render(fast), JSONRenderer().render(regular))
+
+    def test_serializers_match_their_drf_twins(self):
+        plans = WorkoutPlan.objects.filter(user=self.user)
+        sessions = WorkoutSession.objects.filter(user=self.user).order_by("id")
+        logs = ExerciseSetLog.objects.filter(session__user=self.user)
+        self.assertSameJSON(fast_serializers.FastWorkoutPlanListSerializer(plans).data,
+                            WorkoutPlanSerializer(plans, many=True).data)
+        self.assertSameJSON(fast_serializers.FastWorkoutSessionListSerializer(sessions).data,
+                            WorkoutSessionSerializer(sessions, many=True).data)
+        self.assertSameJSON(fast_serializers.FastWorkoutSessionSummaryListSerializer(sessions).data,
+                            WorkoutSessionSummarySerializer(sessions, many=True).data)
+        self.assertSameJSON(fast_serializers.FastExerciseSetLogListSerializer(logs).data,
+                            ExerciseSetLogSerializer(logs, many=True).data)
+
+    def test_endpoints_match_the_regular_serializers(self):
+        session = WorkoutSession.objects.filter(user=self.user).first()
+        views = [
+            ("/api/pace/plans/", WorkoutPlanListCreateAPIView, "fast_serializer_class"),
+            ("/api/pace/sessions/", WorkoutSessionListCreateAPIView, "fast_serializer_class"),
+            ("/api/pace/sessions/?include=logs", WorkoutSessionListCreateAPIView, "fast_logs_serializer_class"),
+            ("/api/pace/sessions/?page_size=2", WorkoutSessionListCreateAPIView, "fast_serializer_class"),
+            (f"/api/pace/sessions/{session.id}/logs/", ExerciseSetLogListCreateAPIView, "fast_serializer_class"),
+        ]
+        for url, view, attribute in views:
+            with self.subTest(url=url):
+                fast = self.client.get(url)
+                with mock.patch.object(view, attribute, None):
+                    regular = self.client.get(url)
+                self.assertEqual(fast.status_code, status.HTTP_200_OK)
+                self.assertEqual(fast.content, regular.content)
+
+    def test_fast_plan_list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            fast_serializers.FastWorkoutPlanListSerializer(WorkoutPlan.objects.filter(user=self.user)).data
+        self.assertEqual(len(queries), 2)
+
+    def test_benchmark_command_smoke(self):
+        # Timing is left to `benchmark_serializers --min-speedup 5`; this checks the command runs,
+        # that both serializers agree on its data, and that it leaves nothing behind
+        out = StringIO()
+        call_command("benchmark_serializers", "--rows", "200", "--repeat", "1", stdout=out)
+        self.assertEqual([line.split(":")[0].strip() for line in out.getvalue().splitlines()],
+                         ["plans", "sessions", "set logs"])
+        self.assertFalse(User.objects.filter(username="serializer-benchmark").exists())
@@ -4,6 +4,7 @@ from pace.api.workout_plan import *
 from pace.api.workout_plan import *
 from pace.api.workout_log import *
 from pace.api.analytics import *
+from pace.api.sync import *
 
 urlpatterns = [
     # Profile endpoints
@@ -12,18 +13,33 @@ urlpatterns = [
 
     # Workout plan endpoints
     path("plans/", WorkoutPlanListCreateAPIView.as_view(), name="workoutplan-list-create"),
+    path("plans/templates/", WorkoutPlanTemplateListAPIView.as_view(), name="workoutplan-templates"),
     path("plans/<int:pk>/", WorkoutPlanDetailAPIView.as_view(), name="workoutplan-detail"),
+    path("plans/<int:pk>/clone/", WorkoutPlanCloneAPIView.as_view(), name="workoutplan-clone"),
+    path("plans/<int:pk>/assign/", WorkoutPlanAssignAPIView.as_view(), name="workoutplan-assign"),
     path("plans/<int:plan_id>/exercises/", WorkoutPlanExerciseAPIView.as_view(), name="plan-add-exercises"),
+    path("plans/<int:plan_id>/exercises/reorder/", WorkoutPlanExerciseReorderAPIView.as_view(), name="plan-reorder-exercises"),
     path("plans/<int:plan_id>/exercises/<int:exercise_id>/", WorkoutPlanExerciseAPIView.as_view(), name="plan-remove-exercise"),
 
     # Workout session endpoints
     path("sessions/", WorkoutSessionListCreateAPIView.as_view(), name="session-list-create"),
+    path("sessions/export/", WorkoutSessionExportAPIView.as_view(), name="session-export"),
     path("sessions/<int:session_id>/", WorkoutSessionDetailAPIView.as_view(), name="session-detail"),
 
     # Workout session logs endpoints
     path("sessions/<int:session_id>/logs/", ExerciseSetLogListCreateAPIView.as_view(), name="session-log-list-create"),
     path("sessions/<int:session_id>/logs/<int:log_id>/", ExerciseSetLogDetailAPIView.as_view(), name="session-log-detail"),
 
+    # Per-rep telemetry endpoints
+    path("workouts/<int:session_id>/reps/", RepLogListCreateAPIView.as_view(), name="session-rep-list-create"),
+
     # Dashboard analytics endpoints
     path("analytics/", FitnessAnalyticsAPIView.as_view(), name="fitness-summary"),
+    path("analytics/accuracy/", AccuracyTrendAPIView.as_view(), name="accuracy-trend"),
+    path("analytics/weekly-volume/", WeeklyVolumeAPIView.as_view(), name="weekly-volume"),
+    path("analytics/rep-speed/", RepSpeedAPIView.as_view(), name="rep-speed"),
+    path("analytics/cohort/", CohortAnalyticsAPIView.as_view(), name="cohort-analytics"),
+
+    # Offline sync endpoint
+    path("sync/", SyncAPIView.as_view(), name="sync"),
 ]
@@ -58,7 +58,10 @@ export function ChartAreaInteractive() {
     let mounted = true
     ;(async () => {
       try {
-        const data = await SessionService.listSessions()
+        // Enough history for the widest range (90 days)
+        const since = new Date()
+        since.setDate(since.getDate() - 90)
+        const data = await SessionService.listSessionsSince(since)
         if (mounted) setSessions(data)
       } catch (e) {
         console.error('Failed to load chart sessions', e)
@@ -30,7 +30,8 @@ export function SectionCards() {
     let mounted = true;
     (async () => {
       try {
-        const data = await SessionService.listSessions();
+        // The cards compare the last 30 days with the 30 before them
+        const data = await SessionService.listSessionsSince(new Date(Date.now() - 60 * 24 * 3600 * 1000));
         if (mounted) setSessions(data);
       } catch (e) {
         console.error("Failed to load sessions for dashboard", e);
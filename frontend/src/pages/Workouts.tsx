@@ -39,13 +39,15 @@ export default function Workouts() {
     const plans = await new WorkoutService().getWorkoutPlans();
     setWorkouts(plans);
     try {
-      const sessions = await SessionService.listSessions();
-      // Sort by date desc and take last 3 completed
-      const recent = sessions
-        .filter(s => s.completed)
-        .sort((a, b) => new Date(b.date).getTime() - new Date(a.date).getTime())
-        .slice(0, 3);
-      setRecentSessions(recent);
+      // Pages come newest first: stop as soon as the last 3 completed are found
+      const recent: Session[] = [];
+      let cursor: string | null = null;
+      do {
+        const page = await SessionService.listSessions({ cursor, pageSize: 20 });
+        recent.push(...page.results.filter(s => s.completed));
+        cursor = page.cursor;
+      } while (cursor && recent.length < 3);
+      setRecentSessions(recent.slice(0, 3));
     } catch (e) {
       console.error('Failed to load recent sessions', e);
       setRecentSessions([]);
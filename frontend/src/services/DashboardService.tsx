@@ -43,9 +43,8 @@ export interface RepSpeedDistribution {
 }
 
 export interface WeeklyVolume {
-  date: string;
-  bicep_curls: number;
-  squats: number;
+  date: string; // Monday of the ISO week
+  exercises: Record<string, number>; // volume per exercise name, only those logged that week
   total: number;
 }
 
@@ -15,6 +15,39 @@ export type Session = {
   score?: number | null;
   duration?: string | null; // "HH:MM:SS" per DRF DurationField
   completed?: boolean;
+  summary?: SessionSummary | null; // set once the session is completed
+};
+
+export type ExerciseSummary = {
+  exercise: number;
+  name: string;
+  sets: number;
+  reps: number;
+  volume: number;
+  average_score: number | null;
+  best_set: {
+    set_number: number;
+    reps_completed: number | null;
+    weight_kg: number | null;
+    score: number | null;
+    volume: number;
+  };
+};
+
+export type SessionSummary = {
+  exercises: ExerciseSummary[];
+  total_sets: number;
+  total_reps: number;
+  total_volume: number;
+  average_score: number | null;
+  duration: string | null;
+  built_at: string;
+};
+
+export type SessionPage = {
+  next: string | null;
+  cursor: string | null; // pass to listSessions() for the next page; null on the last one
+  results: Session[];
 };
 
 export type CreateSessionPayload = {
@@ -60,13 +93,36 @@ export class SessionService {
     return this.handleResponse<Session>(response);
   }
 
-  static async listSessions(): Promise<Session[]> {
-    const response = await fetch(`${API_URL}/pace/sessions/`, {
+  /**
+   * One page of the session history, newest first. Pass the returned
+   * `cursor` to get the next page; it is null once there are no more.
+   */
+  static async listSessions(
+    { cursor, pageSize = 100 }: { cursor?: string | null; pageSize?: number } = {}
+  ): Promise<SessionPage> {
+    const params = new URLSearchParams({ page_size: String(pageSize) });
+    if (cursor) params.set("cursor", cursor);
+    const response = await fetch(`${API_URL}/pace/sessions/?${params}`, {
       method: "GET",
       credentials: "include",
       headers: { "Content-Type": "application/json" },
     });
-    return this.handleResponse<Session[]>(response);
+    const page = await this.handleResponse<Omit<SessionPage, "cursor">>(response);
+    return { ...page, cursor: page.next ? new URL(page.next).searchParams.get("cursor") : null };
+  }
+
+  /** Sessions dated on or after `since`, loading only as many pages as that takes. */
+  static async listSessionsSince(since: Date, pageSize: number = 100): Promise<Session[]> {
+    const sessions: Session[] = [];
+    let cursor: string | null = null;
+    do {
+      const page = await this.listSessions({ cursor, pageSize });
+      const recent = page.results.filter(s => new Date(s.date) >= since);
+      sessions.push(...recent);
+      // Newest first: a page that reaches past `since` is the last one needed
+      cursor = recent.length === page.results.length ? page.cursor : null;
+    } while (cursor);
+    return sessions;
   }
 
   static async patchSession(sessionId: number, updates: Partial<Session>): Promise<Session> {
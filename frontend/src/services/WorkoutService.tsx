@@ -142,4 +142,68 @@ export class WorkoutService {
     }
     return [true, ""];
   }
-}
\ No newline at end of file
+
+  async reorderExercises(planId: number, exerciseIds: number[]): Promise<[boolean, string]> {
+    const cookies = getCookie("csrftoken");
+    const response = await fetch(`${API_URL}/pace/plans/${planId}/exercises/reorder/`, {
+      method: "PUT",
+      headers: {
+        "Content-Type": "application/json",
+        "X-CSRFToken": cookies,
+      },
+      body: JSON.stringify({ exercise_ids: exerciseIds }),
+      credentials: "include",
+    });
+    if (!response.ok) {
+      let errorMsg = "Failed to reorder exercises";
+      try {
+        const err = await response.json();
+        errorMsg = err?.detail ?? JSON.stringify(err);
+      } catch {
+        // Ignore JSON parsing errors
+      }
+      return [false, errorMsg];
+    }
+    return [true, ""];
+  }
+
+  async getPlanTemplates(): Promise<any[]> {
+    const cookies = getCookie("csrftoken");
+    const response = await fetch(`${API_URL}/pace/plans/templates/`, {
+      method: "GET",
+      headers: {
+        "Content-Type": "application/json",
+        "X-CSRFToken": cookies,
+      },
+      credentials: "include",
+    });
+    if (!response.ok) {
+      return [];
+    }
+    return await response.json();
+  }
+
+  async clonePlan(planId: number, name?: string): Promise<[boolean, any, string | undefined]> {
+    const cookies = getCookie("csrftoken");
+    const response = await fetch(`${API_URL}/pace/plans/${planId}/clone/`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+        "X-CSRFToken": cookies,
+      },
+      body: JSON.stringify(name ? { name } : {}),
+      credentials: "include",
+    });
+    if (!response.ok) {
+      let errorMsg = "Failed to copy workout plan";
+      try {
+        const err = await response.json();
+        errorMsg = err?.detail ?? JSON.stringify(err);
+      } catch {
+        // Ignore JSON parsing errors
+      }
+      return [false, undefined, errorMsg];
+    }
+    return [true, await response.json(), undefined];
+  }
+}